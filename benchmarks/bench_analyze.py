@@ -0,0 +1,82 @@
+"""
+Time and measure a report (totals by category and month, top 10 expenses, 7 day
+rolling totals) built from DBClient.get_all() Expense objects against the columnar Ledger.
+
+Usage: python -m benchmarks.bench_analyze --rows 100000 1000000
+"""
+import time
+import argparse
+import tracemalloc
+from datetime import timedelta
+from heapq import nlargest
+
+from expense_tracker import analytics
+from expense_tracker.analytics import Ledger
+from expense_tracker.db.db_client import DBClient
+from expense_tracker.models.group_key import GroupKey
+from .common import temporary_db, insert_rows
+from .generator import ledger_rows
+
+
+def object_report():
+    """The report written as plain loops over Expense objects."""
+    expenses = DBClient.get_all()
+    by_category, by_month, daily = {}, {}, {}
+    for expense in expenses:
+        by_category[expense.category] = by_category.get(
+            expense.category, 0.0) + expense.amount
+        month = expense.date.strftime("%Y-%m")
+        by_month[month] = by_month.get(month, 0.0) + expense.amount
+        day = expense.date.date()
+        daily[day] = daily.get(day, 0.0) + expense.amount
+    top = nlargest(10, expenses, key=lambda expense: expense.amount)
+    first, last = min(daily), max(daily)
+    rolling, window = [], []
+    day = first
+    while day <= last:
+        window.append(daily.get(day, 0.0))
+        rolling.append(sum(window[-7:]))
+        day += timedelta(days=1)
+    return by_category, by_month, top, rolling
+
+
+def ledger_report(use_numpy: bool):
+    ledger = Ledger.load(use_numpy=use_numpy)
+    return (ledger.group_by(GroupKey.CATEGORY), ledger.group_by(GroupKey.MONTH),
+            ledger.top_expenses(10), ledger.rolling(7))
+
+
+def measure(report) -> tuple[float, float]:
+    """Returns the time in seconds and the peak traced memory in MB of one report."""
+    # tracing slows allocation down, so time and memory are measured in separate runs
+    start = time.perf_counter()
+    report()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    report()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+",
+                        default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    reports = [("Expense objects", object_report),
+               ("Ledger (python)", lambda: ledger_report(False))]
+    if analytics.numpy is not None:
+        reports.append(("Ledger (numpy)", lambda: ledger_report(True)))
+    for rows in args.rows:
+        with temporary_db("bench_analyze"):
+            insert_rows(ledger_rows(rows))
+            print(f"rows: {rows:,}")
+            for name, report in reports:
+                elapsed, peak = measure(report)
+                print(f"  {name:<16} {elapsed:7.2f}s  peak {peak:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare adding expenses piped from another tool one 'add' process per line with a
+single 'add --stdin' process, and with DBClient.add called per line in one process
+(one commit each) to separate the cost of process startup from the cost of commits.
+Per-process adds are timed on a sample of the lines and extrapolated.
+
+Usage: python -m benchmarks.bench_bulk_add --lines 50000 --sample 200
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+from datetime import datetime, timedelta
+
+from expense_tracker.config import Config
+from expense_tracker.db.db_client import DBClient
+from expense_tracker.utils import Utils
+from .common import temporary_db
+
+DB_NAME = "bench_bulk_add"
+
+
+def tab_lines(count: int) -> list[str]:
+    """Distinct 'amount<TAB>description<TAB>date' lines."""
+    keywords = [word for words in Utils.categories.values() for word in words]
+    start = datetime(2025, 1, 1)
+    return [f"{1 + i % 500}.{i % 100:02}\t{keywords[i % len(keywords)]} #{i}\t"
+            f"{(start + timedelta(minutes=i)).isoformat()}\n" for i in range(count)]
+
+
+def per_process(lines: list[str], env: dict) -> float:
+    cli = [sys.executable, "-m", "expense_tracker.main", "add"]
+    start = time.perf_counter()
+    for line in lines:
+        amount, description, _ = line.split("\t")
+        subprocess.run([*cli, amount, description], check=True, stdout=subprocess.DEVNULL, env=env)
+    return time.perf_counter() - start
+
+
+def stdin_process(lines: list[str], env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "expense_tracker.main", "add", "--stdin"],
+                   input="".join(lines), text=True, check=True, stdout=subprocess.DEVNULL, env=env)
+    return time.perf_counter() - start
+
+
+def per_commit(lines: list[str]) -> float:
+    start = time.perf_counter()
+    for line in lines:
+        amount, description, date = line.rstrip("\n").split("\t")
+        DBClient.add({"amount": float(amount), "description": description, "date": date,
+                      "category": Utils.auto_categorise(description)})
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--sample", type=int, default=200)
+    args = parser.parse_args()
+
+    lines = tab_lines(args.lines)
+    # a socket nothing listens on, so every process adds directly
+    env = {**os.environ, Config.ENV_DB_NAME: DB_NAME,
+           Config.ENV_SOCKET: os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_bulk_add.sock")}
+    print(f"lines: {args.lines:,}, per-line modes timed on {args.sample:,} lines")
+    with temporary_db(DB_NAME):
+        sample = per_process(lines[:args.sample], env)
+        print(f"  one process per line  {sample / args.sample * args.lines:8.2f}s  (extrapolated)")
+    with temporary_db(DB_NAME):
+        sample = per_commit(lines[:args.sample])
+        print(f"  one commit per line   {sample / args.sample * args.lines:8.2f}s  (extrapolated)")
+    with temporary_db(DB_NAME):
+        DBClient.close_connections()
+        elapsed = stdin_process(lines, env)
+        print(f"  add --stdin           {elapsed:8.2f}s  ({args.lines / elapsed:,.0f} lines/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare the legacy keyword loop with the compiled KeywordMatcher behind
+Utils.auto_categorise over synthetic descriptions, then measure the
+category cache on descriptions drawn from a pool of repeated merchants.
+
+Usage: python -m benchmarks.bench_categorise --count 1000000 --merchants 5000
+"""
+import time
+import random
+import argparse
+
+from expense_tracker.utils import Utils
+from expense_tracker.categoriser import KeywordMatcher
+
+FILLER = ["payment", "card", "ref", "pos", "online", "the", "to", "store", "ltd"]
+
+
+def legacy_categorise(description: str) -> str:
+    description_lower = description.lower()
+    for key, words in Utils.categories.items():
+        if any(word in description_lower for word in words):
+            return key
+    return "Other"
+
+
+def synthetic_descriptions(count: int, seed: int = 0) -> list[str]:
+    """Descriptions of 1-5 filler words, 80% of them with a keyword somewhere."""
+    rng = random.Random(seed)
+    keywords = [word for words in Utils.categories.values() for word in words]
+    descriptions = []
+    for i in range(count):
+        parts = [rng.choice(FILLER) for _ in range(rng.randint(1, 5))]
+        if rng.random() < 0.8:
+            parts.insert(rng.randint(0, len(parts)), rng.choice(keywords))
+        descriptions.append(f"{' '.join(parts)} #{i}".upper())
+    return descriptions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--merchants", type=int, default=5000,
+                        help="distinct descriptions in the repeated merchants run")
+    args = parser.parse_args()
+
+    descriptions = synthetic_descriptions(args.count)
+    start = time.perf_counter()
+    # no cache: every description is unique in this run
+    matcher = KeywordMatcher(Utils.categories, cache_size=0)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = [legacy_categorise(description) for description in descriptions]
+    legacy_time = time.perf_counter() - start
+
+    match = matcher.match
+    start = time.perf_counter()
+    compiled = [match(description) for description in descriptions]
+    compiled_time = time.perf_counter() - start
+
+    assert legacy == compiled
+    print(f"descriptions: {args.count:,}")
+    print(f"compile:  {compile_time * 1000:.2f}ms")
+    print(f"legacy:   {legacy_time:.2f}s ({args.count / legacy_time:,.0f}/s)")
+    print(f"compiled: {compiled_time:.2f}s ({args.count / compiled_time:,.0f}/s)")
+    print(f"speedup:  {legacy_time / compiled_time:.1f}x")
+
+    rng = random.Random(1)
+    merchants = synthetic_descriptions(args.merchants, seed=1)
+    repeated = [rng.choice(merchants) for _ in range(args.count)]
+    for label, cache_size in (("uncached", 0), ("cached", args.merchants * 2)):
+        matcher = KeywordMatcher(Utils.categories, cache_size=cache_size)
+        start = time.perf_counter()
+        matcher.match_many(repeated)
+        elapsed = time.perf_counter() - start
+        info = matcher.cache_info()
+        hit_rate = info.hits / (info.hits + info.misses)
+        print(f"{label:<9} {args.merchants:,} merchants: {elapsed:.2f}s "
+              f"({args.count / elapsed:,.0f}/s, hit rate {hit_rate:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare SUM over the REAL amounts stored before integer cents with SUM over the INTEGER
+cents stored now, and check the monthly totals stay exact to the cent over every row.
+The REAL totals are also kept the way the summary triggers used to: one addition per insert.
+
+Usage: python -m benchmarks.bench_cents --rows 10000000
+"""
+import time
+import argparse
+from decimal import Decimal
+from typing import Iterator
+
+from expense_tracker.db.db_client import DBClient, TABLE_NAME, SUMMARY_TABLE_NAME
+from .common import temporary_db, best_of
+from .generator import ledger_rows
+
+AGGREGATES = {
+    "REAL": "SELECT category, SUM(amount) FROM bench_real GROUP BY category",
+    "INTEGER": "SELECT category, SUM(amount_cents) FROM bench_cents GROUP BY category",
+}
+
+
+def tracked(rows: Iterator[tuple], exact: dict[str, Decimal], running: dict[str, float]) -> Iterator[tuple]:
+    """
+    Pass rows through, adding each amount to its month's exact and float running totals.
+    Descriptions are numbered so add_rows skips none of them as duplicates.
+    """
+    for i, (amount, description, date, category) in enumerate(rows):
+        month = date[:7]
+        exact[month] = exact.get(month, Decimal(0)) + Decimal(str(amount))
+        running[month] = running.get(month, 0.0) + amount
+        yield amount, f"{description} #{i}", date, category
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    exact: dict[str, Decimal] = {}
+    running: dict[str, float] = {}
+    with temporary_db("bench_cents"):
+        start = time.perf_counter()
+        DBClient.add_rows(tracked(ledger_rows(args.rows), exact, running), batch_size=100_000)
+        insert_time = time.perf_counter() - start
+        connection = DBClient.get_connection()
+        # two narrow copies, so both aggregates scan the same number of pages per row
+        connection.execute(
+            f"CREATE TABLE bench_real AS SELECT category, amount_cents / 100.0 AS amount FROM {TABLE_NAME}")
+        connection.execute(f"CREATE TABLE bench_cents AS SELECT category, amount_cents FROM {TABLE_NAME}")
+        connection.commit()
+        timings = {name: best_of(lambda: connection.execute(query).fetchall(), args.repeat)
+                   for name, query in AGGREGATES.items()}
+
+        exact_cents = {month: int(total * 100) for month, total in exact.items()}
+        stored = dict(connection.execute(
+            f"SELECT month, SUM(total_cents) FROM {SUMMARY_TABLE_NAME} GROUP BY month"))
+        real_total = connection.execute("SELECT SUM(amount) FROM bench_real").fetchone()[0]
+        cents_total = connection.execute("SELECT SUM(amount_cents) FROM bench_cents").fetchone()[0]
+        mismatches = DBClient.check_summary()
+
+    total = sum(exact_cents.values())
+    drifted = {month: abs(running[month] * 100 - cents) for month, cents in exact_cents.items()
+               if running[month] != cents / 100}
+    print(f"rows: {args.rows:,}, months: {len(exact_cents):,}, add_rows: {args.rows / insert_time:,.0f} rows/s")
+    for name, seconds in timings.items():
+        print(f"  SUM over {name:<8} {seconds * 1000:10.1f} ms  ({args.rows / seconds / 1e6:,.1f}M rows/s)")
+    print(f"  exact total          {Decimal(total) / 100}")
+    print(f"  SUM over REAL        {real_total!r}  off by {abs(Decimal(real_total) * 100 - total):.2e} cents")
+    print(f"  SUM over INTEGER     {Decimal(cents_total) / 100}  "
+          f"{'exact' if cents_total == total else 'WRONG'}")
+    print(f"  running REAL totals  {len(drifted):,} of {len(exact_cents):,} months off, "
+          f"worst by {max(drifted.values(), default=0):.2e} cents")
+    print(f"  monthly total_cents  {'exact' if stored == exact_cents and mismatches == [] else 'WRONG'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Measure DBClient.add and DBClient.summary latency per PRAGMA profile against
+opening a fresh sqlite3 connection for every call.
+
+Usage: python -m benchmarks.bench_connection --calls 2000
+"""
+import os
+import time
+import sqlite3
+import argparse
+
+from expense_tracker.config import Config
+from expense_tracker.db.db_client import DBClient, TABLE_NAME
+from expense_tracker.db.connection_manager import PRAGMA_PROFILES
+from expense_tracker.utils import Utils
+from .common import temporary_db
+
+EXPENSE = {
+    "amount": 12.5,
+    "description": "Coffee",
+    "date": "2025-10-01T08:30:00",
+    "category": "Food & Drinks"
+}
+
+
+def time_calls(func, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+def fresh_connection_add():
+    """The previous behaviour: open, insert, commit and drop the connection."""
+    db_path = DBClient.get_connection().execute(
+        "PRAGMA database_list;").fetchone()[2]
+    connection = sqlite3.connect(db_path)
+    connection.execute(
+        f"INSERT INTO {TABLE_NAME} (amount_cents, description, date, category) VALUES (?, ?, ?, ?)",
+        (Utils.to_cents(EXPENSE["amount"]), EXPENSE["description"], EXPENSE["date"], EXPENSE["category"]))
+    connection.commit()
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'mode':>16} {'add':>12} {'summary':>12}")
+    with temporary_db("bench_connection"):
+        add_time = time_calls(fresh_connection_add, args.calls)
+        print(f"{'fresh connect':>16} {add_time * 1e6:>10.1f}us {'-':>12}")
+    for profile in PRAGMA_PROFILES:
+        os.environ[Config.ENV_DB_PROFILE] = profile
+        with temporary_db("bench_connection"):
+            add_time = time_calls(lambda: DBClient.add(EXPENSE), args.calls)
+            summary_time = time_calls(
+                lambda: DBClient.summary("10", "2025"), args.calls)
+            print(f"{profile:>16} {add_time * 1e6:>10.1f}us {summary_time * 1e6:>10.1f}us")
+    del os.environ[Config.ENV_DB_PROFILE]
+
+
+if __name__ == "__main__":
+    main()
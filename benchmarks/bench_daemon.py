@@ -0,0 +1,93 @@
+"""
+Compare the latency of CLI commands run directly, each in a new process, with the same
+commands forwarded to a running 'serve' daemon, and the round trip of the socket alone.
+
+Usage: python -m benchmarks.bench_daemon --rows 100000 --repeat 20
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+from expense_tracker import daemon
+from expense_tracker.config import Config
+from .common import temporary_db, insert_rows
+from .generator import ledger_rows
+
+DB_NAME = "bench_daemon"
+
+
+def run(args: list[str], repeat: int, env: dict) -> list[float]:
+    """Returns the wall time in milliseconds of every run of 'args' in a new process."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, env=env)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def round_trip(path: str, repeat: int) -> list[float]:
+    """Milliseconds of forwarding '--help' from this process: the socket and framing, without a new interpreter."""
+    import socket
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            daemon.send(client, {"argv": ["--help"], "prog_name": "bench", "cwd": os.getcwd(),
+                                 "env": {name: os.environ.get(name) for name in daemon.FORWARDED_ENV}})
+            # the daemon starts the command once the client confirms it is still waiting
+            [*daemon.receive(client, 1)]
+            daemon.send(client, {"run": True})
+            [*daemon.receive(client, 3)]
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def describe(timings: list[float]) -> str:
+    quantiles = statistics.quantiles(timings, n=20)
+    return f"p50 {statistics.median(timings):7.1f} ms  p95 {quantiles[-1]:7.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cli = [sys.executable, "-m", "expense_tracker.main"]
+    socket_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_daemon.sock")
+    direct_env = {**os.environ, Config.ENV_DB_NAME: DB_NAME, Config.ENV_SOCKET: socket_path}
+    with temporary_db(DB_NAME):
+        insert_rows(ledger_rows(args.rows))
+        commands = {
+            "add": [*cli, "add", "4.5", "Coffee"],
+            "list": [*cli, "list", "--month", "Jan", "--year", "2015"],
+            "summary": [*cli, "summary", "--month", "Jan", "--year", "2015"],
+            "summary --from": [*cli, "summary", "--from", "2015-01", "--to", "2015-12"],
+            "search": [*cli, "search", "coffee", "--newest"],
+        }
+        direct = {name: run(command, args.repeat, direct_env) for name, command in commands.items()}
+        server = subprocess.Popen([*cli, "serve"], stdout=subprocess.PIPE, env=direct_env)
+        try:
+            server.stdout.readline()
+            # the first request warms the daemon's connection and caches, as a running daemon would be
+            run(commands["summary"], 1, direct_env)
+            forwarded = {name: run(command, args.repeat, direct_env) for name, command in commands.items()}
+            socket_only = round_trip(socket_path, args.repeat * 5)
+        finally:
+            server.terminate()
+            server.wait()
+    print(f"rows: {args.rows:,}, {args.repeat} runs")
+    for name in commands:
+        print(f"  {name:<15} direct  {describe(direct[name])}")
+        print(f"  {'':<15} daemon  {describe(forwarded[name])}")
+    print(f"  {'socket only':<15} daemon  {describe(socket_only)}")
+
+
+if __name__ == "__main__":
+    main()
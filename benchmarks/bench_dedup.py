@@ -0,0 +1,75 @@
+"""
+Compare re-importing an overlapping statement through the content hash index
+(INSERT OR IGNORE) against the previous workaround: load every stored row into
+Python, drop the rows already present and insert the rest. Inserting the new rows
+(with their summary and search index triggers) dominates both, so the time of
+running the same import again, when every row is skipped, is reported too.
+
+Usage: python -m benchmarks.bench_dedup --rows 100000 1000000 --import-rows 100000
+"""
+import os
+import time
+import argparse
+from collections import deque
+from datetime import datetime
+
+from expense_tracker.config import Config
+from expense_tracker.db.db_client import DBClient
+from .common import temporary_db
+from .generator import ledger_rows
+
+# the new half of the statement starts the day after the ledger ends
+NEW_ROWS_START = datetime(2025, 1, 1)
+
+
+def python_diff(rows: list[tuple]) -> int:
+    """The workaround: compare against every stored row in Python, then insert the new ones."""
+    stored = {(round(amount * 100), date, description)
+              for _, amount, description, date, _ in DBClient.iter_rows(10_000)}
+    new_rows = [row for row in rows
+                if (round(row[0] * 100), row[2], row[1]) not in stored]
+    return DBClient.add_rows(new_rows, batch_size=10_000)[0]
+
+
+def index_dedup(rows: list[tuple]) -> int:
+    return DBClient.add_rows(rows, batch_size=10_000)[0]
+
+
+def statement(rows: int, import_rows: int) -> list[tuple]:
+    """An export overlapping the ledger: its last import_rows / 2 rows followed by as many new ones."""
+    stored = deque(ledger_rows(rows), maxlen=import_rows // 2)
+    return [*stored, *ledger_rows(import_rows - len(stored), seed=1, start=NEW_ROWS_START, days=90)]
+
+
+def run(rows: int, import_rows: int, load) -> tuple[float, int, float]:
+    """
+    Returns the time and number inserted of one overlapping import into a fresh ledger,
+    and the time of importing the same rows again.
+    """
+    overlapping = statement(rows, import_rows)
+    with temporary_db("bench_dedup"):
+        DBClient.add_rows(ledger_rows(rows), batch_size=10_000)
+        start = time.perf_counter()
+        inserted = load(overlapping)
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        load(overlapping)
+        return elapsed, inserted, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--import-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    os.environ[Config.ENV_DB_PROFILE] = "bulk"
+    for rows in args.rows:
+        print(f"ledger: {rows:,} rows, importing {args.import_rows:,}")
+        for name, load in [("python diff", python_diff), ("hash index", index_dedup)]:
+            elapsed, inserted, again = run(rows, args.import_rows, load)
+            print(f"  {name:<12} {elapsed:6.2f}s  inserted {inserted:,}  same import again {again:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
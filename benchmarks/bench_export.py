@@ -0,0 +1,62 @@
+"""
+Compare peak Python memory and time of the legacy CSV export (materialise every
+Expense, then every CSV line) with the streaming Exporter.write_csv path.
+Timings run under tracemalloc, so compare them with each other, not with real exports.
+
+Usage: python -m benchmarks.bench_export --sizes 10000 100000 1000000
+"""
+import os
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+from expense_tracker.db.db_client import DBClient
+from expense_tracker.exporter import Exporter
+from .common import temporary_db, insert_rows
+from .generator import ledger_rows
+
+
+def legacy_export(output):
+    expenses = DBClient.get_all()
+    lines = [f"{expense.to_csv()}\n" for expense in expenses]
+    output.write("ID,Amount,Description,Category,Date\n")
+    output.writelines(lines)
+
+
+def streaming_export(output):
+    Exporter.write_csv(DBClient.iter_rows(), output)
+
+
+def measure(export, path: str) -> tuple[float, int]:
+    """Return (seconds, peak traced bytes) for one export."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(path, "w") as output:
+        export(output)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.gettempdir(), "bench_export.csv")
+    print(f"{'rows':>10} {'legacy time':>12} {'legacy peak':>12} {'stream time':>12} {'stream peak':>12}")
+    for size in args.sizes:
+        with temporary_db("bench_export"):
+            insert_rows(ledger_rows(size))
+            legacy_time, legacy_peak = measure(legacy_export, path)
+            stream_time, stream_peak = measure(streaming_export, path)
+        print(f"{size:>10} {legacy_time:>11.2f}s {legacy_peak / 2**20:>10.1f}MB "
+              f"{stream_time:>11.2f}s {stream_peak / 2**20:>10.1f}MB")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare a report across many users run as one 'summary' process per user with
+'summary --names' reading every database on a thread pool of 1 to N threads, and report
+the spread of the per-database read times. Per-user processes are timed on a sample.
+
+Usage: python -m benchmarks.bench_fan_out --users 2000 --rows 1000 --workers 1 2 4 8
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+
+from expense_tracker.config import Config
+from expense_tracker.db.db_client import DBClient, DB_DIRECTORY
+from expense_tracker.db.fan_out import FanOut
+from .common import temporary_db
+from .generator import ledger_rows
+
+PREFIX = "bench_fan_out"
+
+
+def per_process(names: list[str]) -> float:
+    cli = [sys.executable, "-m", "expense_tracker.main", "summary", "--month", "Jan", "--year", "2024"]
+    # a socket nothing listens on, so every process reads directly
+    env = {**os.environ, Config.ENV_SOCKET: str(DB_DIRECTORY / f"{PREFIX}.sock")}
+    start = time.perf_counter()
+    for name in names:
+        subprocess.run(cli, check=True, stdout=subprocess.DEVNULL, env={**env, Config.ENV_DB_NAME: name})
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--sample", type=int, default=50)
+    args = parser.parse_args()
+
+    names = [f"{PREFIX}_{number:05}" for number in range(args.users)]
+    # every user gets a copy of one ledger, it is the number of files that is measured
+    with temporary_db(f"{PREFIX}_template"):
+        DBClient.add_rows(ledger_rows(args.rows, start=datetime(2024, 1, 1), days=365), batch_size=10_000)
+        DBClient.close_connections()
+        for name in names:
+            shutil.copyfile(DB_DIRECTORY / f"{PREFIX}_template.db", DB_DIRECTORY / f"{name}.db")
+    try:
+        print(f"users: {args.users:,}, rows per user: {args.rows:,}, cpus: {os.cpu_count()}")
+        sample = per_process(names[:args.sample])
+        print(f"  one process per user  {sample / args.sample * args.users:8.2f}s  (extrapolated)")
+        for workers in args.workers:
+            start = time.perf_counter()
+            _, results = FanOut.summary(names, "1", "2024", workers)
+            elapsed = time.perf_counter() - start
+            assert all(result.error is None for result in results)
+            times = sorted(result.elapsed * 1000 for result in results)
+            print(f"  {workers:>2} threads            {elapsed:8.2f}s  per database: p50 {statistics.median(times):.2f} ms"
+                  f"  p95 {times[int(len(times) * 0.95)]:.2f} ms  max {times[-1]:.2f} ms")
+    finally:
+        for name in names:
+            for suffix in ("", "-wal", "-shm"):
+                path = DB_DIRECTORY / f"{name}.db{suffix}"
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compare peak Python memory and throughput of the legacy import (parse the whole
+file into a list, then insert) with the batched Importer pipeline.
+Timings run under tracemalloc, so compare them with each other, not with real imports.
+
+Usage: python -m benchmarks.bench_import --sizes 10000 100000 --batch-size 1000
+"""
+import time
+import argparse
+import tracemalloc
+
+from expense_tracker.db.db_client import DBClient
+from expense_tracker.importer import Importer
+from expense_tracker.models.expense import Expense
+from expense_tracker.models.output_format import FileFormat
+from .common import temporary_db, temporary_file, write_import_csv
+from .generator import ledger_rows
+
+
+def measure(load) -> tuple[float, int]:
+    """Return (seconds, peak traced bytes) for one import."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 100_000])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy rows/s':>14} {'legacy peak':>12} {'batched rows/s':>15} {'batched peak':>13}")
+    for size in args.sizes:
+        with temporary_file(".csv") as path:
+            write_import_csv(path, ledger_rows(size))
+            with temporary_db("bench_import"):
+                legacy_time, legacy_peak = measure(
+                    lambda: DBClient.add_many(Expense.parse_csv(path)))
+            with temporary_db("bench_import"):
+                batched_time, batched_peak = measure(lambda: Importer.run(
+                    Importer.read(path, FileFormat.CSV), args.batch_size))
+        print(f"{size:>10} {size / legacy_time:>14,.0f} {legacy_peak / 2**20:>10.1f}MB "
+              f"{size / batched_time:>15,.0f} {batched_peak / 2**20:>11.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compare the throughput and peak RSS of reading a CSV import through DictReader and
+Expense objects (Importer.read) with the memory mapped Importer.read_csv, alone and
+followed by the insert. Every measurement runs in a new process, so peak RSS is its own.
+
+Usage: python -m benchmarks.bench_mmap_import --rows 1000000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from collections import deque
+
+from expense_tracker.config import Config
+from expense_tracker.importer import Importer
+from expense_tracker.models.output_format import FileFormat
+from expense_tracker.profiler import peak_memory
+from .common import temporary_db, temporary_file, write_import_csv
+from .generator import ledger_rows
+
+READERS = {
+    "DictReader": lambda path: ((expense.amount, expense.description, expense.date.isoformat(), expense.category)
+                                for expense in Importer.read(path, FileFormat.CSV)),
+    "mmap": Importer.read_csv,
+}
+
+
+def child(reader: str, path: str, insert: bool):
+    """Run one measurement and print it as JSON. Runs in its own process."""
+    rows = READERS[reader](path)
+    start = time.perf_counter()
+    if insert:
+        with temporary_db("bench_mmap_import"):
+            Importer.run_rows(rows, 10_000)
+    else:
+        deque(rows, maxlen=0)
+    print(json.dumps({"seconds": time.perf_counter() - start, "peak_rss": peak_memory()}))
+
+
+def measure(reader: str, path: str, insert: bool) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_mmap_import", "--child", reader, path]
+        + (["--insert"] if insert else []),
+        capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    parser.add_argument("--insert", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        child(*args.child, args.insert)
+        return
+
+    os.environ[Config.ENV_DB_PROFILE] = "bulk"
+    with temporary_file(".csv") as path:
+        # blank categories make both readers auto categorise every row
+        write_import_csv(path, ((amount, description, date, "")
+                         for amount, description, date, _ in ledger_rows(args.rows)))
+        print(f"rows: {args.rows:,}, file: {os.path.getsize(path) / 1e6:.1f} MB")
+        for insert in (False, True):
+            print("read and insert" if insert else "read only")
+            for reader in READERS:
+                result = measure(reader, path, insert)
+                print(f"  {reader:<11} {args.rows / result['seconds']:>11,.0f} rows/s  "
+                      f"peak RSS {result['peak_rss'] / 2**20:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
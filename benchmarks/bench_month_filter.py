@@ -0,0 +1,64 @@
+"""
+Compare the legacy strftime() month filter with the half-open date range
+used by DBClient.list_expenses and DBClient.summary.
+
+The number of rows in the queried month is kept constant, so the range
+query time should stay flat while the strftime() scan grows with the table.
+
+Usage: python -m benchmarks.bench_month_filter --sizes 10000 100000 1000000
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from expense_tracker.db.db_client import DBClient, TABLE_NAME
+from .common import temporary_db, insert_rows, best_of
+from .generator import ledger_rows
+
+LEGACY_LIST = f'''
+    SELECT id, amount_cents, description, date, category FROM {TABLE_NAME}
+    WHERE strftime('%m', date) = ? AND strftime('%Y', date) = ?
+    ORDER BY date
+    LIMIT ? OFFSET ?
+'''
+LEGACY_SUMMARY = f'''
+    SELECT category, SUM(amount_cents) FROM {TABLE_NAME}
+    WHERE strftime('%m', date) = ? AND strftime('%Y', date) = ?
+    GROUP BY category
+    ORDER BY category
+'''
+
+
+def run(size: int, repeat: int) -> dict[str, float]:
+    # query the month holding the middle row so neither end of the table is favoured
+    # about 50 rows a day, so the queried month holds the same number of rows at every size
+    days = size // 50 + 1
+    middle = datetime(2015, 1, 1) + timedelta(days=days // 2)
+    month, year = str(middle.month), str(middle.year)
+    with temporary_db("bench_month_filter"):
+        insert_rows(ledger_rows(size, days=days))
+        connection = DBClient.get_connection()
+        return {
+            "legacy_list": best_of(lambda: connection.execute(
+                LEGACY_LIST, (f"{middle.month:02d}", year, 20, 0)).fetchall(), repeat),
+            "range_list": best_of(lambda: DBClient.list_expenses(month, year), repeat),
+            "legacy_summary": best_of(lambda: connection.execute(
+                LEGACY_SUMMARY, (f"{middle.month:02d}", year)).fetchall(), repeat),
+            "range_summary": best_of(lambda: DBClient.summary(month, year), repeat),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy list':>12} {'range list':>12} {'legacy summ':>12} {'range summ':>12}")
+    for size in args.sizes:
+        result = run(size, args.repeat)
+        print(f"{size:>10} " + " ".join(f"{value * 1000:>10.2f}ms" for value in result.values()))
+
+
+if __name__ == "__main__":
+    main()
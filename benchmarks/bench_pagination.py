@@ -0,0 +1,43 @@
+"""
+Compare OFFSET pagination with keyset (cursor) pagination in DBClient.list_expenses.
+
+All rows land in a single busy month; OFFSET pages get slower the deeper they are,
+while cursor pages seek straight to the next row.
+
+Usage: python -m benchmarks.bench_pagination --rows 200000 --pages 1 100 1000 5000
+"""
+import argparse
+
+from expense_tracker.db.db_client import DBClient, TABLE_NAME
+from .common import temporary_db, insert_rows, best_of
+from .generator import ledger_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--pages", type=int, nargs="+",
+                        default=[1, 100, 1000, 5000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with temporary_db("bench_pagination"):
+        # squeeze every row into January 2015
+        insert_rows(ledger_rows(args.rows, days=31))
+        connection = DBClient.get_connection()
+        print(f"{'page':>8} {'offset':>12} {'cursor':>12}")
+        for page in args.pages:
+            # the cursor of page N is the last row of page N - 1
+            previous = connection.execute(
+                f"SELECT date, id FROM {TABLE_NAME} ORDER BY date, id LIMIT 1 OFFSET ?",
+                ((page - 1) * args.limit - 1,)).fetchone() if page > 1 else None
+            offset_time = best_of(lambda: DBClient.list_expenses(
+                "1", "2015", page, args.limit), args.repeat)
+            cursor_time = best_of(lambda: DBClient.list_expenses(
+                "1", "2015", limit=args.limit, after=previous), args.repeat)
+            print(f"{page:>8} {offset_time * 1000:>10.2f}ms {cursor_time * 1000:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
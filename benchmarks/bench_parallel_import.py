@@ -0,0 +1,47 @@
+"""
+Compare the single process CSV import with Importer.run_parallel
+for several worker counts and report the speedup.
+
+Usage: python -m benchmarks.bench_parallel_import --rows 1000000 --workers 2 4 8
+"""
+import os
+import time
+import argparse
+
+from expense_tracker.importer import Importer
+from .common import temporary_db, temporary_file, write_import_csv
+from .generator import ledger_rows
+
+
+def timed(load) -> float:
+    start = time.perf_counter()
+    load()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    with temporary_file(".csv") as path:
+        # leave categories empty so the workers also pay for auto categorisation
+        write_import_csv(path, ((amount, description, date, "")
+                                for amount, description, date, _ in ledger_rows(args.rows)))
+        with temporary_db("bench_parallel_import"):
+            baseline = timed(lambda: Importer.run_rows(
+                Importer.read_csv(path), args.batch_size))
+        print(f"cpus: {os.cpu_count()}")
+        print(f"{'workers':>8} {'seconds':>9} {'rows/s':>12} {'speedup':>8}")
+        print(f"{1:>8} {baseline:>9.2f} {args.rows / baseline:>12,.0f} {1:>7.2f}x")
+        for workers in args.workers:
+            with temporary_db("bench_parallel_import"):
+                elapsed = timed(lambda: Importer.run_parallel(
+                    path, workers, args.batch_size))
+            print(f"{workers:>8} {elapsed:>9.2f} {args.rows / elapsed:>12,.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Time a two year report built from one 'summary --month --year' process per month
+against a single 'summary --from --to --by month' process.
+
+Usage: python -m benchmarks.bench_period_summary --rows 1000000
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+from expense_tracker.config import Config
+from expense_tracker.utils import Utils
+from .common import temporary_db, insert_rows
+from .generator import ledger_rows
+
+
+def run_cli(*args: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "expense_tracker.main", *args],
+                   check=True, stdout=subprocess.DEVNULL, env=os.environ.copy())
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with temporary_db("bench_period_summary"):
+        # spread the rows over 2015-01 .. 2016-12
+        insert_rows(ledger_rows(args.rows, days=731))
+        os.environ[Config.ENV_DB_NAME] = "bench_period_summary"
+        months = list(Utils.month_ordinals.keys())
+        per_month = sum(run_cli("summary", "--month", month, "--year", str(year))
+                        for year in (2015, 2016) for month in months)
+        single = run_cli("summary", "--from", "2015-01",
+                         "--to", "2016-12", "--by", "month")
+    print(f"rows: {args.rows:,}")
+    print(f"24 x summary --month --year: {per_month:.2f}s")
+    print(f"1 x summary --from --to:      {single:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Time rendering list rows (str(Expense), as printed by the list command) with the
+legacy per-call locale setup in Utils.format_currency against the cached CurrencyFormatter.
+
+Usage: python -m benchmarks.bench_render --rows 100000
+"""
+import time
+import locale
+import argparse
+import platform
+from datetime import datetime
+
+from expense_tracker.utils import Utils
+from expense_tracker.models.expense import Expense
+from .generator import ledger_rows
+
+
+def legacy_format_currency(amount: float) -> str:
+    """Utils.format_currency before the formatter was cached."""
+    try:
+        loc = locale.getlocale()
+        if loc == (None, None):
+            if platform.system() == "Windows":
+                locale.setlocale(
+                    locale.LC_ALL, "English_United States.1252")
+            else:
+                locale.setlocale(locale.LC_ALL, "en_US.UTF-8")
+    except Exception:
+        if platform.system() == "Windows":
+            locale.setlocale(locale.LC_ALL, "English_United States.1252")
+        else:
+            locale.setlocale(locale.LC_ALL, "en_US.UTF-8")
+    try:
+        return locale.currency(amount, grouping=True)
+    except Exception:
+        return f"${amount:,.2f}"
+
+
+def render(expenses: list[Expense]) -> float:
+    start = time.perf_counter()
+    "\n".join([str(expense) for expense in expenses])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    expenses = [
+        Expense(amount, description, datetime.fromisoformat(date), category, id)
+        for id, (amount, description, date, category) in enumerate(ledger_rows(args.rows), start=1)
+    ]
+    formatter = Utils.format_currency
+    print(f"locale: {locale.getlocale()}")
+    try:
+        Utils.format_currency = staticmethod(legacy_format_currency)
+        legacy_time = render(expenses)
+    finally:
+        Utils.format_currency = formatter
+    cached_time = render(expenses)
+    print(f"legacy: {legacy_time:.2f}s ({args.rows / legacy_time:,.0f} rows/s)")
+    print(f"cached: {cached_time:.2f}s ({args.rows / cached_time:,.0f} rows/s)")
+    print(f"speedup: {legacy_time / cached_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
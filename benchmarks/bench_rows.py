@@ -0,0 +1,68 @@
+"""
+Compare the time and peak memory of reading every row with DBClient.get_all() as
+Expense objects (eager datetime parsing, per-instance __dict__) against ExpenseRow tuples.
+
+Usage: python -m benchmarks.bench_rows --rows 1000000
+"""
+import argparse
+import tracemalloc
+from datetime import datetime
+
+from expense_tracker.db.db_client import DBClient
+from expense_tracker.models.expense import Expense
+from .common import temporary_db, insert_rows, best_of
+from .generator import ledger_rows
+
+
+class LegacyExpense:
+    """Expense before __slots__, with the category given so nothing is categorised."""
+
+    def __init__(self, amount, description, date, category, id):
+        self.id = id
+        self.amount = amount
+        self.description = description
+        self.date = date
+        self.category = category
+
+
+def read_objects(expense_class) -> list:
+    """DBClient.get_all() before it returned ExpenseRow."""
+    return [
+        expense_class(id=row[0], amount=row[1], description=row[2],
+                      date=datetime.fromisoformat(row[3]), category=row[4])
+        for row in DBClient.iter_rows()
+    ]
+
+
+def measure(read) -> tuple[float, float]:
+    """Returns the best time in seconds and the peak traced memory in MB of one read."""
+    # tracing slows allocation down, so time and memory are measured in separate runs
+    elapsed = best_of(read, repeat=3)
+    tracemalloc.start()
+    rows = read()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del rows
+    return elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    reads = [
+        ("Expense (__dict__)", lambda: read_objects(LegacyExpense)),
+        ("Expense (__slots__)", lambda: read_objects(Expense)),
+        ("ExpenseRow", DBClient.get_all),
+    ]
+    with temporary_db("bench_rows"):
+        insert_rows(ledger_rows(args.rows))
+        print(f"rows: {args.rows:,}")
+        for name, read in reads:
+            elapsed, peak = measure(read)
+            print(f"  {name:<20} {elapsed:6.2f}s  peak {peak:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare finding expenses by a word in their description with a LIKE '%term%' scan
+against DBClient.search on the FTS5 index, ranked and newest first, for rare, medium and common terms, and the
+cost of keeping the index up to date on inserts.
+
+Usage: python -m benchmarks.bench_search --rows 1000000
+"""
+import os
+import argparse
+
+from expense_tracker.config import Config
+from expense_tracker.db.db_client import DBClient, TABLE_NAME
+from .common import temporary_db, best_of
+from .generator import ledger_rows
+
+# (label, LIKE pattern, FTS5 query) from a few hundred to a few hundred thousand matches per million rows
+TERMS = [
+    ("rare", "%dentist%", '"dentist"'),
+    ("medium", "%uber%", '"uber"'),
+    ("common", "%coffee%", '"coffee"'),
+]
+INSERT_ROWS = 100_000
+
+
+def like_page(pattern: str, limit: int = 20) -> list:
+    """The newest matches without the index: walks the date index until 'limit' rows match."""
+    return DBClient.get_connection().execute(
+        f"SELECT * FROM {TABLE_NAME} WHERE description LIKE ? ORDER BY date DESC LIMIT ?",
+        (pattern, limit)).fetchall()
+
+
+def like_count(pattern: str) -> int:
+    """Every match without the index, what exporting and grepping amounts to: a full scan."""
+    return DBClient.get_connection().execute(
+        f"SELECT count(*) FROM {TABLE_NAME} WHERE description LIKE ?", (pattern,)).fetchone()[0]
+
+
+def count_matches(query: str) -> int:
+    return DBClient.get_connection().execute(
+        "SELECT count(*) FROM expenses_fts WHERE expenses_fts MATCH ?", (query,)).fetchone()[0]
+
+
+def insert_time(with_index: bool) -> float:
+    """Best time to insert INSERT_ROWS rows, with or without the search index triggers."""
+    def insert():
+        with temporary_db("bench_search_insert"):
+            if not with_index:
+                with DBClient.get_connection() as connection:
+                    for trigger in ("insert", "delete", "update"):
+                        connection.execute(f"DROP TRIGGER expenses_fts_{trigger}")
+            DBClient.add_rows(ledger_rows(INSERT_ROWS, seed=1), batch_size=10_000)
+    return best_of(insert, repeat=3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    os.environ[Config.ENV_DB_PROFILE] = "bulk"
+    with temporary_db("bench_search"):
+        DBClient.add_rows(ledger_rows(args.rows), batch_size=10_000)
+        print(f"rows: {args.rows:,}")
+        for label, pattern, query in TERMS:
+            page = best_of(lambda: like_page(pattern), repeat=3)
+            scan = best_of(lambda: like_count(pattern), repeat=3)
+            ranked = best_of(lambda: DBClient.search(query), repeat=3)
+            newest = best_of(lambda: DBClient.search(query, newest=True), repeat=3)
+            print(f"  {label:<7} {count_matches(query):>9,} matches  LIKE newest page {page * 1000:8.2f} ms  "
+                  f"LIKE all {scan * 1000:8.2f} ms  search {ranked * 1000:8.2f} ms  "
+                  f"search --newest {newest * 1000:6.2f} ms")
+
+    without_index, with_index = insert_time(False), insert_time(True)
+    print(f"insert {INSERT_ROWS:,} rows: {without_index:.2f}s without the index, "
+          f"{with_index:.2f}s with it ({with_index / without_index - 1:+.0%})")
+
+
+if __name__ == "__main__":
+    main()
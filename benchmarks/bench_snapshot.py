@@ -0,0 +1,77 @@
+"""
+Compare a CSV round trip (export, then import into an empty ledger) with a binary snapshot:
+file size, export time, reading the file alone and the full import.
+
+Usage: python -m benchmarks.bench_snapshot --rows 100000 1000000
+"""
+import os
+import time
+import argparse
+from collections import deque
+
+from expense_tracker.config import Config
+from expense_tracker.db.db_client import DBClient
+from expense_tracker.exporter import Exporter
+from expense_tracker.importer import Importer
+from expense_tracker.models.output_format import FileFormat
+from expense_tracker.snapshot import Snapshot
+from .common import temporary_db, temporary_file, best_of
+from .generator import ledger_rows
+
+
+def export_csv(path: str):
+    with open(path, "w", newline="") as output:
+        Exporter.write_csv(DBClient.iter_rows(10_000), output)
+
+
+def export_snapshot(path: str):
+    with open(path, "wb") as output:
+        Snapshot.write(DBClient.iter_rows(10_000, cents=True), output)
+
+
+def read_csv(path: str):
+    """Parse every row the way 'import' does, into rows ready for insertion."""
+    deque(((expense.amount, expense.description, expense.date.isoformat(), expense.category)
+           for expense in Importer.read(path, FileFormat.CSV)), maxlen=0)
+
+
+def read_snapshot(path: str):
+    deque(Snapshot.read(path), maxlen=0)
+
+
+def import_time(path: str, run) -> float:
+    """Time of importing a file into a fresh ledger."""
+    with temporary_db("bench_snapshot_import"):
+        start = time.perf_counter()
+        run(path)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    os.environ[Config.ENV_DB_PROFILE] = "bulk"
+    formats = [
+        ("csv", export_csv, read_csv,
+         lambda path: Importer.run(Importer.read(path, FileFormat.CSV), 10_000)),
+        ("snapshot", export_snapshot, read_snapshot,
+         lambda path: Importer.run_snapshot(path, 10_000)),
+    ]
+    for rows in args.rows:
+        print(f"rows: {rows:,}")
+        for name, export, read, load in formats:
+            with temporary_file(f".{name}") as path:
+                with temporary_db("bench_snapshot"):
+                    DBClient.add_rows(ledger_rows(rows), batch_size=10_000)
+                    exported = best_of(lambda: export(path), repeat=3)
+                size = os.path.getsize(path) / 1e6
+                parsed = best_of(lambda: read(path), repeat=3)
+                imported = import_time(path, load)
+            print(f"  {name:<9} {size:7.1f} MB  export {exported:6.2f}s  "
+                  f"read {parsed:6.2f}s  import {imported:6.2f}s  round trip {exported + imported:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
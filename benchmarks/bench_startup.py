@@ -0,0 +1,62 @@
+"""
+Report the cold-start wall time of every CLI command, each run as a new process,
+against a bare interpreter start and 'import typer'.
+
+Usage: python -m benchmarks.bench_startup --rows 10000 --repeat 10
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+from expense_tracker.config import Config
+from .common import temporary_db, temporary_file, insert_rows, write_import_csv
+from .generator import ledger_rows
+
+DB_NAME = "bench_startup"
+
+
+def run(args: list[str], repeat: int) -> float:
+    """Returns the median wall time in milliseconds of running 'args' in a new process."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, env={**os.environ, Config.ENV_DB_NAME: DB_NAME})
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    cli = [sys.executable, "-m", "expense_tracker.main"]
+    with temporary_db(DB_NAME), temporary_file(".csv") as import_file, temporary_file(".ndjson") as export_file:
+        insert_rows(ledger_rows(args.rows))
+        write_import_csv(import_file, ledger_rows(10, seed=1))
+        commands = {
+            "python -c pass": [sys.executable, "-c", "pass"],
+            "import typer": [sys.executable, "-c", "import typer"],
+            "--help": [*cli, "--help"],
+            "init": [*cli, "init"],
+            "add": [*cli, "add", "4.5", "Coffee"],
+            "list": [*cli, "list", "--month", "Jan", "--year", "2015"],
+            "summary": [*cli, "summary", "--month", "Jan", "--year", "2015"],
+            "summary --from": [*cli, "summary", "--from", "2015-01", "--to", "2015-12"],
+            "analyze": [*cli, "analyze", "--from", "2015-01-01", "--to", "2015-01-31"],
+            "export": [*cli, "export", "--output", export_file, "--format", "ndjson"],
+            "import": [*cli, "import", "--file", import_file],
+            "rebuild-summary": [*cli, "rebuild-summary", "--check"],
+        }
+        print(f"rows: {args.rows:,}, median of {args.repeat} runs")
+        for name, command in commands.items():
+            print(f"  {name:<16} {run(command, args.repeat):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
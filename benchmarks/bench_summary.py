@@ -0,0 +1,57 @@
+"""
+Compare DBClient.summary, which reads the trigger maintained monthly totals,
+with aggregating a month of raw expenses, and show what the triggers cost on insert.
+
+Usage: python -m benchmarks.bench_summary --rows-per-month 10000 100000 1000000
+"""
+import time
+import argparse
+
+from expense_tracker.db.db_client import DBClient, TABLE_NAME, SUMMARY_TABLE_NAME
+from .common import temporary_db, insert_rows, best_of
+from .generator import ledger_rows
+
+RAW_SUMMARY = f'''
+    SELECT category, SUM(amount_cents) FROM {TABLE_NAME}
+    WHERE date >= ? AND date < ?
+    GROUP BY category
+    ORDER BY category
+'''
+
+
+def timed_insert(rows: int) -> float:
+    start = time.perf_counter()
+    # January and February 2015
+    insert_rows(ledger_rows(rows, days=59))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows-per-month", type=int, nargs="+",
+                        default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'month rows':>10} {'raw summary':>12} {'rollup':>10} {'insert':>12} {'no triggers':>12}")
+    for size in args.rows_per_month:
+        # two months of data, the first one is summarised
+        with temporary_db("bench_summary"):
+            insert_time = timed_insert(size * 2)
+            connection = DBClient.get_connection()
+            raw_time = best_of(lambda: connection.execute(
+                RAW_SUMMARY, ("2015-01-01", "2015-02-01")).fetchall(), args.repeat)
+            rollup_time = best_of(
+                lambda: DBClient.summary("1", "2015"), args.repeat)
+        with temporary_db("bench_summary"):
+            connection = DBClient.get_connection()
+            for trigger in ("insert", "delete", "update"):
+                connection.execute(
+                    f"DROP TRIGGER {SUMMARY_TABLE_NAME}_{trigger}")
+            plain_insert_time = timed_insert(size * 2)
+        print(f"{size:>10} {raw_time * 1000:>10.2f}ms {rollup_time * 1000:>8.3f}ms "
+              f"{size * 2 / insert_time:>8,.0f}/s {size * 2 / plain_insert_time:>10,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
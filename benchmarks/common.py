@@ -0,0 +1,70 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import csv
+import time
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from expense_tracker.config import Config
+from expense_tracker.db.db_client import DBClient, TABLE_NAME
+from expense_tracker.utils import Utils
+
+
+@contextmanager
+def temporary_db(name: str) -> Iterator[None]:
+    """Point DB_NAME at a freshly initialized database and remove it afterwards."""
+    previous_name = os.environ.get(Config.ENV_DB_NAME)
+    os.environ[Config.ENV_DB_NAME] = name
+    DBClient.init_db()
+    try:
+        yield
+    finally:
+        # the tuple returned by PRAGMA database_list has the format (seq, name, file)
+        db_path = DBClient.get_connection().execute(
+            "PRAGMA database_list;").fetchone()[2]
+        DBClient.close_connections()
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        if previous_name is None:
+            del os.environ[Config.ENV_DB_NAME]
+        else:
+            os.environ[Config.ENV_DB_NAME] = previous_name
+
+
+def insert_rows(rows: Iterator[tuple]):
+    """Bulk insert raw row tuples into the current database, amounts converted to cents."""
+    with DBClient.get_connection() as connection:
+        connection.executemany(
+            f"INSERT INTO {TABLE_NAME} (amount_cents, description, date, category) VALUES (?, ?, ?, ?)",
+            ((Utils.to_cents(amount), description, date, category) for amount, description, date, category in rows))
+        connection.commit()
+
+
+def best_of(func: Callable[[], object], repeat: int = 5) -> float:
+    """Return the fastest of 'repeat' timed calls in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def write_import_csv(path: str, rows: Iterator[tuple]):
+    """Write (amount, description, date, category) tuples as an import CSV file."""
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerow(("amount", "description", "date", "category"))
+        writer.writerows(rows)
+
+
+@contextmanager
+def temporary_file(suffix: str) -> Iterator[str]:
+    """Yield a path in the temp directory and remove the file afterwards."""
+    path = os.path.join(tempfile.gettempdir(), f"expense_tracker_bench{suffix}")
+    try:
+        yield path
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,103 @@
+"""
+Deterministic synthetic ledgers for benchmarks.
+
+Rows look like a real personal ledger: small everyday purchases make up most of the
+expenses, amounts follow a per category log-normal distribution, weekends are busier
+and some descriptions carry reference numbers or no keyword at all (so they fall back
+to "Other"). The same 'seed' always produces the same rows.
+"""
+import math
+import random
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Iterator
+
+from expense_tracker.utils import Utils
+
+# (description template, expenses per month, median amount, spread) per kind of spending.
+# '{n}' is replaced with a reference number. The category is whatever auto categorisation says.
+MERCHANTS = [
+    ("Coffee at Starbucks", 30, 5, 0.3),
+    ("Corner cafe", 20, 4, 0.3),
+    ("Lunch with the team", 20, 15, 0.4),
+    ("Dinner at Nando's", 8, 35, 0.5),
+    ("Groceries - Whole Foods", 10, 70, 0.6),
+    ("Supermarket run", 8, 45, 0.6),
+    ("Beer at the local bar", 6, 12, 0.4),
+    ("Uber trip {n}", 10, 18, 0.5),
+    ("Lyft ride", 4, 16, 0.5),
+    ("Metro card top up", 4, 30, 0.2),
+    ("Gas station fuel", 4, 55, 0.3),
+    ("Airline ticket {n}", 0.3, 320, 0.6),
+    ("Parking downtown", 5, 12, 0.4),
+    ("Monthly rent", 1, 1400, 0.05),
+    ("Electricity bill", 1, 90, 0.3),
+    ("Internet provider", 1, 60, 0.05),
+    ("Netflix subscription", 1, 15, 0.01),
+    ("Spotify", 1, 10, 0.01),
+    ("Cinema tickets", 2, 25, 0.3),
+    ("Concert tickets", 0.5, 90, 0.5),
+    ("Amazon order {n}", 8, 40, 0.9),
+    ("New shoes", 0.5, 85, 0.5),
+    ("Electronics store", 0.5, 250, 0.8),
+    ("Gym membership", 1, 45, 0.05),
+    ("Pharmacy", 2, 20, 0.6),
+    ("Dentist appointment", 0.3, 120, 0.4),
+    ("Udemy course", 0.5, 15, 0.3),
+    ("University tuition", 0.1, 2500, 0.2),
+    ("Bank fee", 2, 5, 0.3),
+    ("Insurance premium", 1, 110, 0.1),
+    ("ATM withdrawal fee", 2, 3, 0.2),
+    ("Barber", 1, 25, 0.2),
+    ("Charity donation", 1, 30, 0.7),
+    ("Venmo payment {n}", 6, 35, 0.9),
+    ("Card purchase {n}", 8, 28, 0.9),
+    ("Birthday present", 0.5, 50, 0.6),
+]
+# the weekday share of a week's expenses, Mon = 0
+WEEKDAY_WEIGHTS = [0.9, 0.9, 1.0, 1.0, 1.2, 1.6, 1.4]
+
+
+def ledger_rows(
+        count: int,
+        seed: int = 0,
+        start: datetime = datetime(2015, 1, 1),
+        days: int = 3650
+) -> Iterator[tuple[float, str, str, str]]:
+    """
+    Yield 'count' (amount, description, date, category) tuples in date order,
+    spread over 'days' days from 'start'. Rows are generated lazily, so any
+    count (10k to 10M and beyond) runs in constant memory.
+
+    Args:
+        count (int): The number of rows
+        seed (int): The random seed. The same seed gives the same rows
+        start (datetime): The first day of the ledger
+        days (int): The number of days the rows are spread over
+    """
+    rng = random.Random(seed)
+    categories = [Utils.auto_categorise(description.replace("{n}", ""))
+                  for description, _, _, _ in MERCHANTS]
+    cumulative_weights = [*accumulate(weight for _, weight, _, _ in MERCHANTS)]
+    indexes = range(len(MERCHANTS))
+    # rows per day follow the weekday weights and add up to 'count'
+    day_weights = [WEEKDAY_WEIGHTS[(start + timedelta(days=day)).weekday()]
+                   for day in range(days)]
+    scale = count / sum(day_weights)
+    emitted, carry = 0, 0.0
+    for day in range(days):
+        carry += day_weights[day] * scale
+        rows_today = int(carry) if day < days - 1 else count - emitted
+        carry -= rows_today
+        date = start + timedelta(days=day)
+        picks = rng.choices(indexes, cum_weights=cumulative_weights, k=rows_today)
+        # sorted second offsets keep rows within a day in date order too
+        for index, seconds in zip(picks, sorted(rng.randrange(86400) for _ in range(rows_today))):
+            description, _, median, spread = MERCHANTS[index]
+            if "{n}" in description:
+                description = description.replace(
+                    "{n}", str(rng.randrange(100000)))
+            amount = round(median * math.exp(rng.gauss(0, spread)), 2)
+            yield (amount, description, (date + timedelta(seconds=seconds)).isoformat(), categories[index])
+        emitted += rows_today
+
@@ -0,0 +1,234 @@
+"""
+Time every DBClient method and CLI command against temporary databases filled by the
+synthetic ledger generator, and write the results as JSON to track regressions across releases.
+
+Usage: python -m benchmarks.suite --rows 10000 100000 1000000 --output results.json
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import platform
+import statistics
+import subprocess
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable
+
+from typer.testing import CliRunner
+
+from expense_tracker.cli import app
+from expense_tracker.config import Config
+from expense_tracker.db.db_client import DBClient, TABLE_NAME
+from expense_tracker.models.expense import Expense
+from expense_tracker.models.period import Period
+from .common import temporary_db, temporary_file, write_import_csv
+from .generator import ledger_rows
+
+DB_NAME = "bench_suite"
+# rows written by the add_many, add_rows and import benchmarks
+WRITE_ROWS = 10_000
+# benchmarks adding expenses. The rows they add are deleted after every run, so each run
+# inserts new rows instead of timing the duplicate skip and the ledger keeps its size
+WRITES = {"DBClient.add", "DBClient.add_many", "DBClient.add_rows", "cli add", "cli import csv"}
+# single row inserts timed by the add benchmark
+ADD_ROWS = 100
+# the ledger covers 2015-2024, these fall in the middle of it
+MONTH, MONTH_ORDINAL, YEAR = "Jun", "6", "2020"
+
+
+def consume(iterator):
+    """Exhaust an iterator without keeping its items."""
+    deque(iterator, maxlen=0)
+
+
+def cli(*args: str) -> Callable[[], None]:
+    """Returns a function running a CLI command in process and failing if it fails."""
+    runner = CliRunner()
+
+    def invoke():
+        result = runner.invoke(app, [*args])
+        if result.exit_code != 0:
+            raise RuntimeError(f"'{" ".join(args)}' failed: {result.output}")
+    return invoke
+
+
+def benchmarks(import_file: str, export_file: str) -> list[tuple[str, int, Callable[[], object]]]:
+    """Returns (name, operations per call, function) of every benchmark."""
+    start, end = f"{YEAR}-06-01T00:00:00", f"{YEAR}-07-01T00:00:00"
+    write_rows = [*ledger_rows(WRITE_ROWS, seed=1)]
+    expenses = [Expense(amount, description, datetime.fromisoformat(date), category)
+                for amount, description, date, category in write_rows]
+    return [
+        ("DBClient.init_db", 1, DBClient.init_db),
+        ("DBClient.get_tables", 1, DBClient.get_tables),
+        ("DBClient.add", ADD_ROWS, lambda: [DBClient.add(expense.to_dict())
+                                            for expense in expenses[:ADD_ROWS]]),
+        ("DBClient.add_many", WRITE_ROWS, lambda: DBClient.add_many(expenses)),
+        ("DBClient.add_rows", WRITE_ROWS, lambda: DBClient.add_rows(write_rows)),
+        ("DBClient.iter_rows", 1, lambda: consume(DBClient.iter_rows())),
+        ("DBClient.iter_columns", 1, lambda: consume(DBClient.iter_columns())),
+        ("DBClient.get_all", 1, DBClient.get_all),
+        ("DBClient.list_expenses first page", 1,
+         lambda: DBClient.list_expenses(MONTH_ORDINAL, YEAR)),
+        ("DBClient.list_expenses offset page", 1,
+         lambda: DBClient.list_expenses(MONTH_ORDINAL, YEAR, page=50)),
+        ("DBClient.list_expenses cursor page", 1,
+         lambda: DBClient.list_expenses(MONTH_ORDINAL, YEAR, after=(f"{YEAR}-06-28", 0))),
+        ("DBClient.summary", 1, lambda: DBClient.summary(MONTH_ORDINAL, YEAR)),
+        ("DBClient.summary_by_period", 1,
+         lambda: DBClient.summary_by_period("2015-01", "2024-12", Period.QUARTER)),
+        ("DBClient.check_summary", 1, DBClient.check_summary),
+        ("DBClient.rebuild_summary", 1, DBClient.rebuild_summary),
+        ("cli add", 1, cli("add", "4.5", "Coffee at Starbucks")),
+        ("cli list", 1, cli("list", "--month", MONTH, "--year", YEAR)),
+        ("cli summary", 1, cli("summary", "--month", MONTH, "--year", YEAR)),
+        ("cli summary --from --to", 1,
+         cli("summary", "--from", "2015-01", "--to", "2024-12", "--by", "year")),
+        ("cli analyze", 1, cli("analyze", "--from",
+         start[:10], "--to", end[:10], "--by", "day")),
+        ("cli export csv", 1, cli("export", "--output", export_file)),
+        ("cli export ndjson", 1, cli("export", "--output",
+         export_file, "--format", "ndjson")),
+        ("cli export snapshot", 1, cli("export", "--output",
+         export_file, "--format", "snapshot")),
+        ("cli import csv", WRITE_ROWS, cli("import", "--file", import_file)),
+        ("cli rebuild-summary --check", 1, cli("rebuild-summary", "--check")),
+    ]
+
+
+def time_runs(func: Callable[[], object], repeat: int, reset: Callable[[], None] | None = None) -> list[float]:
+    """Returns the wall time in seconds of 'repeat' calls, calling 'reset' untimed after each one."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+        if reset is not None:
+            reset()
+    return timings
+
+
+def remove_added_rows() -> Callable[[], None]:
+    """Returns a function deleting every expense added after this call."""
+    connection = DBClient.get_connection()
+    last_id = connection.execute(f"SELECT coalesce(max(id), 0) FROM {TABLE_NAME}").fetchone()[0]
+
+    def remove():
+        with connection:
+            connection.execute(f"DELETE FROM {TABLE_NAME} WHERE id > ?", (last_id,))
+    return remove
+
+
+def result(name: str, rows: int, ops: int, timings: list[float]) -> dict:
+    best = min(timings)
+    return {
+        "name": name,
+        "rows": rows,
+        "ops": ops,
+        "runs": timings,
+        "best": best,
+        "median": statistics.median(timings),
+        "best_per_op": best / ops,
+    }
+
+
+def environment() -> dict:
+    """Describe the machine and source tree the results came from."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def run_suite(rows: int, repeat: int, seed: int, only: list[str]) -> list[dict]:
+    results = []
+    with temporary_db(DB_NAME), temporary_file(".csv") as import_file, temporary_file(".out") as export_file:
+        # fill the ledger with the bulk profile, then measure with the configured one
+        profile = os.environ.get(Config.ENV_DB_PROFILE)
+        os.environ[Config.ENV_DB_PROFILE] = "bulk"
+        start = time.perf_counter()
+        DBClient.add_rows(ledger_rows(rows, seed), batch_size=10_000)
+        results.append(result("populate (bulk profile)", rows, rows,
+                              [time.perf_counter() - start]))
+        if profile is None:
+            del os.environ[Config.ENV_DB_PROFILE]
+        else:
+            os.environ[Config.ENV_DB_PROFILE] = profile
+        # blank categories make the import auto categorise every row
+        write_import_csv(import_file, ((amount, description, date, "")
+                         for amount, description, date, _ in ledger_rows(WRITE_ROWS, seed + 2)))
+        for name, ops, func in benchmarks(import_file, export_file):
+            if only and not any(pattern in name for pattern in only):
+                continue
+            reset = remove_added_rows() if name in WRITES else None
+            results.append(result(name, rows, ops, time_runs(func, repeat, reset)))
+            print(f"{rows:>10,} {name:<36} {results[-1]['best'] * 1000:10.2f} ms",
+                  file=sys.stderr)
+    return results
+
+
+def compare(results: list[dict], baseline_path: str, threshold: float) -> int:
+    """Print the change of every benchmark against a previous report and return the number of regressions."""
+    with open(baseline_path) as baseline_file:
+        baseline = {(entry["name"], entry["rows"]): entry["best"]
+                    for entry in json.load(baseline_file)["results"]}
+    regressions = 0
+    for entry in results:
+        previous = baseline.get((entry["name"], entry["rows"]))
+        if previous is None or previous == 0:
+            continue
+        ratio = entry["best"] / previous
+        regressed = ratio > 1 + threshold
+        regressions += regressed
+        print(f"{entry['rows']:>10,} {entry['name']:<36} {ratio:6.2f}x{'  REGRESSION' if regressed else ''}",
+              file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000],
+                        help="Ledger sizes to run the suite against, eg: 10000 1000000 10000000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", default=[],
+                        help="Only run benchmarks whose name contains one of these")
+    parser.add_argument("--output", default="-",
+                        help="File to write the JSON results to. '-' writes to stdout")
+    parser.add_argument("--baseline",
+                        help="A previous JSON report. Exits with 1 if any benchmark got slower than --threshold")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Slowdown treated as a regression. Defaults to 0.2 (20%%)")
+    args = parser.parse_args()
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "environment": environment(),
+        "results": [entry for rows in args.rows
+                    for entry in run_suite(rows, args.repeat, args.seed, args.only)],
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if args.baseline is not None and compare(report["results"], args.baseline, args.threshold) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+from array import array
+from bisect import bisect_left
+from datetime import date
+from heapq import nlargest
+from itertools import accumulate, compress
+from typing import Iterable, Sequence
+
+from .models.group_key import GroupKey
+from .models.expense_summary import GroupTotal, DailyTotal
+from .utils import Utils
+
+try:
+    import numpy
+except ImportError:
+    # numpy is an optional accelerator, every operation has a pure python path
+    numpy = None
+
+# epoch days count from 1970-01-01, which was a Thursday
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def epoch_day(value: date) -> int:
+    """Returns the number of days from 1970-01-01 to 'value'."""
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def epoch_day_to_date(day: int) -> date:
+    """Returns the date 'day' days after 1970-01-01."""
+    return date.fromordinal(day + EPOCH_ORDINAL)
+
+
+class Ledger:
+    """
+    Columnar, in-memory copy of the expenses for ad-hoc analysis.
+
+    Every expense is a position in four parallel typed arrays: ids, amounts in cents,
+    epoch days and category codes. Amounts are whole cents, so totals are added up exactly as integers. Category names are interned once in 'categories', so a million
+    rows cost a few bytes each instead of an Expense object with a datetime and strings.
+    Operations run over whole columns, with numpy when it is installed.
+
+    Rows are kept in date order, which lets date ranges be cut with a binary search.
+    """
+
+    def __init__(self, categories: Sequence[str] = (), use_numpy: bool | None = None):
+        """
+        Args:
+            categories (Sequence[str]): Category names, in code order
+            use_numpy (bool): Run operations with numpy. Defaults to whether numpy is installed
+        """
+        if use_numpy and numpy is None:
+            raise ValueError("numpy is not installed")
+        self.use_numpy = numpy is not None if use_numpy is None else use_numpy
+        self.ids = array("q")
+        self.cents = array("q")
+        self.days = array("i")
+        self.codes = array("I")
+        self.categories = [*categories]
+        self._category_codes = {name: code for code,
+                                name in enumerate(self.categories)}
+
+    def __len__(self) -> int:
+        return len(self.cents)
+
+    @staticmethod
+    def from_rows(rows: Iterable[tuple[int, int, int, str]], use_numpy: bool | None = None) -> "Ledger":
+        """
+        Build a ledger from (id, amount in cents, epoch day, category) tuples in date order,
+        as streamed by DBClient.iter_columns.
+
+        Args:
+            rows (Iterable[tuple]): The rows to load. Usually a generator
+            use_numpy (bool): See Ledger
+        """
+        ledger = Ledger(use_numpy=use_numpy)
+        ids, cents, days, codes = ledger.ids, ledger.cents, ledger.days, ledger.codes
+        intern = ledger.category_code
+        for id, amount_cents, day, category in rows:
+            ids.append(id)
+            cents.append(amount_cents)
+            days.append(day)
+            codes.append(intern(category))
+        return ledger
+
+    @staticmethod
+    def load(start: date | None = None, end: date | None = None, use_numpy: bool | None = None) -> "Ledger":
+        """
+        Load the expenses of the current database, optionally limited to a date range.
+
+        Args:
+            start (date): The first day to load
+            end (date): The last day to load (inclusive)
+            use_numpy (bool): See Ledger
+        """
+        # imported here so the rest of the module stays usable without a database
+        from .db.db_client import DBClient
+        return Ledger.from_rows(DBClient.iter_columns(
+            start.isoformat() if start is not None else None,
+            epoch_day_to_date(epoch_day(end) + 1).isoformat() if end is not None else None
+        ), use_numpy)
+
+    def category_code(self, category: str) -> int:
+        """Returns the code of a category name, interning new names."""
+        code = self._category_codes.get(category)
+        if code is None:
+            code = self._category_codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def total(self) -> int:
+        """Returns the sum of every amount in cents."""
+        if self.use_numpy:
+            return int(self._column(self.cents).sum())
+        return sum(self.cents)
+
+    def filter(
+            self,
+            start: date | None = None,
+            end: date | None = None,
+            categories: Iterable[str] | None = None,
+            min_amount: float | None = None,
+            max_amount: float | None = None
+    ) -> "Ledger":
+        """
+        Returns a new ledger with the rows matching every given condition.
+
+        Args:
+            start (date): The first day to keep
+            end (date): The last day to keep (inclusive)
+            categories (Iterable[str]): The categories to keep
+            min_amount (float): The smallest amount to keep
+            max_amount (float): The largest amount to keep
+        """
+        # rows are in date order, so a date range is a contiguous slice
+        low = bisect_left(self.days, epoch_day(start)) if start is not None else 0
+        high = bisect_left(self.days, epoch_day(
+            end) + 1) if end is not None else len(self)
+        result = Ledger(self.categories, self.use_numpy)
+        columns = ((self.ids, result.ids), (self.cents, result.cents),
+                   (self.days, result.days), (self.codes, result.codes))
+        mask = self._mask(low, high, categories,
+                          Utils.to_cents(min_amount) if min_amount is not None else None,
+                          Utils.to_cents(max_amount) if max_amount is not None else None)
+        for source, target in columns:
+            if mask is None:
+                target.extend(source[low:high])
+            elif self.use_numpy:
+                target.frombytes(self._column(source)[low:high][mask].tobytes())
+            else:
+                target.extend(compress(source[low:high], mask))
+        return result
+
+    def group_by(self, key: GroupKey) -> list[GroupTotal]:
+        """
+        Returns the total and count of every non empty group. Categories are sorted by name,
+        every other key in calendar order.
+
+        Args:
+            key (GroupKey): What to group the expenses by. eg: category, month, weekday
+        """
+        if len(self) == 0:
+            return []
+        index, labels = self._group_index(key)
+        if self.use_numpy:
+            # bincount only adds float weights, add.at keeps the totals in int64
+            totals = numpy.zeros(len(labels), dtype="int64")
+            numpy.add.at(totals, index, self._column(self.cents))
+            totals = totals.tolist()
+            counts = numpy.bincount(index, minlength=len(labels)).tolist()
+        else:
+            totals = [0] * len(labels)
+            counts = [0] * len(labels)
+            for group, amount_cents in zip(index, self.cents):
+                totals[group] += amount_cents
+                counts[group] += 1
+        groups = [GroupTotal(labels[group], totals[group], counts[group])
+                  for group in range(len(labels)) if counts[group] > 0]
+        if key == GroupKey.CATEGORY:
+            groups.sort(key=lambda group: group.label)
+        return groups
+
+    def rolling(self, window: int) -> list[DailyTotal]:
+        """
+        Returns the total of every day from the first to the last expense, with the total of
+        the 'window' days ending on that day. Days without expenses are included with a zero total.
+
+        Args:
+            window (int): The number of days in the window
+        """
+        if window < 1:
+            raise ValueError("The window must be at least one day")
+        if len(self) == 0:
+            return []
+        first = self.days[0]
+        length = self.days[-1] - first + 1
+        if self.use_numpy:
+            daily = numpy.zeros(length, dtype="int64")
+            numpy.add.at(daily, self._column(self.days) - first, self._column(self.cents))
+            prefix = numpy.concatenate(([0], numpy.cumsum(daily)))
+            windows = (prefix[window:] - prefix[:-window]).tolist()
+            # the first days have a partial window
+            windows = prefix[1:min(window, length + 1)].tolist() + windows
+            daily = daily.tolist()
+        else:
+            daily = [0] * length
+            for day, amount_cents in zip(self.days, self.cents):
+                daily[day - first] += amount_cents
+            prefix = [0, *accumulate(daily)]
+            windows = [prefix[day + 1] - prefix[max(day + 1 - window, 0)]
+                       for day in range(length)]
+        return [DailyTotal(epoch_day_to_date(first + day).isoformat(), daily[day], windows[day])
+                for day in range(length)]
+
+    def top_expenses(self, k: int) -> list[tuple[int, str, str, int]]:
+        """
+        Returns the (id, date, category, amount in cents) of the 'k' largest expenses, largest first.
+
+        Args:
+            k (int): The number of expenses to return
+        """
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+        if self.use_numpy:
+            cents = self._column(self.cents)
+            # argpartition finds the k largest in linear time, only those are sorted
+            positions = numpy.argpartition(-cents, k - 1)[:k]
+            positions = positions[numpy.argsort(-cents[positions], kind="stable")].tolist()
+        else:
+            positions = nlargest(k, range(len(self)),
+                                 key=self.cents.__getitem__)
+        return [(self.ids[i], epoch_day_to_date(self.days[i]).isoformat(),
+                 self.categories[self.codes[i]], self.cents[i]) for i in positions]
+
+    def top_groups(self, key: GroupKey, k: int) -> list[GroupTotal]:
+        """
+        Returns the 'k' groups with the largest totals, largest first.
+
+        Args:
+            key (GroupKey): What to group the expenses by
+            k (int): The number of groups to return
+        """
+        return nlargest(k, self.group_by(key), key=lambda group: group.amount_cents)
+
+    def _column(self, column: array):
+        """View an array column as a numpy array without copying it."""
+        return numpy.frombuffer(column, dtype=column.typecode) if len(column) > 0 \
+            else numpy.empty(0, dtype=column.typecode)
+
+    def _mask(
+            self,
+            low: int,
+            high: int,
+            categories: Iterable[str] | None,
+            min_cents: int | None,
+            max_cents: int | None
+    ):
+        """
+        Returns which rows between 'low' and 'high' match the non date conditions,
+        or None when there are none.
+        """
+        conditions = []
+        if categories is not None:
+            codes = {self._category_codes[name]
+                     for name in categories if name in self._category_codes}
+            conditions.append((self.codes, lambda value: value in codes,
+                               lambda column: numpy.isin(column, [*codes])))
+        if min_cents is not None:
+            conditions.append((self.cents, lambda value: value >= min_cents,
+                               lambda column: column >= min_cents))
+        if max_cents is not None:
+            conditions.append((self.cents, lambda value: value <= max_cents,
+                               lambda column: column <= max_cents))
+        if len(conditions) == 0:
+            return None
+        mask = None
+        for column, test, vector_test in conditions:
+            if self.use_numpy:
+                matches = vector_test(self._column(column)[low:high])
+                mask = matches if mask is None else mask & matches
+            else:
+                matches = map(test, column[low:high])
+                mask = [*matches] if mask is None else [
+                    keep and match for keep, match in zip(mask, matches)]
+        return mask
+
+    def _group_index(self, key: GroupKey) -> tuple[Sequence[int], list[str]]:
+        """Returns the group of every row and the label of every group."""
+        if key == GroupKey.CATEGORY:
+            return (self._column(self.codes) if self.use_numpy else self.codes), self.categories
+        first = self.days[0]
+        if key == GroupKey.WEEKDAY:
+            # 1970-01-01 was a Thursday, Mon = 0
+            if self.use_numpy:
+                return (self._column(self.days).astype("int64") + 3) % 7, [*WEEKDAYS]
+            return [(day + 3) % 7 for day in self.days], [*WEEKDAYS]
+        offsets = range(self.days[-1] - first + 1)
+        if key == GroupKey.DAY:
+            labels = [epoch_day_to_date(first + offset).isoformat()
+                      for offset in offsets]
+            if self.use_numpy:
+                return self._column(self.days) - first, labels
+            return [day - first for day in self.days], labels
+        # map every day in the range to its month or year, then look rows up by day
+        label_of = (lambda value: f"{value.year}-{value.month:02d}") if key == GroupKey.MONTH \
+            else (lambda value: str(value.year))
+        labels, lookup = [], []
+        for offset in offsets:
+            label = label_of(epoch_day_to_date(first + offset))
+            if len(labels) == 0 or labels[-1] != label:
+                labels.append(label)
+            lookup.append(len(labels) - 1)
+        if self.use_numpy:
+            return numpy.asarray(lookup)[self._column(self.days) - first], labels
+        return [lookup[day - first] for day in self.days], labels
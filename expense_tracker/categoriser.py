@@ -0,0 +1,114 @@
+import re
+from functools import lru_cache
+from typing import Iterable
+
+DEFAULT_CACHE_SIZE = 65_536
+
+
+class KeywordMatcher:
+    """
+    Finds the category of a description with one precompiled regular expression.
+
+    The result is the same as checking every category in order and returning the
+    first one with a keyword contained in the lower cased description.
+    Results are memoised in an LRU cache keyed on the normalised description,
+    so repeated merchant strings cost a dictionary lookup.
+    """
+
+    def __init__(
+            self,
+            categories: dict[str, list[str]],
+            default: str = "Other",
+            cache_size: int = DEFAULT_CACHE_SIZE
+    ):
+        """
+        Args:
+            categories (dict[str, list[str]]): Keywords per category. Earlier categories win ties
+            default (str): The category returned when no keyword matches
+            cache_size (int): The maximum number of descriptions kept in the cache
+        """
+        self.default = default
+        self.categories = list(categories.keys())
+        precedence: dict[str, int] = {}
+        for index, words in enumerate(categories.values()):
+            for word in words:
+                precedence.setdefault(word.lower(), index)
+        # finding a keyword also finds every keyword contained in it (eg: "barber" contains "bar"),
+        # so each keyword maps to the best category among its substrings
+        self._precedence = {
+            word: min(index for other, index in precedence.items() if other in word)
+            for word in precedence
+        }
+        self._pattern = re.compile(_trie_pattern(precedence.keys()))
+        self._match_normalised = lru_cache(maxsize=cache_size)(self._search)
+
+    def match(self, description: str) -> str:
+        """
+        Return the category of a description.
+
+        Args:
+            description (str): the expense description
+        """
+        return self._match_normalised(normalise_description(description))
+
+    def match_many(self, descriptions: Iterable[str]) -> list[str]:
+        """
+        Return the category of every description, in order.
+
+        Args:
+            descriptions (Iterable[str]): the expense descriptions
+        """
+        match = self._match_normalised
+        return [match(normalise_description(description)) for description in descriptions]
+
+    def cache_info(self):
+        """Return the (hits, misses, maxsize, currsize) statistics of the cache."""
+        return self._match_normalised.cache_info()
+
+    def _search(self, description_lower: str) -> str:
+        """Find the category of a normalised description."""
+        search = self._pattern.search
+        best = None
+        position = 0
+        # the trie pattern returns the longest keyword at the leftmost position,
+        # restart one character later to see keywords that overlap it
+        while (found := search(description_lower, position)) is not None:
+            index = self._precedence[found.group()]
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+            position = found.start() + 1
+        return self.default if best is None else self.categories[best]
+
+
+def normalise_description(description: str) -> str:
+    """
+    Lower case and trim a description. Keywords never start or end with whitespace,
+    so this does not change which keywords are found.
+    """
+    return description.strip().lower()
+
+
+def _trie_pattern(words) -> str:
+    """
+    Build a regular expression matching any of the words, factored as a trie
+    (eg: bar, barber, bank = ba(?:nk|r(?:ber)?)) so each position only tries a few branches.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{"|".join(branches)})"
+        # a word ends here, the rest is optional and greedy so the longest word wins
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
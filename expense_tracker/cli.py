@@ -1,31 +1,116 @@
 import os
-import json
-from typing import Optional
-from rich.text import Text
-from rich.console import Console
-from rich.table import Table, Column
-from rich import box
-from typing_extensions import Annotated
+import time
+from typing import TYPE_CHECKING, Annotated, List, Optional, Sequence
 
 import typer
-from .utils import Utils
 from .config import Config
-from .db.db_client import DBClient
-from .models.expense import Expense
+from .profiler import Profiler
 from .models.output_format import FileFormat
+from .models.period import Period
+from .models.group_key import GroupKey
+
+# everything else (rich, sqlite3, the models and the categoriser) is imported by the
+# commands that use it, so a script calling 'add' does not pay for 'analyze' or 'export'
+if TYPE_CHECKING:
+    from .models.expense_summary import PeriodSummary
+
+
+class _LazyConsole:
+    """A rich Console that is only created, and rich only imported, when first used."""
+
+    def __init__(self, **options):
+        self._options = options
+        self._console = None
+
+    def __getattr__(self, name: str):
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console(**self._options)
+        return getattr(self._console, name)
+
 
 app = typer.Typer()
-console = Console()
+console = _LazyConsole()
+err_console = _LazyConsole(stderr=True)
 
 
 @app.callback()
-def main(name: Annotated[Optional[str], typer.Option(
-        help=f"Refers to the users' whose expenses are being tracked. Can be set through and environment variable {Config.ENV_DB_NAME}")] = None):
+def main(
+    ctx: typer.Context,
+    name: Annotated[Optional[str], typer.Option(
+        help=f"Refers to the users' whose expenses are being tracked. Can be set through and environment variable {Config.ENV_DB_NAME}")] = None,
+    db_profile: Annotated[Optional[str], typer.Option(
+        help=f"SQLite tuning profile: durable, fast or bulk. Defaults to durable. Can be set through the environment variable {Config.ENV_DB_PROFILE}")] = None,
+    profile: Annotated[bool, typer.Option(
+        help="Print the time spent per phase (connect, query, materialise, render), the rows fetched and the peak memory")] = False,
+    trace: Annotated[bool, typer.Option(
+        help="Like --profile, and also list every SQL statement with its time")] = False,
+    profile_json: Annotated[Optional[str], typer.Option(
+        help="Write the --profile or --trace measurements as JSON to this file instead of printing them. Use '-' for stderr")] = None
+):
     """
     Expense Tracker CLI Application.
     """
     if (name is not None):
         os.environ[Config.ENV_DB_NAME] = name
+    if (db_profile is not None):
+        os.environ[Config.ENV_DB_PROFILE] = db_profile
+    if profile or trace or profile_json is not None:
+        Profiler.start(trace_sql=trace)
+        # runs after the command, even when it fails
+        ctx.call_on_close(lambda: _report_profile(
+            ctx.invoked_subcommand, profile_json))
+
+
+def _report_profile(command: str | None, json_path: str | None):
+    """Stop profiling and print the measurements to stderr, or write them as JSON."""
+    profile = Profiler.stop()
+    if profile is None:
+        return
+    report = {"command": command, **profile.report()}
+    if json_path is not None:
+        import json
+        if json_path == "-":
+            err_console.file.write(json.dumps(report, indent=2) + "\n")
+        else:
+            with open(json_path, "w") as output:
+                json.dump(report, output, indent=2)
+        return
+    from rich.table import Table, Column
+    from rich import box
+    table = Table(
+        Column(header="Phase"),
+        Column(header="Calls", justify="right"),
+        Column(header="Time", justify="right"),
+        Column(header="Share", justify="right"),
+        title=f"Profile of {command}",
+        title_style="bold",
+        title_justify="left",
+        box=box.SIMPLE,
+        caption="Phases may nest",
+    )
+    for phase, totals in report["phases"].items():
+        table.add_row(phase, str(totals["calls"]), f"{totals["seconds"] * 1000:.2f} ms",
+                      f"{totals["seconds"] / report["wall"]:.1%}")
+    table.add_row("total", "", f"{report["wall"] * 1000:.2f} ms", "100.0%")
+    err_console.print(table)
+    peak = report["peak_memory"]
+    err_console.print(f"Rows fetched: {report["rows"]:,}" +
+                      (f", peak memory: {peak / 2**20:.1f} MB" if peak is not None else ""))
+    if len(report["statements"]) > 0:
+        table = Table(
+            Column(header="#", justify="right"),
+            Column(header="Time", justify="right"),
+            Column(header="SQL", overflow="fold"),
+            title="SQL statements",
+            title_style="bold",
+            title_justify="left",
+            box=box.SIMPLE,
+        )
+        for number, statement in enumerate(report["statements"], start=1):
+            table.add_row(str(number), f"{statement["seconds"] * 1000:.2f} ms",
+                          " ".join(statement["sql"].split()))
+        err_console.print(table)
 
 
 @app.command()
@@ -35,6 +120,7 @@ def init(
     """
     Initialize the expense tracker for a user.
     """
+    from .db.db_client import DBClient
     if (name is not None):
         os.environ[Config.ENV_DB_NAME] = name
     try:
@@ -47,10 +133,31 @@ def init(
 
 
 @app.command()
-def add(amount: Annotated[float, typer.Argument()], description: Annotated[str, typer.Argument()]):
+def add(
+    amount: Annotated[Optional[float], typer.Argument()] = None,
+    description: Annotated[Optional[str], typer.Argument()] = None,
+    stdin: Annotated[bool, typer.Option(
+        "--stdin", help="Add every 'amount<TAB>description[<TAB>date]' line read from stdin")] = False,
+    file: Annotated[Optional[str], typer.Option(
+        help="Add every 'amount<TAB>description[<TAB>date]' line of a file")] = None
+):
     """
-    Add a new expense.
+    Add a new expense, or many from stdin or a file in one transaction.
     """
+    from .utils import Utils
+    if stdin or file is not None:
+        if stdin and file is not None or amount is not None or description is not None:
+            console.print(
+                "[bold red]Error:[/bold red] Provide an amount and a description, --stdin or --file.")
+            raise typer.Exit(code=1)
+        _add_lines("-" if stdin else file)
+        return
+    if amount is None or description is None:
+        console.print(
+            "[bold red]Error:[/bold red] Provide an amount and a description, --stdin or --file.")
+        raise typer.Exit(code=1)
+    from .db.db_client import DBClient
+    from .models.expense import Expense
     # logic to add expense
     try:
         expense = Expense(amount, description)
@@ -58,12 +165,36 @@ def add(amount: Annotated[float, typer.Argument()], description: Annotated[str,
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
         raise typer.Exit(code=1)
-    text = Text()
-    text.append("Added: ")
-    text.append(f"{Utils.format_currency(amount)}", style="bold green")
-    text.append(f" for ")
-    text.append(f"{description}", style="italic yellow")
-    console.print(text)
+    # plain click styling keeps rich out of the most frequently scripted command
+    typer.echo(
+        f"Added: {typer.style(Utils.format_currency(amount), fg="green", bold=True)} "
+        f"for {typer.style(description, fg="yellow", italic=True)}")
+
+
+def _add_lines(file: str):
+    """
+    Add the expenses of every line of a file in one transaction, reporting malformed
+    lines to stderr as they are read. Exits with code 1 if any line was not added.
+    Like single adds, repeated lines are all added: they are purchases, not an overlapping import.
+    """
+    from .importer import Importer
+    errors = 0
+
+    def on_error(error):
+        nonlocal errors
+        errors += 1
+        typer.echo(f"Line {error.line}: {error.message}", err=True)
+
+    try:
+        result = Importer.run_rows(
+            Importer.read_lines(file, on_error), Config.DEFAULT_BATCH_SIZE, skip_duplicates=False)
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        raise typer.Exit(code=1)
+    typer.echo(f"Added {result.count:,} expenses in {result.elapsed:.2f}s ({result.rows_per_second:,.0f} rows/s)")
+    if errors > 0:
+        typer.echo(f"{errors:,} lines could not be added", err=True)
+        raise typer.Exit(code=1)
 
 
 @app.command()
@@ -73,19 +204,174 @@ def list(
     page: Annotated[int, typer.Option(
         help="The page number for paginated results. Defaults to 1")] = 1,
     limit: Annotated[int, typer.Option(
-        help="The number of results to return. Defaults to 20")] = 20
+        help="The number of results to return. Defaults to 20")] = 20,
+    after: Annotated[Optional[str], typer.Option(
+        help="Cursor printed at the end of the previous page, in the format <date>,<id> (<date>,<id>,<name> across users). Takes precedence over --page")] = None,
+    names: Annotated[Optional[List[str]], typer.Option(
+        help="Report across these users' databases instead of --name. Comma separated or repeated. eg: alice,bob")] = None,
+    all_users: Annotated[bool, typer.Option(
+        help="Report across every user's database")] = False,
+    workers: Annotated[Optional[int], typer.Option(
+        help="Threads reading the databases of --names or --all-users. Defaults to the number of CPUs + 4, at most 32", min=1)] = None,
+    timings: Annotated[bool, typer.Option(
+        help="With --names or --all-users, print the time spent reading each database")] = False
 ):
     """
-    List all expenses.
+    List all expenses, of one user or merged across users.
     """
+    from .utils import Utils
+    from .db.db_client import DBClient
     try:
+        users = _user_names(names, all_users)
+        if users is not None:
+            _list_users(users, month, year, page, limit, after, workers, timings)
+            return
         monthOrdinal = Utils.month_text_to_ordinal(month)
-        expenses = DBClient.list_expenses(monthOrdinal, year, page, limit)
-        output = "\n".join([str(expense) for expense in expenses])
+        cursor = Utils.parse_cursor(after) if after is not None else None
+        expenses = DBClient.list_expenses(
+            monthOrdinal, year, page, limit, cursor)
+        next_cursor = None
+        if len(expenses) == limit:
+            last = expenses[-1]
+            next_cursor = (last.date_text, last.id)
+            # a single-row seek past the last row tells whether there is a next page
+            if len(DBClient.list_expenses(monthOrdinal, year, limit=1, after=next_cursor)) == 0:
+                next_cursor = None
+        with Profiler.phase("render"):
+            output = "\n".join([str(expense) for expense in expenses])
+
+            console.print(
+                f"Expenses for [bold yellow]{month}, {year}[/bold yellow]")
+            typer.echo(output)
+            if next_cursor is not None:
+                console.print(
+                    f"Next page: --after [bold]{next_cursor[0]},{next_cursor[1]}[/bold]")
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        raise typer.Exit(code=1)
+
 
+def _list_users(users: List[str], month: str, year: str, page: int, limit: int,
+                after: str | None, workers: int | None, timings: bool):
+    """Print a page of the expenses of many users, ordered by date, and the time spent on each database."""
+    from .utils import Utils
+    from .db.fan_out import FanOut
+    monthOrdinal = Utils.month_text_to_ordinal(month)
+    cursor = Utils.parse_users_cursor(after) if after is not None else None
+    (rows, results), failed = _read_users(
+        lambda: FanOut.list_expenses(users, monthOrdinal, year, page, limit, cursor, workers),
+        users, workers, timings)
+    # list_expenses returns one extra row when there is a next page
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        name, last = rows[-1]
+        next_cursor = f"{last.date_text},{last.id},{name}"
+    with Profiler.phase("render"):
         console.print(
-            f"Expenses for [bold yellow]{month}, {year}[/bold yellow]")
-        typer.echo(output)
+            f"Expenses for [bold yellow]{month}, {year}[/bold yellow] across {len(users):,} users")
+        typer.echo("\n".join([f"{name}: {row}" for name, row in rows]))
+        if next_cursor is not None:
+            console.print(f"Next page: --after [bold]{next_cursor}[/bold]")
+    if failed:
+        raise typer.Exit(code=1)
+
+
+def _user_names(names: List[str] | None, all_users: bool) -> List[str] | None:
+    """The users selected by --names or --all-users, or None to read the --name database."""
+    if not names and not all_users:
+        return None
+    if names and all_users:
+        raise ValueError("Provide --names or --all-users, not both.")
+    from .db.fan_out import FanOut
+    users = FanOut.names() if all_users else [
+        name.strip() for value in names for name in value.split(",") if name.strip() != ""]
+    if len(users) == 0:
+        raise ValueError("No user databases found.")
+    return users
+
+
+def _read_users(read, users: List[str], workers: int | None, timings: bool):
+    """
+    Run a FanOut read and report how long it took, every database that could not be read
+    and, with 'timings', the time spent on each database to stderr.
+    Returns what 'read' returned and whether any database failed.
+    """
+    from .db.fan_out import FanOut
+    start = time.perf_counter()
+    value = read()
+    elapsed = time.perf_counter() - start
+    results = value[1]
+    if timings:
+        from rich.table import Table, Column
+        from rich import box
+        table = Table(
+            Column(header="User"),
+            Column(header="Time", justify="right"),
+            Column(header="Status"),
+            title="Time per database, slowest first",
+            title_style="bold",
+            title_justify="left",
+            box=box.SIMPLE,
+        )
+        for result in sorted(results, key=lambda result: result.elapsed, reverse=True):
+            table.add_row(result.name, f"{result.elapsed * 1000:.2f} ms", result.error or "ok")
+        err_console.print(table)
+    failed = [result for result in results if result.error is not None]
+    for result in failed:
+        err_console.print(f"[bold red]Skipped[/bold red] {result.name}: {result.error}")
+    err_console.print(
+        f"Read {len(results):,} databases in {elapsed:.2f}s with {FanOut.workers(users, workers)} threads")
+    return value, len(failed) > 0
+
+
+@app.command()
+def search(
+    query: Annotated[str, typer.Argument(help="Words to look for in descriptions and categories. End a word with * to match it as a prefix")],
+    from_: Annotated[Optional[str], typer.Option(
+        "--from", help="Only expenses on or after this day, in the format YYYY-MM-DD")] = None,
+    to: Annotated[Optional[str], typer.Option(
+        help="Only expenses on or before this day, in the format YYYY-MM-DD")] = None,
+    category: Annotated[Optional[List[str]], typer.Option(
+        help="Only expenses in this category. Can be repeated")] = None,
+    limit: Annotated[int, typer.Option(
+        help="The number of results to return. Defaults to 20", min=1)] = 20,
+    after: Annotated[Optional[str], typer.Option(
+        help="Cursor printed at the end of the previous page")] = None,
+    newest: Annotated[bool, typer.Option(
+        help="Newest additions first instead of best matches first. Stays fast for very common words")] = False
+):
+    """
+    Search expenses by description and category, best matches first.
+    """
+    from datetime import date, timedelta
+    from .utils import Utils
+    from .db.db_client import DBClient
+    try:
+        start = date.fromisoformat(from_).isoformat() if from_ is not None else None
+        # --to is inclusive, the query takes the start of the next day
+        end = (date.fromisoformat(to) + timedelta(days=1)
+               ).isoformat() if to is not None else None
+        cursor = Utils.parse_search_cursor(after) if after is not None else None
+        if cursor is not None and cursor[0] is None and not newest:
+            raise ValueError("Cursor without a rank. Use --newest to continue these results")
+        # one extra row tells whether there is a next page
+        results = DBClient.search(Utils.to_fts_query(
+            query), start, end, category, limit + 1, cursor, newest)
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            last, rank = results[-1]
+            next_cursor = str(last.id) if newest else f"{rank!r},{last.id}"
+        with Profiler.phase("render"):
+            if len(results) == 0:
+                console.print("No matching expenses.")
+                return
+            typer.echo("\n".join([str(expense) for expense, _ in results]))
+            if next_cursor is not None:
+                console.print(f"Next page: --after [bold]{next_cursor}[/bold]")
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
         raise typer.Exit(code=1)
@@ -93,27 +379,77 @@ def list(
 
 @app.command()
 def summary(
-    month: Annotated[str, typer.Option(help="Month of the year. eg: Jan, Feb.")],
-    year: Annotated[str, typer.Option(
-        help="The year in the format YYYY. eg: 2025")]
+    month: Annotated[Optional[str], typer.Option(help="Month of the year. eg: Jan, Feb.")] = None,
+    year: Annotated[Optional[str], typer.Option(
+        help="The year in the format YYYY. eg: 2025")] = None,
+    from_: Annotated[Optional[str], typer.Option(
+        "--from", help="First month of a multi-period summary in the format YYYY-MM. eg: 2024-01")] = None,
+    to: Annotated[Optional[str], typer.Option(
+        help="Last month of a multi-period summary in the format YYYY-MM. Defaults to --from")] = None,
+    by: Annotated[Period, typer.Option(
+        help="Period of each column in a multi-period summary", case_sensitive=False)] = Period.MONTH,
+    names: Annotated[Optional[List[str]], typer.Option(
+        help="Report across these users' databases instead of --name. Comma separated or repeated. eg: alice,bob")] = None,
+    all_users: Annotated[bool, typer.Option(
+        help="Report across every user's database")] = False,
+    workers: Annotated[Optional[int], typer.Option(
+        help="Threads reading the databases of --names or --all-users. Defaults to the number of CPUs + 4, at most 32", min=1)] = None,
+    timings: Annotated[bool, typer.Option(
+        help="With --names or --all-users, print the time spent reading each database")] = False
 ):
     """
-    Display a summary of the expenses based on the month and year
+    Display a summary of the expenses based on the month and year,
+    or a category by period table from --from to --to.
+    With --names or --all-users the expenses of many users are added up
     """
+    from rich.table import Table, Column
+    from rich import box
+    from .utils import Utils
+    from .db.db_client import DBClient
     try:
+        users = _user_names(names, all_users)
+        failed = False
+        if from_ is not None or to is not None:
+            if from_ is None:
+                raise ValueError("--to requires --from")
+            start = Utils.parse_year_month(from_)
+            end = Utils.parse_year_month(to) if to is not None else start
+            if start > end:
+                raise ValueError("--from must not be after --to")
+            if users is None:
+                rows = DBClient.summary_by_period(start, end, by)
+            else:
+                from .db.fan_out import FanOut
+                (rows, _), failed = _read_users(
+                    lambda: FanOut.summary_by_period(users, start, end, by, workers), users, workers, timings)
+            _print_period_summary(rows, start, end, by)
+            if failed:
+                raise typer.Exit(code=1)
+            return
+        if month is None or year is None:
+            raise ValueError(
+                "Provide --month and --year, or --from and --to.")
         monthOrdinal = Utils.month_text_to_ordinal(month)
-        summary = DBClient.summary(monthOrdinal, year)
+        if users is None:
+            summary = DBClient.summary(monthOrdinal, year)
+        else:
+            from .db.fan_out import FanOut
+            (summary, _), failed = _read_users(
+                lambda: FanOut.summary(users, monthOrdinal, year, workers), users, workers, timings)
         if len(summary) == 0:
             console.print("No transactions this month.")
+            if failed:
+                raise typer.Exit(code=1)
             return
-        total_spent = sum([row.amount for row in summary])
+        total_spent = sum([row.amount_cents for row in summary])
         table_min_width = 70
         table = Table(
             Column(header="Category", justify="left"),
             Column(header="Total", justify="left"),
             Column(footer="Total"),
-            Column(footer=f"{Utils.format_currency(total_spent)}"),
-            title=f"{Utils.month_short_to_full(month)} Summary",
+            Column(footer=f"{Utils.format_cents(total_spent)}"),
+            title=f"{Utils.month_short_to_full(month)} Summary" +
+            (f" across {len(users):,} users" if users is not None else ""),
             title_style="bold",
             title_justify="left",
             show_lines=True,
@@ -122,14 +458,158 @@ def summary(
             show_footer=True,
         )
         for row in summary:
-            bar = "█" * int((row.amount / total_spent) * table_min_width)
+            bar = "█" * (row.amount_cents * table_min_width // total_spent)
             table.add_row(
-                row.category, f"{bar} {Utils.format_currency(row.amount)}")
+                row.category, f"{bar} {Utils.format_cents(row.amount_cents)}")
+        with Profiler.phase("render"):
+            console.print()
+            console.print(table)
+        if failed:
+            raise typer.Exit(code=1)
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        raise typer.Exit(code=1)
+
+
+def _print_period_summary(rows: Sequence["PeriodSummary"], start: str, end: str, by: Period):
+    """Render a category by period pivot table with totals per row and column."""
+    from rich.table import Table, Column
+    from rich import box
+    from .utils import Utils
+    if len(rows) == 0:
+        console.print("No transactions in this period.")
+        return
+    periods = sorted({row.period for row in rows})
+    categories = sorted({row.category for row in rows})
+    cells = {(row.category, row.period): row.amount_cents for row in rows}
+    period_totals = {period: 0 for period in periods}
+    for row in rows:
+        period_totals[row.period] += row.amount_cents
+    table = Table(
+        Column(header="Category", justify="left", footer="Total"),
+        *[Column(header=period, justify="right", footer=Utils.format_cents(period_totals[period]))
+          for period in periods],
+        Column(header="Total", justify="right",
+               footer=Utils.format_cents(sum(period_totals.values()))),
+        title=f"Summary {start} to {end} by {by.value}",
+        title_style="bold",
+        title_justify="left",
+        show_lines=True,
+        min_width=70,
+        box=box.SIMPLE,
+        show_footer=True,
+    )
+    for category in categories:
+        amounts = [cells.get((category, period)) for period in periods]
+        table.add_row(
+            category,
+            *["-" if amount is None else Utils.format_cents(amount)
+              for amount in amounts],
+            Utils.format_cents(
+                sum(amount for amount in amounts if amount is not None))
+        )
+    with Profiler.phase("render"):
         console.print()
         console.print(table)
+
+
+@app.command()
+def analyze(
+    from_: Annotated[Optional[str], typer.Option(
+        "--from", help="First day to analyze in the format YYYY-MM-DD")] = None,
+    to: Annotated[Optional[str], typer.Option(
+        help="Last day to analyze in the format YYYY-MM-DD")] = None,
+    category: Annotated[Optional[List[str]], typer.Option(
+        help="Only analyze this category. Can be repeated")] = None,
+    min_amount: Annotated[Optional[float], typer.Option(
+        help="Only analyze expenses of at least this amount")] = None,
+    max_amount: Annotated[Optional[float], typer.Option(
+        help="Only analyze expenses of at most this amount")] = None,
+    by: Annotated[GroupKey, typer.Option(
+        help="Group the totals by category, day, weekday, month or year", case_sensitive=False)] = GroupKey.CATEGORY,
+    top: Annotated[int, typer.Option(
+        help="Show this many of the largest expenses. 0 hides them", min=0)] = 5,
+    rolling: Annotated[Optional[int], typer.Option(
+        help="Show the daily totals with the total of the last ROLLING days", min=1)] = None
+):
+    """
+    Analyze expenses in memory: grouped totals, the largest expenses and rolling daily totals
+    """
+    from datetime import date
+    from rich.table import Table, Column
+    from rich import box
+    from .utils import Utils
+    from .analytics import Ledger
+    try:
+        start_time = time.perf_counter()
+        start = date.fromisoformat(from_) if from_ is not None else None
+        end = date.fromisoformat(to) if to is not None else None
+        # the date range is applied by the database, the other filters in memory
+        ledger = Ledger.load(start, end).filter(
+            categories=category, min_amount=min_amount, max_amount=max_amount)
+        if len(ledger) == 0:
+            console.print("No transactions match.")
+            return
+        with Profiler.phase("compute"):
+            groups = ledger.group_by(by)
+            largest = ledger.top_expenses(top)
+            daily = ledger.rolling(rolling) if rolling is not None else []
+        elapsed = time.perf_counter() - start_time
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
         raise typer.Exit(code=1)
+    total = ledger.total()
+    table = Table(
+        Column(header=by.value.capitalize(), footer="Total"),
+        Column(header="Count", justify="right", footer=f"{len(ledger):,}"),
+        Column(header="Total", justify="right",
+               footer=Utils.format_cents(total)),
+        Column(header="Share", justify="right"),
+        title=f"Expenses by {by.value}",
+        title_style="bold",
+        title_justify="left",
+        min_width=70,
+        box=box.SIMPLE,
+        show_footer=True,
+    )
+    for group in groups:
+        table.add_row(group.label, f"{group.count:,}", Utils.format_cents(group.amount_cents),
+                      f"{group.amount_cents / total:.1%}" if total else "-")
+    with Profiler.phase("render"):
+        console.print(table)
+    if len(largest) > 0:
+        table = Table(
+            Column(header="Id"), Column(header="Date"), Column(header="Category"),
+            Column(header="Amount", justify="right"),
+            title=f"Largest {len(largest)} expenses",
+            title_style="bold",
+            title_justify="left",
+            min_width=70,
+            box=box.SIMPLE,
+        )
+        for id, day, name, amount_cents in largest:
+            table.add_row(str(id), day, name, Utils.format_cents(amount_cents))
+        with Profiler.phase("render"):
+            console.print(table)
+    if len(daily) > 0:
+        table = Table(
+            Column(header="Date"), Column(header="Day", justify="right"),
+            Column(header=f"Last {rolling} days", justify="right"),
+            title="Rolling daily totals",
+            title_style="bold",
+            title_justify="left",
+            min_width=70,
+            box=box.SIMPLE,
+        )
+        for row in daily:
+            table.add_row(row.date, Utils.format_cents(row.amount_cents),
+                          Utils.format_cents(row.window_amount_cents))
+        with Profiler.phase("render"):
+            console.print(table)
+    console.print(
+        f"Analyzed {len(ledger):,} expenses in {elapsed:.2f}s ({"numpy" if ledger.use_numpy else "python"})")
 
 
 @app.command()
@@ -140,23 +620,25 @@ def export(
         typer.Option("--format", case_sensitive=False)
     ] = FileFormat.CSV
 ):
-    """Export recorded expenses to a file"""
+    """
+    Export recorded expenses to a file. Use '-' as the output to write to stdout.
+    Snapshots are a compact binary format that must be written to a file
+    """
+    from .db.db_client import DBClient
+    from .exporter import Exporter
     try:
-        expenses = DBClient.get_all()
         match _format:
             case FileFormat.CSV:
-                expenses_csv_format = [
-                    f"{expense.to_csv()}\n"
-                    for expense in expenses
-                ]
-                output.write("ID,Amount,Description,Category,Date\n")
-                output.writelines(expenses_csv_format)
+                Exporter.write_csv(DBClient.iter_rows(), output)
             case FileFormat.JSON:
-                expenses_dict_format = [expense.to_dict()
-                                        for expense in expenses]
-                expenses_json = json.dumps(expenses_dict_format)
-                output.write(expenses_json)
-        console.print(
+                Exporter.write_json(DBClient.iter_rows(), output)
+            case FileFormat.NDJSON:
+                Exporter.write_ndjson(DBClient.iter_rows(), output)
+            case FileFormat.SNAPSHOT:
+                from .snapshot import Snapshot
+                Snapshot.write(DBClient.iter_rows(cents=True), output.buffer)
+        # keep stdout clean when the export itself is piped
+        (err_console if output.name == "-" else console).print(
             f"Exported expenses to: [bold yellow]{output.name}[/bold yellow]")
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
@@ -169,20 +651,104 @@ def import_expenses(
     _format: Annotated[
         FileFormat,
         typer.Option("--format", case_sensitive=False)
-    ] = FileFormat.CSV
+    ] = FileFormat.CSV,
+    batch_size: Annotated[int, typer.Option(
+        help="The number of expenses parsed and inserted at a time. Bounds memory use", min=1)] = Config.DEFAULT_BATCH_SIZE,
+    workers: Annotated[int, typer.Option(
+        help="Parse and categorise CSV files in this many processes", min=1)] = 1
 ):
-    """Import expenses from a file. Supports CSV and JSON"""
-    expenses = []
+    """Import expenses from a file. Supports CSV, JSON, NDJSON and snapshots. Use '-' as the file to read CSV or JSON from stdin"""
+    from .importer import Importer
     try:
-        match _format:
-            case FileFormat.CSV:
-                expenses = Expense.parse_csv(file)
-            case FileFormat.JSON:
-                expenses = Expense.parse_json(file)
-        imported_count = len(expenses)
-        DBClient.add_many(expenses)
+        if workers > 1 and _format != FileFormat.CSV:
+            raise ValueError("--workers is only supported for CSV files")
+        with console.status("Importing expenses...") as status:
+            def on_progress(progress):
+                status.update(
+                    f"Imported {progress.count:,} expenses ({progress.rows_per_second:,.0f} rows/s)")
+
+            if _format == FileFormat.SNAPSHOT:
+                result = Importer.run_snapshot(file, batch_size, on_progress)
+            elif workers > 1:
+                result = Importer.run_parallel(
+                    file, workers, batch_size, on_progress)
+            elif _format == FileFormat.CSV and file != "-":
+                result = Importer.run_rows(
+                    Importer.read_csv(file), batch_size, on_progress)
+            else:
+                result = Importer.run(
+                    Importer.read(file, _format), batch_size, on_progress)
         console.print(
-            f"Imported {imported_count} expenses from: [bold yellow]{file}[/bold yellow]")
+            f"Imported {result.count} expenses from: [bold yellow]{file}[/bold yellow] "
+            f"in {result.elapsed:.2f}s ({result.rows_per_second:,.0f} rows/s)")
+        if result.skipped > 0:
+            console.print(f"Skipped {result.skipped} expenses already recorded")
+        if result.cache_lookups > 0:
+            console.print(
+                f"Auto categorised {result.cache_lookups} expenses, category cache hit rate: {result.cache_hit_rate:.1%}")
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
         raise typer.Exit(code=1)
+
+
+@app.command(name="rebuild-summary")
+def rebuild_summary(
+    check: Annotated[bool, typer.Option(
+        help="Only compare the stored monthly totals with the expenses, without rebuilding them")] = False
+):
+    """Rebuild the monthly category totals read by the summary command"""
+    from rich.table import Table, Column
+    from rich import box
+    from .utils import Utils
+    from .db.db_client import DBClient
+    try:
+        if not check:
+            DBClient.rebuild_summary()
+        mismatches = DBClient.check_summary()
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        raise typer.Exit(code=1)
+    if len(mismatches) == 0:
+        console.print(
+            "Monthly totals match the expenses." if check else "Rebuilt monthly totals.")
+        return
+    table = Table(
+        Column(header="Month"),
+        Column(header="Category"),
+        Column(header="Stored"),
+        Column(header="Actual"),
+        title="Monthly totals out of date",
+        title_style="bold",
+        title_justify="left",
+        box=box.SIMPLE,
+    )
+    for month, category, stored, actual in mismatches:
+        table.add_row(month, category,
+                      "-" if stored is None else Utils.format_cents(stored),
+                      "-" if actual is None else Utils.format_cents(actual))
+    with Profiler.phase("render"):
+        console.print(table)
+    console.print("Run [bold]rebuild-summary[/bold] to fix them.")
+    raise typer.Exit(code=1)
+
+
+@app.command()
+def serve(
+    socket_path: Annotated[Optional[str], typer.Option(
+        "--socket", help=f"Path of the Unix domain socket. Can be set through the environment variable {Config.ENV_SOCKET}")] = None
+):
+    """
+    Run commands for other invocations of the expense tracker, keeping database connections,
+    caches and imports warm between them. Commands forward to it while it runs.
+    """
+    from . import daemon
+    if socket_path is not None:
+        os.environ[Config.ENV_SOCKET] = socket_path
+    path = Config.socket_path()
+    try:
+        daemon.serve(path, ready=lambda: console.print(f"Listening on [bold blue]{path}[/bold blue]"))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        err_console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        raise typer.Exit(code=1)
@@ -1,2 +1,26 @@
+import os
+
+
 class Config:
     ENV_DB_NAME: str = "DB_NAME"
+    ENV_DB_PROFILE: str = "DB_PROFILE"
+    ENV_SOCKET: str = "EXPENSE_TRACKER_SOCKET"
+    # rows parsed and inserted at a time by imports
+    DEFAULT_BATCH_SIZE: int = 1000
+    # seconds a command waits for the 'serve' daemon to start it before running in its own
+    # process, and the daemon waits on a client that stopped sending
+    DAEMON_TIMEOUT: float = 1.0
+
+    @staticmethod
+    def socket_path() -> str:
+        """
+        Path of the Unix domain socket the 'serve' daemon listens on.
+        Set through the environment variable EXPENSE_TRACKER_SOCKET, defaults to a per user
+        socket in $XDG_RUNTIME_DIR, or the temporary directory.
+        """
+        path = os.environ.get(Config.ENV_SOCKET)
+        if path:
+            return path
+        directory = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+        user = os.getuid() if hasattr(os, "getuid") else os.getlogin()
+        return os.path.join(directory, f"expense-tracker-{user}.sock")
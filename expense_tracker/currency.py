@@ -0,0 +1,166 @@
+import locale
+import platform
+
+# localeconv() uses CHAR_MAX for "not available"
+CHAR_MAX = 127
+
+
+class CurrencyFormatter:
+    """
+    Formats amounts like locale.currency(amount, grouping=True).
+
+    The locale is resolved and its conventions (symbol, grouping, separators and sign
+    placement) are read once, so formatting a value is pure string work.
+    """
+
+    def __init__(self, conventions: dict[str, any] | None = None):
+        """
+        Args:
+            conventions (dict[str, any]): The result of locale.localeconv().
+                Defaults to the conventions of the current locale, set to en_US when unset
+        """
+        if conventions is None:
+            conventions = _resolve_conventions()
+        self.digits = conventions["frac_digits"] if conventions is not None else CHAR_MAX
+        # the 'C' locale has no currency conventions, fall back to a plain dollar format
+        self.is_fallback = self.digits == CHAR_MAX
+        if self.is_fallback:
+            return
+        self.decimal_point = conventions["mon_decimal_point"]
+        self.thousands_sep = conventions["mon_thousands_sep"]
+        self.grouping, self.repeat_grouping = _grouping_intervals(
+            conventions["mon_grouping"])
+        # with the common "every 3 digits" grouping, the builtin ',' format can do the grouping
+        self.groups_by_three = self.repeat_grouping and all(
+            interval == 3 for interval in self.grouping)
+        self.positive = _affixes(conventions, negative=False)
+        self.negative = _affixes(conventions, negative=True)
+
+    def format(self, amount: float) -> str:
+        """
+        Format a number as a currency string.
+
+        Args:
+            amount (float): The amount to format.
+        """
+        if self.is_fallback:
+            return f"${amount:,.2f}"
+        if self.groups_by_three:
+            number = f"{abs(amount):,.{self.digits}f}"
+            if self.thousands_sep != "," or self.decimal_point != ".":
+                integer, _, fraction = number.partition(".")
+                integer = integer.replace(",", self.thousands_sep)
+                number = f"{integer}{self.decimal_point}{fraction}" if fraction else integer
+        else:
+            integer, _, fraction = f"{abs(amount):.{self.digits}f}".partition(".")
+            integer = self._group(integer)
+            number = f"{integer}{self.decimal_point}{fraction}" if fraction else integer
+        prefix, suffix = self.negative if amount < 0 else self.positive
+        return f"{prefix}{number}{suffix}"
+
+    def format_cents(self, cents: int) -> str:
+        """
+        Format an amount in cents as a currency string with integer arithmetic only,
+        so totals of any size print exactly. Gives the same result as format(cents / 100).
+
+        Args:
+            cents (int): The amount to format, in cents.
+        """
+        digits = 2 if self.is_fallback else self.digits
+        units = abs(cents)
+        if digits >= 2:
+            units *= 10 ** (digits - 2)
+        else:
+            # half of the dropped cents rounds to even, like formatting a float does
+            units, remainder = divmod(units, 10 ** (2 - digits))
+            half = 10 ** (2 - digits) // 2
+            if remainder > half or remainder == half and units % 2 == 1:
+                units += 1
+        integer, fraction = divmod(units, 10 ** digits)
+        fraction = f"{fraction:0{digits}d}" if digits > 0 else ""
+        if self.is_fallback:
+            return f"${"-" if cents < 0 else ""}{integer:,}.{fraction}"
+        if self.groups_by_three:
+            integer = f"{integer:,}".replace(",", self.thousands_sep)
+        else:
+            integer = self._group(str(integer))
+        number = f"{integer}{self.decimal_point}{fraction}" if fraction else integer
+        prefix, suffix = self.negative if cents < 0 else self.positive
+        return f"{prefix}{number}{suffix}"
+
+    def _group(self, integer: str) -> str:
+        """Insert the thousands separator following the locale's grouping intervals."""
+        groups = []
+        for interval in self.grouping:
+            if not integer:
+                break
+            groups.append(integer[-interval:])
+            integer = integer[:-interval]
+        if self.repeat_grouping:
+            interval = self.grouping[-1]
+            while integer:
+                groups.append(integer[-interval:])
+                integer = integer[:-interval]
+        if integer:
+            groups.append(integer)
+        return self.thousands_sep.join(reversed(groups))
+
+
+def _resolve_conventions() -> dict[str, any] | None:
+    """Make sure a locale is set, as Utils.format_currency always did, and return its conventions."""
+    fallback_locale = "English_United States.1252" if platform.system(
+    ) == "Windows" else "en_US.UTF-8"
+    try:
+        if locale.getlocale() == (None, None):
+            locale.setlocale(locale.LC_ALL, fallback_locale)
+    except Exception:
+        try:
+            locale.setlocale(locale.LC_ALL, fallback_locale)
+        except Exception:
+            return None
+    return locale.localeconv()
+
+
+def _grouping_intervals(grouping: list[int]) -> tuple[list[int], bool]:
+    """
+    Return the grouping intervals of a locale and whether the last one repeats.
+    CHAR_MAX stops grouping and a 0 repeats the previous interval, as in locale._group.
+    """
+    intervals = []
+    for interval in grouping:
+        if interval == CHAR_MAX:
+            return intervals, False
+        if interval == 0:
+            return intervals, len(intervals) > 0
+        intervals.append(interval)
+    return intervals, False
+
+
+def _affixes(conventions: dict[str, any], negative: bool) -> tuple[str, str]:
+    """
+    Return the (prefix, suffix) placed around the number, following the same
+    symbol and sign placement rules as locale.currency.
+    """
+    prefix = "n" if negative else "p"
+    symbol = conventions["currency_symbol"]
+    separator = " " if conventions[f"{prefix}_sep_by_space"] else ""
+    # '<' and '>' mark where the number starts and ends, '|' is the number itself
+    text = "<|>"
+    if conventions[f"{prefix}_cs_precedes"]:
+        text = symbol + separator + text
+    else:
+        text = text + separator + symbol
+    sign_position = conventions[f"{prefix}_sign_posn"]
+    sign = conventions["negative_sign" if negative else "positive_sign"]
+    if sign_position == 0:
+        text = f"({text})"
+    elif sign_position == 2:
+        text = text + sign
+    elif sign_position == 3:
+        text = text.replace("<", sign)
+    elif sign_position == 4:
+        text = text.replace(">", sign)
+    else:
+        text = sign + text
+    before, after = text.replace("<", "").replace(">", "").split("|")
+    return before, after
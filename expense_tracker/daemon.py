@@ -0,0 +1,273 @@
+import os
+import sys
+import stat
+import struct
+from typing import Iterator
+
+from expense_tracker.config import Config
+
+# environment variables of the client the daemon runs each command with
+FORWARDED_ENV = (Config.ENV_DB_NAME, Config.ENV_DB_PROFILE)
+# every message is a sequence of frames, each prefixed with its length
+FRAME_LENGTH = struct.Struct(">I")
+
+
+def forward(argv: list[str]) -> int | None:
+    """
+    Run a command in the 'serve' daemon and relay its output.
+    Returns the exit code of the command, or None when it should run in this process:
+    no daemon is listening or it does not start the command within Config.DAEMON_TIMEOUT,
+    the socket is not this user's own, the command is 'serve' itself or it streams stdin
+    or stdout ('-', --stdin).
+
+    Args:
+        argv (list[str]): The command line arguments, without the program name
+    """
+    path = Config.socket_path()
+    # checked before importing socket, so running without a daemon costs one stat call
+    if not _is_own_socket(path) or "serve" in argv or any(arg in ("-", "--stdin") or arg.endswith("=-") for arg in argv):
+        return None
+    import json
+    import socket
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(Config.DAEMON_TIMEOUT)
+    try:
+        client.connect(path)
+        send(client, {"argv": argv, "prog_name": _program_name(), "cwd": os.getcwd(),
+                      "env": {name: os.environ.get(name) for name in FORWARDED_ENV}})
+        # the daemon answers once it is about to run the command, and only runs it once told
+        # to go ahead, so a client that gave up waiting can run it here without running it twice
+        [*_] = receive(client, 1)
+        send(client, {"run": True})
+    except (OSError, ValueError):
+        # a socket file left behind by a daemon that is no longer running, or a busy or stuck daemon
+        client.close()
+        return None
+    try:
+        with client:
+            # the command is running now, and takes as long as it takes
+            client.settimeout(None)
+            header, stdout, stderr = receive(client, 3)
+    except (OSError, ValueError):
+        # the command may have run already, so it is not run again here
+        sys.stderr.write("Error: lost the connection to the expense tracker daemon\n")
+        return 1
+    sys.stdout.buffer.write(stdout)
+    sys.stdout.flush()
+    sys.stderr.buffer.write(stderr)
+    sys.stderr.flush()
+    return json.loads(header)["exit_code"]
+
+
+def _is_own_socket(path: str) -> bool:
+    """
+    Whether 'path' is a socket owned by this user that no one else may connect to, as 'serve'
+    creates it. Anyone can create a socket in the temporary directory, and the arguments of
+    every command would be sent to it.
+    """
+    if not hasattr(os, "getuid"):
+        return False
+    try:
+        # a symbolic link is not followed, whoever it points to
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid() and info.st_mode & 0o077 == 0
+
+
+def serve(path: str, ready=None):
+    """
+    Listen on a Unix domain socket and run the commands clients forward, with warm database
+    connections, caches and imports. Runs until interrupted.
+    Requests are read on a thread per connection, so a slow or idle client holds up no one.
+    Commands run one at a time on this thread: they share the process's standard streams,
+    working directory, environment and cached SQLite connections, which belong to one thread.
+
+    Args:
+        path (str): Path of the socket
+        ready (Callable[[], None]): Called once the daemon accepts connections
+    """
+    import queue
+    import signal
+    import socket
+    import threading
+    import typer
+    from expense_tracker.cli import app
+    # import what the commands need up front, so the first request is as fast as the rest
+    import rich.console
+    import expense_tracker.db.db_client
+    import expense_tracker.importer
+    import expense_tracker.exporter
+    import expense_tracker.analytics
+
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            probe.close()
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        except OSError:
+            probe.close()
+            os.remove(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # only the owner may connect: commands run with the daemon's access to every database
+    umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(umask)
+    server.listen(64)
+    # stop cleanly, removing the socket, on kill as well as ctrl+c
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    command = typer.main.get_command(app)
+    # (connection, request) of every client waiting for its command to run
+    requests = queue.Queue()
+
+    def accept():
+        while True:
+            try:
+                connection, _ = server.accept()
+            except OSError:
+                # the socket was closed, the daemon is stopping
+                return
+            connection.settimeout(Config.DAEMON_TIMEOUT)
+            threading.Thread(target=_read_request, args=(connection, requests), daemon=True).start()
+
+    try:
+        threading.Thread(target=accept, daemon=True).start()
+        if ready is not None:
+            ready()
+        while True:
+            connection, request = requests.get()
+            with connection:
+                try:
+                    # clients that gave up waiting have closed the connection by now, see forward
+                    send(connection, {"started": True})
+                    [*_] = receive(connection, 1)
+                    send(connection, *_run(command, request))
+                except (OSError, ValueError, KeyError):
+                    # the client went away or sent something else, serve the next one
+                    continue
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _read_request(connection, requests):
+    """Read the request of a client and queue it to run, or close the connection if none comes in time."""
+    import json
+    try:
+        [request] = receive(connection, 1)
+        requests.put((connection, json.loads(request)))
+    except (OSError, ValueError):
+        connection.close()
+
+
+def _run(command, request: dict) -> tuple[dict, bytes, bytes]:
+    """
+    Run a forwarded command with its output captured and return its exit code, stdout and stderr.
+    The process wide state a command sees (standard streams, working directory and the
+    forwarded environment variables) is set from the request and restored afterwards.
+
+    Args:
+        command (click.Command): The click command of the typer app
+        request (dict): The argv, prog_name, cwd and env sent by the client
+    """
+    import io
+    import typer
+    try:
+        # typer vendors click from 0.20 on
+        from typer import _click as click
+    except ImportError:
+        import click
+    stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    stderr = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    streams = sys.stdin, sys.stdout, sys.stderr
+    cwd = os.getcwd()
+    env = {name: os.environ.get(name) for name in FORWARDED_ENV}
+    try:
+        # commands reading stdin always run in the client, see forward
+        sys.stdin, sys.stdout, sys.stderr = io.StringIO(), stdout, stderr
+        # relative paths (eg: export --output) are relative to the client
+        os.chdir(request["cwd"])
+        # values of None unset the variable for the command, so nothing leaks between clients
+        _set_env({name: request["env"].get(name) for name in FORWARDED_ENV})
+        try:
+            # returns the code of a typer.Exit, and what the command returned otherwise
+            exit_code = command.main(request["argv"], prog_name=request["prog_name"], standalone_mode=False)
+            exit_code = exit_code if isinstance(exit_code, int) else 0
+        except click.ClickException as e:
+            _show_error(command, e)
+            exit_code = e.exit_code
+        except typer.Abort:
+            _show_error(command, None)
+            exit_code = 1
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else 0 if e.code is None else 1
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            exit_code = 1
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = streams
+        os.chdir(cwd)
+        _set_env(env)
+    stdout.flush()
+    stderr.flush()
+    return {"exit_code": exit_code}, stdout.buffer.getvalue(), stderr.buffer.getvalue()
+
+
+def _set_env(values: dict[str, str | None]):
+    """Set environment variables, unsetting those whose value is None."""
+    for name, value in values.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+def _show_error(command, error):
+    """Print a usage error, or 'Aborted!' when 'error' is None, the way typer does when run directly."""
+    from typer.core import HAS_RICH
+    if HAS_RICH and command.rich_markup_mode is not None:
+        from typer import rich_utils
+        if error is None:
+            rich_utils.rich_abort_error()
+        else:
+            rich_utils.rich_format_error(error)
+    elif error is None:
+        sys.stderr.write("Aborted!\n")
+    else:
+        error.show()
+
+
+def _program_name() -> str:
+    """The name usage and help messages call the program, as click works it out."""
+    spec = getattr(sys.modules.get("__main__"), "__spec__", None)
+    if spec is not None:
+        return f"python -m {spec.name.removesuffix('.__main__')}"
+    return os.path.basename(sys.argv[0])
+
+
+def send(connection, header: dict, *payloads: bytes):
+    """Send a JSON header followed by raw payloads, each as a length prefixed frame."""
+    import json
+    frames = [json.dumps(header).encode(), *payloads]
+    connection.sendall(b"".join(FRAME_LENGTH.pack(len(frame)) + frame for frame in frames))
+
+
+def receive(connection, count: int) -> Iterator[bytes]:
+    """Read 'count' length prefixed frames. Raises ValueError if the connection closes early."""
+    stream = connection.makefile("rb")
+    with stream:
+        for _ in range(count):
+            length = _read_exactly(stream, FRAME_LENGTH.size)
+            yield _read_exactly(stream, FRAME_LENGTH.unpack(length)[0])
+
+
+def _read_exactly(stream, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Connection closed before the message ended")
+    return data
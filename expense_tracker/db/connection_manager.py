@@ -0,0 +1,96 @@
+import atexit
+import sqlite3
+from pathlib import Path
+
+from expense_tracker.profiler import Profiler
+
+DEFAULT_PROFILE = "durable"
+PRAGMA_PROFILES: dict[str, dict[str, str | int]] = {
+    # WAL with a full fsync on every commit. Safe against power loss.
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16_000,
+        "temp_store": "DEFAULT",
+        "mmap_size": 0,
+    },
+    # WAL only fsyncs on checkpoints. The database cannot be corrupted,
+    # but the most recent commits may be lost on power failure.
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64_000,
+        "temp_store": "MEMORY",
+        "mmap_size": 268_435_456,
+    },
+    # No fsyncs at all. Meant for large imports that can be re-run.
+    "bulk": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262_144,
+        "temp_store": "MEMORY",
+        "mmap_size": 1_073_741_824,
+    },
+}
+
+
+class ConnectionManager:
+    """Keeps one configured connection per database file for the lifetime of the process."""
+    _connections: dict[str, sqlite3.Connection] = {}
+    _profiles: dict[str, str] = {}
+    # the trace callback installed on each connection, see Profiler.trace_callback
+    _traces: dict[str, object] = {}
+
+    @staticmethod
+    def get(db_path: Path, profile: str = DEFAULT_PROFILE) -> sqlite3.Connection:
+        """
+        Return the open connection to a database file, creating it on first use.
+
+        Args:
+            db_path (Path): Path to the SQLite database file
+            profile (str): Name of the PRAGMA profile to apply. eg: durable, fast, bulk
+        """
+        if profile not in PRAGMA_PROFILES:
+            raise ValueError(
+                f"Invalid database profile. Available options: {", ".join(PRAGMA_PROFILES.keys())}")
+        key = str(db_path)
+        connection = ConnectionManager._connections.get(key)
+        if connection is None:
+            with Profiler.phase("connect"):
+                connection = sqlite3.connect(db_path)
+            ConnectionManager._connections[key] = connection
+        trace = Profiler.trace_callback()
+        if ConnectionManager._traces.get(key) is not trace:
+            connection.set_trace_callback(trace)
+            ConnectionManager._traces[key] = trace
+        if ConnectionManager._profiles.get(key) != profile:
+            with Profiler.phase("connect"):
+                ConnectionManager.apply_profile(connection, profile)
+            ConnectionManager._profiles[key] = profile
+        return connection
+
+    @staticmethod
+    def apply_profile(connection: sqlite3.Connection, profile: str):
+        """Apply the PRAGMAs of a profile to a connection."""
+        for pragma, value in PRAGMA_PROFILES[profile].items():
+            connection.execute(f"PRAGMA {pragma} = {value}").fetchall()
+
+    @staticmethod
+    def close(db_path: Path):
+        """Close the connection to a database file if it is open."""
+        key = str(db_path)
+        connection = ConnectionManager._connections.pop(key, None)
+        ConnectionManager._profiles.pop(key, None)
+        ConnectionManager._traces.pop(key, None)
+        if connection is not None:
+            connection.execute("PRAGMA optimize")
+            connection.close()
+
+    @staticmethod
+    def close_all():
+        """Close every open connection. Registered to run at interpreter exit."""
+        for key in list(ConnectionManager._connections.keys()):
+            ConnectionManager.close(Path(key))
+
+
+atexit.register(ConnectionManager.close_all)
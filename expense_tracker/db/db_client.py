@@ -1,88 +1,527 @@
 import sqlite3
 import os
 from pathlib import Path
-from datetime import datetime
+from itertools import islice
+from typing import Callable, Iterable, Iterator
 from expense_tracker.config import Config
+from expense_tracker.db.connection_manager import ConnectionManager, DEFAULT_PROFILE
+from expense_tracker.utils import Utils
+from expense_tracker.profiler import Profiler
 from expense_tracker.models.exceptions import DBNotInitializedError
 from expense_tracker.models.expense import Expense
-from expense_tracker.models.expense_summary import ExpenseSummary
+from expense_tracker.models.expense_row import ExpenseRow
+from expense_tracker.models.expense_summary import ExpenseSummary, PeriodSummary
+from expense_tracker.models.period import Period
 
+DB_DIRECTORY = Path(__file__).parent
 TABLE_NAME = "expenses"
+DATE_INDEX_NAME = f"idx_{TABLE_NAME}_date"
+HASH_INDEX_NAME = f"idx_{TABLE_NAME}_content_hash"
+DEFAULT_BATCH_SIZE = Config.DEFAULT_BATCH_SIZE
+SUMMARY_TABLE_NAME = "monthly_category_totals"
+# one row holding the number of MIGRATIONS a database has had
+VERSION_TABLE_NAME = "schema_version"
+# keep the monthly totals in step with every write to the expenses table.
+# substr(date, 1, 7) is the YYYY-MM month of an ISO date
+SUMMARY_TRIGGERS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS {SUMMARY_TABLE_NAME}_insert AFTER INSERT ON {TABLE_NAME}
+    BEGIN
+        INSERT INTO {SUMMARY_TABLE_NAME} (month, category, total_cents, count)
+        VALUES (substr(NEW.date, 1, 7), NEW.category, NEW.amount_cents, 1)
+        ON CONFLICT (month, category) DO UPDATE SET total_cents = total_cents + excluded.total_cents, count = count + 1;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS {SUMMARY_TABLE_NAME}_delete AFTER DELETE ON {TABLE_NAME}
+    BEGIN
+        UPDATE {SUMMARY_TABLE_NAME} SET total_cents = total_cents - OLD.amount_cents, count = count - 1
+        WHERE month = substr(OLD.date, 1, 7) AND category = OLD.category;
+        DELETE FROM {SUMMARY_TABLE_NAME}
+        WHERE month = substr(OLD.date, 1, 7) AND category = OLD.category AND count = 0;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS {SUMMARY_TABLE_NAME}_update AFTER UPDATE OF amount_cents, date, category ON {TABLE_NAME}
+    BEGIN
+        UPDATE {SUMMARY_TABLE_NAME} SET total_cents = total_cents - OLD.amount_cents, count = count - 1
+        WHERE month = substr(OLD.date, 1, 7) AND category = OLD.category;
+        DELETE FROM {SUMMARY_TABLE_NAME}
+        WHERE month = substr(OLD.date, 1, 7) AND category = OLD.category AND count = 0;
+        INSERT INTO {SUMMARY_TABLE_NAME} (month, category, total_cents, count)
+        VALUES (substr(NEW.date, 1, 7), NEW.category, NEW.amount_cents, 1)
+        ON CONFLICT (month, category) DO UPDATE SET total_cents = total_cents + excluded.total_cents, count = count + 1;
+    END
+    '''
+]
+FTS_TABLE_NAME = f"{TABLE_NAME}_fts"
+# external content FTS5 index over description and category. It stores only the index,
+# the text is read back from the expenses table, and these triggers keep it in step
+FTS_TRIGGERS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE_NAME}_insert AFTER INSERT ON {TABLE_NAME}
+    BEGIN
+        INSERT INTO {FTS_TABLE_NAME} (rowid, description, category)
+        VALUES (NEW.id, NEW.description, NEW.category);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE_NAME}_delete AFTER DELETE ON {TABLE_NAME}
+    BEGIN
+        INSERT INTO {FTS_TABLE_NAME} ({FTS_TABLE_NAME}, rowid, description, category)
+        VALUES ('delete', OLD.id, OLD.description, OLD.category);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE_NAME}_update AFTER UPDATE OF description, category ON {TABLE_NAME}
+    BEGIN
+        INSERT INTO {FTS_TABLE_NAME} ({FTS_TABLE_NAME}, rowid, description, category)
+        VALUES ('delete', OLD.id, OLD.description, OLD.category);
+        INSERT INTO {FTS_TABLE_NAME} (rowid, description, category)
+        VALUES (NEW.id, NEW.description, NEW.category);
+    END
+    '''
+]
+
+# running the insert triggers once per row dominates bulk inserts, so add_rows suspends them
+# for its transaction and applies every row it inserted (id > the largest id before) set-wise:
+# trigger name -> (the trigger, the statement doing its work for the rows after an id)
+BULK_INSERT_TRIGGERS = {
+    f"{SUMMARY_TABLE_NAME}_insert": (SUMMARY_TRIGGERS[0], f'''
+        INSERT INTO {SUMMARY_TABLE_NAME} (month, category, total_cents, count)
+        SELECT substr(date, 1, 7), category, SUM(amount_cents), COUNT(*)
+        FROM {TABLE_NAME}
+        WHERE id > ?
+        GROUP BY 1, 2
+        ON CONFLICT (month, category) DO UPDATE SET total_cents = total_cents + excluded.total_cents, count = count + excluded.count
+    '''),
+    f"{FTS_TABLE_NAME}_insert": (FTS_TRIGGERS[0], f'''
+        INSERT INTO {FTS_TABLE_NAME} (rowid, description, category)
+        SELECT id, description, category FROM {TABLE_NAME} WHERE id > ?
+    '''),
+}
+
+# imports skip an expense whose content hash is already stored, see Utils.content_hash
+INSERT_NEW_QUERY = f'''
+    INSERT OR IGNORE INTO {TABLE_NAME} (amount_cents, description, date, category, content_hash)
+    VALUES (?, ?, ?, ?, ?)
+    '''
+# add keeps every expense. A repeated one gets a NULL hash, like the duplicates kept by
+# _add_content_hash, so the unique index allows it and an import still finds the first copy
+INSERT_QUERY = f'''
+    INSERT INTO {TABLE_NAME} (amount_cents, description, date, category, content_hash)
+    SELECT amount_cents, description, date, category,
+        CASE WHEN EXISTS (SELECT 1 FROM {TABLE_NAME} WHERE content_hash = new.content_hash)
+        THEN NULL ELSE new.content_hash END
+    FROM (SELECT ? AS amount_cents, ? AS description, ? AS date, ? AS category, ? AS content_hash) AS new
+    '''
+
+
+# read queries shared by DBClient and FanOut, which runs them against many databases
+LIST_QUERY = f'''
+    SELECT id, amount_cents, description, date, category FROM {TABLE_NAME}
+    WHERE (date, id) > (?, ?) AND date < ?
+    ORDER BY date, id
+    LIMIT ? OFFSET ?
+    '''
+SUMMARY_QUERY = f'''
+    SELECT category, total_cents
+    FROM {SUMMARY_TABLE_NAME}
+    WHERE month = ?
+    ORDER BY category
+    '''
+# periods are derived from the YYYY-MM month column, eg: 2025-05 = 2025-Q2 = 2025
+PERIOD_SUMMARY_QUERIES = {
+    by: f'''
+    SELECT {period} AS period, category, SUM(total_cents)
+    FROM {SUMMARY_TABLE_NAME}
+    WHERE month >= ? AND month <= ?
+    GROUP BY period, category
+    ORDER BY period, category
+    ''' for by, period in {
+        Period.MONTH: "month",
+        Period.QUARTER: "substr(month, 1, 4) || '-Q' || ((CAST(substr(month, 6, 2) AS INTEGER) + 2) / 3)",
+        Period.YEAR: "substr(month, 1, 4)",
+    }.items()
+}
 
 
 class DBClient:
     """Client to manage operations with database"""
+    # databases whose schema version was checked by this process
+    _checked: set[str] = set()
 
     @staticmethod
     def get_connection() -> sqlite3.Connection:
-        """Get a connection to the SQLite database."""
+        """
+        Get a connection to the SQLite database.
+        The connection is opened once per database and reused for the rest of the process.
+        An initialized database created by an older version is upgraded on first use.
+        """
         db_name = os.getenv(Config.ENV_DB_NAME)
         if db_name is None:
             raise ValueError("DB_NAME environment variable is not set.")
         if not db_name.endswith(".db"):
             db_name += ".db"
             os.environ[Config.ENV_DB_NAME] = db_name
-        db_path = Path(__file__).parent / db_name
-        return sqlite3.connect(db_path)
+        db_path = DB_DIRECTORY / db_name
+        connection = ConnectionManager.get(db_path, os.getenv(Config.ENV_DB_PROFILE, DEFAULT_PROFILE))
+        if str(db_path) not in DBClient._checked:
+            DBClient._checked.add(str(db_path))
+            version = DBClient.schema_version(connection)
+            if version is not None and version < SCHEMA_VERSION:
+                DBClient._migrate(connection)
+        return connection
+
+    @staticmethod
+    def close_connections():
+        """Close every cached database connection."""
+        DBClient._checked.clear()
+        ConnectionManager.close_all()
 
     @staticmethod
     def init_db():
-        """Initialize the database connection and create the expenses table if it doesn't exist."""
-        with DBClient.get_connection() as connection:
-            cursor = connection.cursor()
-            cursor.execute(f'''
-                CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    amount REAL NOT NULL,
-                    description TEXT NOT NULL,
-                    date TEXT NOT NULL,
-                    category TEXT NOT NULL
-                )
-            ''')
+        """
+        Initialize the database, or upgrade an existing one in place, by running every
+        migration it has not had yet. See MIGRATIONS.
+        """
+        DBClient._migrate(DBClient.get_connection())
+
+    @staticmethod
+    def schema_version(connection: sqlite3.Connection) -> int | None:
+        """
+        The number of migrations a database has had, 0 for a database created before
+        versioning and None for one that is not initialized.
+        """
+        tables = {name for name, in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)",
+            (TABLE_NAME, VERSION_TABLE_NAME))}
+        if VERSION_TABLE_NAME in tables:
+            return connection.execute(f"SELECT version FROM {VERSION_TABLE_NAME}").fetchone()[0]
+        return 0 if TABLE_NAME in tables else None
+
+    @staticmethod
+    def _migrate(connection: sqlite3.Connection):
+        """Run the migrations a database has not had yet in one transaction, recording the version reached."""
+        cursor = connection.cursor()
+        # taking the write lock first keeps two processes from migrating the same database
+        if not connection.in_transaction:
+            DBClient._execute(cursor, "BEGIN IMMEDIATE")
+        try:
+            version = DBClient.schema_version(connection) or 0
+            DBClient._execute(cursor, f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE_NAME} (version INTEGER NOT NULL)")
+            DBClient._execute(cursor, f"DELETE FROM {VERSION_TABLE_NAME}")
+            for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                migration(cursor)
+                version = number
+            DBClient._create_derived_tables(cursor)
+            DBClient._execute(cursor, f"INSERT INTO {VERSION_TABLE_NAME} (version) VALUES (?)", (version,))
             connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
 
     @staticmethod
-    def get_tables() -> list[str]:
-        """Retrieve the list of tables in the database."""
+    def _create_expenses_table(cursor: sqlite3.Cursor):
+        """
+        Migration 1: the expenses table as it was before schema versioning, with REAL amounts.
+        Databases created before the content hash get it added.
+        """
+        DBClient._execute(cursor, f'''
+            CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                amount REAL NOT NULL,
+                description TEXT NOT NULL,
+                date TEXT NOT NULL,
+                category TEXT NOT NULL,
+                content_hash INTEGER
+            )
+        ''')
+        DBClient._execute(cursor, f"SELECT name FROM pragma_table_info('{TABLE_NAME}')")
+        if "content_hash" not in {row[0] for row in cursor.fetchall()}:
+            DBClient._add_content_hash(cursor)
+
+    @staticmethod
+    def _use_integer_cents(cursor: sqlite3.Cursor):
+        """
+        Migration 2: store amounts and monthly totals as integer cents, so sums are exact.
+        SQLite cannot change a column's type, so the expenses table is copied into a new
+        one, keeping every id. Its indexes and triggers go with the old table and the summary
+        table is dropped, DBClient._create_derived_tables creates them again. The search
+        index only refers to ids and text, so it is kept.
+        """
+        DBClient._execute(cursor, "SELECT seq FROM sqlite_sequence WHERE name = ?", (TABLE_NAME,))
+        sequence = cursor.fetchone()
+        cursor.connection.create_function("to_cents", 1, Utils.to_cents, deterministic=True)
+        DBClient._execute(cursor, f'''
+            CREATE TABLE {TABLE_NAME}_cents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                amount_cents INTEGER NOT NULL,
+                description TEXT NOT NULL,
+                date TEXT NOT NULL,
+                category TEXT NOT NULL,
+                content_hash INTEGER
+            )
+        ''')
+        DBClient._execute(cursor, f'''
+            INSERT INTO {TABLE_NAME}_cents (id, amount_cents, description, date, category, content_hash)
+            SELECT id, to_cents(amount), description, date, category, content_hash FROM {TABLE_NAME}
+        ''')
+        # dropping the table drops its indexes and triggers with it
+        DBClient._execute(cursor, f"DROP TABLE {TABLE_NAME}")
+        DBClient._execute(cursor, f"ALTER TABLE {TABLE_NAME}_cents RENAME TO {TABLE_NAME}")
+        # ids of deleted rows at the end of the table are still never reused
+        if sequence is not None:
+            DBClient._execute(cursor, "DELETE FROM sqlite_sequence WHERE name = ?", (TABLE_NAME,))
+            DBClient._execute(cursor, "INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)",
+                              (TABLE_NAME, sequence[0]))
+        # its totals are REAL, DBClient._create_derived_tables fills it again in cents
+        DBClient._execute(cursor, f"DROP TABLE IF EXISTS {SUMMARY_TABLE_NAME}")
+
+    @staticmethod
+    def _create_derived_tables(cursor: sqlite3.Cursor):
+        """
+        Create the indexes, monthly totals and search index over the expenses table, and their
+        triggers, where missing. Run after every migration, so init also repairs a database
+        that lost one of them.
+        """
+        # month/year filters are half-open ranges over 'date' so they can seek this index
+        DBClient._execute(cursor, f"CREATE INDEX IF NOT EXISTS {DATE_INDEX_NAME} ON {TABLE_NAME} (date)")
+        # inserts skip rows whose hash is already stored, see Utils.content_hash
+        DBClient._execute(cursor,
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {HASH_INDEX_NAME} ON {TABLE_NAME} (content_hash)")
+        DBClient._execute(cursor,
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SUMMARY_TABLE_NAME,))
+        summary_exists = cursor.fetchone() is not None
+        DBClient._execute(cursor, f'''
+            CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE_NAME} (
+                month TEXT NOT NULL,
+                category TEXT NOT NULL,
+                total_cents INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (month, category)
+            ) WITHOUT ROWID
+        ''')
+        for trigger in SUMMARY_TRIGGERS:
+            DBClient._execute(cursor, trigger)
+        # databases created before the summary table need their totals backfilled
+        if not summary_exists:
+            DBClient._fill_summary(cursor)
+        DBClient._execute(cursor,
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE_NAME,))
+        fts_exists = cursor.fetchone() is not None
+        DBClient._execute(cursor, f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE_NAME} USING fts5(
+                description, category,
+                content='{TABLE_NAME}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        ''')
+        for trigger in FTS_TRIGGERS:
+            DBClient._execute(cursor, trigger)
+        # and databases created before the search index need it built
+        if not fts_exists:
+            DBClient._execute(cursor,
+                f"INSERT INTO {FTS_TABLE_NAME} ({FTS_TABLE_NAME}) VALUES ('rebuild')")
+
+    @staticmethod
+    def rebuild_summary():
+        """Recompute the monthly category totals from the expenses table."""
         with DBClient.get_connection() as connection:
             cursor = connection.cursor()
-            cursor.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
-            tables = [row[0] for row in cursor.fetchall()]
-            return tables
+            try:
+                DBClient._execute(cursor, f"DELETE FROM {SUMMARY_TABLE_NAME}")
+                DBClient._fill_summary(cursor)
+                connection.commit()
+            except sqlite3.OperationalError as _:
+                connection.rollback()
+                raise DBNotInitializedError(
+                    "Database is not initialized. Please run the init command.")
 
     @staticmethod
-    def get_all() -> list[Expense]:
-        """Retrieve all row in the database"""
+    def check_summary() -> list[tuple[str, str, int, int]]:
+        """
+        Compare the monthly category totals with an aggregate of the expenses table.
+        Returns the (month, category, stored total, actual total) of every mismatch, in cents.
+        Totals are integers, so they are compared exactly.
+        """
         with DBClient.get_connection() as connection:
             cursor = connection.cursor()
             try:
-                cursor.execute(
-                    f"SELECT id, amount, description, date, category FROM {TABLE_NAME} ORDER BY date")
-                return [
-                    Expense(
-                        id=row[0],
-                        amount=row[1],
-                        description=row[2],
-                        date=datetime.fromisoformat(row[3]),
-                        category=row[4]
+                DBClient._execute(cursor, f'''
+                    WITH actual AS (
+                        SELECT substr(date, 1, 7) AS month, category, SUM(amount_cents) AS total_cents, COUNT(*) AS count
+                        FROM {TABLE_NAME}
+                        GROUP BY 1, 2
                     )
-                    for row in cursor.fetchall()
-                ]
+                    SELECT actual.month, actual.category, stored.total_cents, actual.total_cents
+                    FROM actual LEFT JOIN {SUMMARY_TABLE_NAME} AS stored
+                        ON stored.month = actual.month AND stored.category = actual.category
+                    WHERE stored.total_cents IS NULL OR stored.count != actual.count OR stored.total_cents != actual.total_cents
+                    UNION ALL
+                    SELECT stored.month, stored.category, stored.total_cents, NULL
+                    FROM {SUMMARY_TABLE_NAME} AS stored
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM {TABLE_NAME}
+                        WHERE date >= stored.month AND date < stored.month || '~' AND category = stored.category
+                    )
+                    ORDER BY 1, 2
+                ''')
+                return DBClient._fetch_all(cursor)
             except sqlite3.OperationalError as _:
                 raise DBNotInitializedError(
                     "Database is not initialized. Please run the init command.")
 
+    @staticmethod
+    def _execute(cursor: sqlite3.Cursor, sql: str, parameters: tuple = ()) -> sqlite3.Cursor:
+        """Run a statement, timed as the 'query' phase while profiling."""
+        with Profiler.phase("query"):
+            return cursor.execute(sql, parameters)
+
+    @staticmethod
+    def _fetch_all(cursor: sqlite3.Cursor) -> list:
+        """Fetch the remaining rows, timed as the 'materialise' phase while profiling."""
+        with Profiler.phase("materialise"):
+            rows = cursor.fetchall()
+        Profiler.add_rows(len(rows))
+        return rows
+
+    @staticmethod
+    def _fetch_many(cursor: sqlite3.Cursor, size: int) -> list:
+        """Fetch the next 'size' rows, timed as the 'materialise' phase while profiling."""
+        with Profiler.phase("materialise"):
+            rows = cursor.fetchmany(size)
+        Profiler.add_rows(len(rows))
+        return rows
+
+    @staticmethod
+    def _add_content_hash(cursor: sqlite3.Cursor):
+        """
+        Add the content hash column to a database created before it and hash every row.
+        Duplicates already stored keep a NULL hash, which the unique index allows,
+        so only the first copy (lowest id) takes part in deduplication and nothing is deleted.
+        """
+        DBClient._execute(cursor, f"ALTER TABLE {TABLE_NAME} ADD COLUMN content_hash INTEGER")
+        # amounts are still REAL when this runs, see DBClient._create_expenses_table
+        cursor.connection.create_function(
+            "content_hash", 3, lambda amount, date, description: Utils.content_hash(
+                Utils.to_cents(amount), date, description), deterministic=True)
+        DBClient._execute(cursor,
+            f"UPDATE {TABLE_NAME} SET content_hash = content_hash(amount, date, description)")
+        DBClient._execute(cursor, f'''
+            UPDATE {TABLE_NAME} SET content_hash = NULL
+            WHERE id NOT IN (SELECT min(id) FROM {TABLE_NAME} GROUP BY content_hash)
+        ''')
+
+    @staticmethod
+    def _fill_summary(cursor: sqlite3.Cursor):
+        """Aggregate the expenses table into the (empty) monthly category totals."""
+        DBClient._execute(cursor, f'''
+            INSERT INTO {SUMMARY_TABLE_NAME} (month, category, total_cents, count)
+            SELECT substr(date, 1, 7), category, SUM(amount_cents), COUNT(*)
+            FROM {TABLE_NAME}
+            GROUP BY 1, 2
+        ''')
+
+    @staticmethod
+    def get_tables() -> list[str]:
+        """Retrieve the list of tables in the database."""
+        with DBClient.get_connection() as connection:
+            cursor = connection.cursor()
+            DBClient._execute(cursor,
+                "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
+            tables = [row[0] for row in DBClient._fetch_all(cursor)]
+            return tables
+
+    @staticmethod
+    def get_all() -> list[ExpenseRow]:
+        """Retrieve all row in the database as read-only rows ordered by date"""
+        cursor = DBClient.get_connection().cursor()
+        cursor.row_factory = ExpenseRow.row_factory
+        try:
+            DBClient._execute(cursor,
+                f"SELECT id, amount_cents, description, date, category FROM {TABLE_NAME} ORDER BY date")
+            return DBClient._fetch_all(cursor)
+        except sqlite3.OperationalError as _:
+            raise DBNotInitializedError(
+                "Database is not initialized. Please run the init command.")
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def iter_rows(batch_size: int = 1000, cents: bool = False) -> Iterator[tuple]:
+        """
+        Stream every row ordered by date as (id, amount, description, date, category) tuples,
+        with the amount converted from cents to a float for export.
+        Rows are fetched from the cursor 'batch_size' at a time, so memory stays flat
+        regardless of the number of rows.
+
+        Args:
+            batch_size (int): The number of rows fetched at a time
+            cents (bool): Keep the amounts as the integer cents they are stored as. eg: for a snapshot
+        """
+        amount = "amount_cents" if cents else "amount_cents / 100.0"
+        cursor = DBClient.get_connection().cursor()
+        try:
+            DBClient._execute(cursor,
+                f"SELECT id, {amount}, description, date, category FROM {TABLE_NAME} ORDER BY date")
+        except sqlite3.OperationalError as _:
+            raise DBNotInitializedError(
+                "Database is not initialized. Please run the init command.")
+        try:
+            while batch := DBClient._fetch_many(cursor, batch_size):
+                yield from batch
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def iter_columns(
+            start: str | None = None,
+            end: str | None = None,
+            batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[tuple[int, int, int, str]]:
+        """
+        Stream the rows needed for analysis ordered by (date, id) as
+        (id, amount in cents, epoch day, category) tuples, where the epoch day is the number
+        of days since 1970-01-01. SQLite computes the epoch day, so no dates are parsed in Python.
+
+        Args:
+            start (str): Only rows on or after this ISO date
+            end (str): Only rows before this ISO date
+            batch_size (int): The number of rows fetched from the cursor at a time
+        """
+        cursor = DBClient.get_connection().cursor()
+        try:
+            # julianday of a bare date is always n + 0.5, so the difference is a whole number
+            DBClient._execute(cursor,
+                f'''
+                SELECT id, amount_cents, CAST(julianday(substr(date, 1, 10)) - 2440587.5 AS INTEGER), category
+                FROM {TABLE_NAME}
+                WHERE date >= ? AND date < ?
+                ORDER BY date, id
+                ''', (start or "", end or "~"))
+        except sqlite3.OperationalError as _:
+            raise DBNotInitializedError(
+                "Database is not initialized. Please run the init command.")
+        try:
+            while batch := DBClient._fetch_many(cursor, batch_size):
+                yield from batch
+        finally:
+            cursor.close()
+
     @staticmethod
     def add(data: dict[str, any]):
-        """Add a new expense entry to the database."""
+        """
+        Add a new expense entry to the database.
+        The same expense may be added any number of times, only imports skip duplicates.
+        """
+        cents = Utils.to_cents(data["amount"])
         with DBClient.get_connection() as connection:
             cursor = connection.cursor()
             try:
-                cursor.execute(f'''
-                    INSERT INTO {TABLE_NAME} (amount, description, date, category)
-                    VALUES (?, ?, ?, ?)
-                ''', (data["amount"], data["description"], data["date"], data["category"]))
+                DBClient._execute(cursor, INSERT_QUERY, (
+                    cents, data["description"], data["date"], data["category"],
+                    Utils.content_hash(cents, data["date"], data["description"])))
                 connection.commit()
             except sqlite3.OperationalError as _:
                 connection.rollback()
@@ -90,66 +529,232 @@ class DBClient:
                     "Database is not initialized. Please run the init command.")
 
     @staticmethod
-    def add_many(expenses: list[Expense]):
-        """Inserts many expenses into the DB"""
+    def add_many(
+            expenses: Iterable[Expense],
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            on_batch: Callable[[int], None] | None = None
+    ) -> tuple[int, int]:
+        """
+        Inserts many expenses into the DB and returns the number inserted and skipped.
+        'expenses' may be a generator; see DBClient.add_rows.
+        """
+        return DBClient.add_rows(
+            ((expense.amount, expense.description,
+              expense.date.isoformat(), expense.category)
+             for expense in expenses),
+            batch_size,
+            on_batch
+        )
+
+    @staticmethod
+    def add_rows(
+            rows: Iterable[tuple],
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            on_batch: Callable[[int], None] | None = None,
+            cents: bool = False,
+            skip_duplicates: bool = True
+    ) -> tuple[int, int]:
+        """
+        Inserts (amount, description, date, category) tuples and returns the number
+        inserted and the number skipped as duplicates.
+        Rows are pulled from 'rows' and inserted 'batch_size' at a time inside a single
+        transaction, so memory is bounded by the batch size and a failure inserts nothing.
+        The monthly totals and the search index are updated once for all the rows at the
+        end instead of by a trigger per row, see BULK_INSERT_TRIGGERS.
+        A row is a duplicate when its content hash is already stored (see Utils.content_hash).
+        The unique index finds them, so re-importing an overlapping file costs an index lookup per row.
+
+        Args:
+            rows (Iterable[tuple]): The rows to insert. Usually a generator
+            batch_size (int): The number of rows per executemany call
+            on_batch (Callable[[int], None]): Called with the running number inserted after every batch
+            cents (bool): The amounts are already integer cents. eg: read from a snapshot
+            skip_duplicates (bool): Skip rows already stored, as imports do. Otherwise every row
+                is inserted, repeated ones included, as DBClient.add does
+        """
+        query = INSERT_NEW_QUERY if skip_duplicates else INSERT_QUERY
         with DBClient.get_connection() as connection:
             cursor = connection.cursor()
             try:
-                insert_tuples = [
-                    (expense.amount, expense.description,
-                     expense.date.isoformat(), expense.category)
-                    for expense in expenses
-                ]
-                cursor.executemany(f'''
-                INSERT INTO {TABLE_NAME} (amount, description, date, category)
-                VALUES (?, ?, ?, ?)
-                ''', insert_tuples)
+                # DROP TRIGGER does not open a transaction by itself, and must be rolled back on failure.
+                # The write lock is taken first: a row another connection commits between reading
+                # the last id and suspending the triggers would go through its triggers and then
+                # be applied again by the bulk statements
+                if not connection.in_transaction:
+                    DBClient._execute(cursor, "BEGIN IMMEDIATE")
+                DBClient._execute(cursor,
+                    f"SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN ({", ".join("?" * len(BULK_INSERT_TRIGGERS))})",
+                    (*BULK_INSERT_TRIGGERS,))
+                suspended = [name for name, in cursor.fetchall()]
+                for name in suspended:
+                    DBClient._execute(cursor, f"DROP TRIGGER {name}")
+                # fail before consuming any rows if the table does not exist.
+                # Read after the first write, so an already open transaction holds the write lock too
+                DBClient._execute(cursor, f"SELECT coalesce(max(id), 0) FROM {TABLE_NAME}")
+                last_id = cursor.fetchone()[0]
+                inserted = skipped = 0
+                content_hash, to_cents = Utils.content_hash, int if cents else Utils.to_cents
+                iterator = iter(rows)
+                while batch := [(amount_cents := to_cents(amount), description, date, category,
+                                 content_hash(amount_cents, date, description))
+                                for amount, description, date, category in islice(iterator, batch_size)]:
+                    with Profiler.phase("query"):
+                        cursor.executemany(query, batch)
+                    # ignored rows do not count as changes
+                    inserted += cursor.rowcount
+                    skipped += len(batch) - cursor.rowcount
+                    if on_batch is not None:
+                        on_batch(inserted)
+                for name in suspended:
+                    trigger, bulk_statement = BULK_INSERT_TRIGGERS[name]
+                    DBClient._execute(cursor, bulk_statement, (last_id,))
+                    DBClient._execute(cursor, trigger)
                 connection.commit()
+                return inserted, skipped
             except sqlite3.OperationalError as _:
                 connection.rollback()
                 raise DBNotInitializedError(
                     "Database is not initialized. Please run the init command.")
 
     @staticmethod
-    def list_expenses(month: str, year: str, page: int = 1, limit: int = 20) -> list[Expense]:
-        """List recent expenses."""
+    def list_expenses(
+            month: str,
+            year: str,
+            page: int = 1,
+            limit: int = 20,
+            after: tuple[str, int] | None = None
+    ) -> list[ExpenseRow]:
+        """
+        List recent expenses ordered by (date, id) as read-only rows.
+
+        When 'after' is a (date, id) cursor the query seeks straight to the next row
+        through the date index, so every page costs the same. 'page' is only used
+        without a cursor and falls back to OFFSET pagination.
+        """
+        start, end = Utils.month_date_range(month, year)
+        # (date, id) > (start, 0) matches every row in the month. A single lower bound
+        # lets SQLite seek the index on the cursor instead of the start of the month.
+        offset = (page - 1) * limit if after is None else 0
+        after = max(after or (start, 0), (start, 0))
         with DBClient.get_connection() as connection:
             cursor = connection.cursor()
-            cursor.execute(
-                f'''
-                SELECT id, amount, description, date, category FROM {TABLE_NAME}
-                WHERE strftime('%m', date) = ? AND strftime('%Y', date) = ?
-                ORDER BY date
-                LIMIT ? OFFSET ?
-                ''', (month, year, limit, (page - 1) * limit)
-            )
-            return [
-                Expense(
-                    id=row[0],
-                    amount=row[1],
-                    description=row[2],
-                    date=datetime.fromisoformat(row[3]),
-                    category=row[4],
-                )
-                for row in cursor.fetchall()
-            ]
+            cursor.row_factory = ExpenseRow.row_factory
+            DBClient._execute(cursor, LIST_QUERY, (after[0], after[1], end, limit, offset))
+            return DBClient._fetch_all(cursor)
 
     @staticmethod
-    def summary(month: str, year: str) -> list[ExpenseSummary]:
-        """Create summary of expenses"""
+    def search(
+            query: str,
+            start: str | None = None,
+            end: str | None = None,
+            categories: list[str] | None = None,
+            limit: int = 20,
+            after: tuple[float | None, int] | None = None,
+            newest: bool = False
+    ) -> list[tuple[ExpenseRow, float | None]]:
+        """
+        Full-text search over descriptions and categories, best matches first.
+        Returns (expense, rank) pairs ordered by (rank, id). A lower rank is a better match.
+
+        Ranking scores every matching row, so it slows down for words found in a large
+        share of the ledger. 'newest' orders by id instead, newest additions first, which
+        reads only as many matches as it returns. The rank is then None.
+
+        Args:
+            query (str): An FTS5 query, see Utils.to_fts_query
+            start (str): Only expenses on or after this ISO date
+            end (str): Only expenses before this ISO date
+            categories (list[str]): Only expenses in these categories
+            limit (int): The number of results to return
+            after (tuple[float, int]): The (rank, id) of the last result of the previous page
+            newest (bool): Order by id, newest first, instead of by rank
+        """
+        conditions, parameters = [f"{FTS_TABLE_NAME} MATCH ?"], [query]
+        if start is not None:
+            conditions.append("e.date >= ?")
+            parameters.append(start)
+        if end is not None:
+            conditions.append("e.date < ?")
+            parameters.append(end)
+        if categories:
+            conditions.append(
+                f"e.category IN ({", ".join("?" * len(categories))})")
+            parameters.extend(categories)
+        if newest:
+            if after is not None:
+                conditions.append("f.rowid < ?")
+                parameters.append(after[1])
+            # the index returns matches in rowid order, so the query stops after 'limit' rows
+            rank, order = "NULL", "f.rowid DESC"
+        else:
+            if after is not None:
+                conditions.append("(f.rank, e.id) > (?, ?)")
+                parameters.extend(after)
+            # bm25 weighs a match in the description twice as much as one in the category
+            conditions.append("f.rank MATCH 'bm25(2.0, 1.0)'")
+            rank, order = "f.rank", "f.rank, e.id"
         with DBClient.get_connection() as connection:
             cursor = connection.cursor()
             try:
-                cursor.execute(
+                DBClient._execute(cursor,
                     f'''
-                    SELECT category, SUM(amount)
-                    FROM {TABLE_NAME}
-                    WHERE strftime('%m', date) = ? AND strftime('%Y', date) = ?
-                    GROUP BY category
-                    ORDER BY category
-                    ''', (month, year)
+                    SELECT e.id, e.amount_cents, e.description, e.date, e.category, {rank}
+                    FROM {FTS_TABLE_NAME} AS f JOIN {TABLE_NAME} AS e ON e.id = f.rowid
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY {order}
+                    LIMIT ?
+                    ''', (*parameters, limit)
                 )
-                return [ExpenseSummary(row[0], row[1]) for row in cursor.fetchall()]
+                return [(ExpenseRow.row_factory(cursor, row[:5]), row[5])
+                        for row in DBClient._fetch_all(cursor)]
+            except sqlite3.OperationalError as e:
+                if "fts5" in str(e) or "syntax error" in str(e):
+                    raise ValueError(f"Invalid search query: {query}")
+                raise DBNotInitializedError(
+                    "Database is not initialized. Please run the init command.")
+
+    @staticmethod
+    def summary_by_period(start: str, end: str, by: Period = Period.MONTH) -> list[PeriodSummary]:
+        """
+        Create a category by period summary of every month from 'start' to 'end' (inclusive)
+        with one grouped query over the monthly category totals.
+
+        Args:
+            start (str): The first month in the format YYYY-MM
+            end (str): The last month in the format YYYY-MM
+            by (Period): The length of the periods. eg: month, quarter, year
+        """
+        with DBClient.get_connection() as connection:
+            cursor = connection.cursor()
+            try:
+                DBClient._execute(cursor, PERIOD_SUMMARY_QUERIES[by], (start, end))
+                return [PeriodSummary(row[0], row[1], row[2]) for row in DBClient._fetch_all(cursor)]
             except sqlite3.OperationalError as _:
                 raise DBNotInitializedError(
                     "Database is not initialized. Please run the init command.")
+
+    @staticmethod
+    def summary(month: str, year: str) -> list[ExpenseSummary]:
+        """
+        Create summary of expenses.
+        Reads the monthly category totals kept up to date by triggers, so the cost
+        depends on the number of categories rather than the number of expenses.
+        """
+        start, _ = Utils.month_date_range(month, year)
+        with DBClient.get_connection() as connection:
+            cursor = connection.cursor()
+            try:
+                DBClient._execute(cursor, SUMMARY_QUERY, (start[:7],))
+                return [ExpenseSummary(row[0], row[1]) for row in DBClient._fetch_all(cursor)]
+            except sqlite3.OperationalError as _:
+                raise DBNotInitializedError(
+                    "Database is not initialized. Please run the init command.")
+
+
+# every change to the schema, in order. A database at version n has had the first n,
+# and DBClient.init_db (or the first connection to an older database) runs the rest
+MIGRATIONS: list[Callable[[sqlite3.Cursor], None]] = [
+    DBClient._create_expenses_table,
+    DBClient._use_integer_cents,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
@@ -0,0 +1,169 @@
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from heapq import merge
+from itertools import islice
+from typing import Callable, Iterable
+
+from expense_tracker.db.db_client import DB_DIRECTORY, LIST_QUERY, SUMMARY_QUERY, PERIOD_SUMMARY_QUERIES
+from expense_tracker.utils import Utils
+from expense_tracker.profiler import Profiler
+from expense_tracker.models.db_result import DBResult
+from expense_tracker.models.expense_row import ExpenseRow
+from expense_tracker.models.expense_summary import ExpenseSummary, PeriodSummary
+from expense_tracker.models.period import Period
+
+# larger than any expense id, so (date, LAST_ID) sorts after every row of that date
+LAST_ID = 2**63 - 1
+
+
+class FanOut:
+    """
+    Runs the same read against many users' databases on a thread pool and merges the results.
+
+    Every database gets its own read-only connection, opened for the read and closed after,
+    so thousands of users can be read without a file handle each. sqlite3 releases the GIL
+    while SQLite opens a file and runs a statement, so the reads run in parallel.
+    """
+
+    @staticmethod
+    def names() -> list[str]:
+        """The name of every user with a database, in order."""
+        return sorted(path.stem for path in DB_DIRECTORY.glob("*.db"))
+
+    @staticmethod
+    def workers(names: list[str], workers: int | None = None) -> int:
+        """
+        The number of threads reading 'names': 'workers', or by default as many as
+        ThreadPoolExecutor starts, and never more than there are databases.
+        """
+        workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        return max(1, min(workers, len(names)))
+
+    @staticmethod
+    def run(
+            names: list[str],
+            read: Callable[[str, sqlite3.Cursor], any],
+            workers: int | None = None
+    ) -> list[DBResult]:
+        """
+        Run 'read' against the database of every user and return the results in the order of 'names'.
+        A database that cannot be read is reported in its result's error, the rest are still read.
+
+        Args:
+            names (list[str]): The users whose databases are read
+            read (Callable[[str, sqlite3.Cursor], any]): Runs the queries of one user on a cursor of their database
+            workers (int): The number of threads, see FanOut.workers
+        """
+        names = [name.removesuffix(".db") for name in names]
+        with Profiler.phase("query"), ThreadPoolExecutor(FanOut.workers(names, workers)) as pool:
+            return [*pool.map(lambda name: _read(name, read), names)]
+
+    @staticmethod
+    def summary(
+            names: list[str],
+            month: str,
+            year: str,
+            workers: int | None = None
+    ) -> tuple[list[ExpenseSummary], list[DBResult]]:
+        """
+        Sum the monthly category totals of every user. See DBClient.summary.
+        Returns the merged summary and the result of each database.
+        """
+        start, _ = Utils.month_date_range(month, year)
+        results = FanOut.run(
+            names, lambda _, cursor: cursor.execute(SUMMARY_QUERY, (start[:7],)).fetchall(), workers)
+        totals = _sum(row for result in results if result.error is None for row in result.value)
+        return [ExpenseSummary(category, amount) for (category,), amount in sorted(totals.items())], results
+
+    @staticmethod
+    def summary_by_period(
+            names: list[str],
+            start: str,
+            end: str,
+            by: Period = Period.MONTH,
+            workers: int | None = None
+    ) -> tuple[list[PeriodSummary], list[DBResult]]:
+        """
+        Sum the category by period summaries of every user. See DBClient.summary_by_period.
+        Returns the merged summary and the result of each database.
+        """
+        results = FanOut.run(
+            names, lambda _, cursor: cursor.execute(PERIOD_SUMMARY_QUERIES[by], (start, end)).fetchall(), workers)
+        totals = _sum(row for result in results if result.error is None for row in result.value)
+        return [PeriodSummary(period, category, amount)
+                for (period, category), amount in sorted(totals.items())], results
+
+    @staticmethod
+    def list_expenses(
+            names: list[str],
+            month: str,
+            year: str,
+            page: int = 1,
+            limit: int = 20,
+            after: tuple[str, int, str] | None = None,
+            workers: int | None = None
+    ) -> tuple[list[tuple[str, ExpenseRow]], list[DBResult]]:
+        """
+        List the expenses of every user in a month as (name, row) pairs ordered by
+        (date, name, id), one page at a time. See DBClient.list_expenses.
+        Returns one row more than 'limit' when there is a next page.
+
+        Args:
+            after (tuple[str, int, str]): A (date, id, name) cursor, the last row of the previous page
+        """
+        start, end = Utils.month_date_range(month, year)
+        offset = (page - 1) * limit if after is None else 0
+
+        def read(name: str, cursor: sqlite3.Cursor) -> list[tuple]:
+            # the rows of this user that sort after the (date, name, id) cursor, as a (date, id) cursor
+            if after is None:
+                seek = (start, 0)
+            elif name == after[2]:
+                seek = after[:2]
+            else:
+                seek = (after[0], 0 if name > after[2] else LAST_ID)
+            seek = max(seek, (start, 0))
+            return cursor.execute(LIST_QUERY, (*seek, end, offset + limit + 1, 0)).fetchall()
+
+        results = FanOut.run(names, read, workers)
+        rows = merge(*[[(row[3], result.name, row[0], row) for row in result.value]
+                       for result in results if result.error is None])
+        return [(name, ExpenseRow.row_factory(None, row))
+                for _, name, _, row in islice(rows, offset, offset + limit + 1)], results
+
+
+def _read(name: str, read: Callable[[str, sqlite3.Cursor], any]) -> DBResult:
+    """Open a read-only connection to a user's database, run 'read' on it and time both."""
+    start = time.perf_counter()
+    path = DB_DIRECTORY / f"{name}.db"
+    if not path.exists():
+        return DBResult(name, None, time.perf_counter() - start, "Database does not exist")
+    try:
+        # mode=ro never creates or writes the database, even by mistake
+        connection = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True)
+        try:
+            return DBResult(name, read(name, connection.cursor()), time.perf_counter() - start)
+        finally:
+            connection.close()
+    except sqlite3.OperationalError as e:
+        if "no such table" in str(e):
+            error = "Database is not initialized"
+        elif "no such column" in str(e):
+            # read-only, so a database from before integer cents is not migrated here
+            error = "Database needs an upgrade. Run the init command"
+        else:
+            error = str(e)
+    except sqlite3.Error as e:
+        error = str(e)
+    return DBResult(name, None, time.perf_counter() - start, error)
+
+
+def _sum(rows: Iterable[tuple]) -> dict[tuple, int]:
+    """Add up the amount in cents, the last column, of rows with the same leading columns."""
+    totals: dict[tuple, int] = {}
+    for *key, amount_cents in rows:
+        key = tuple(key)
+        totals[key] = totals.get(key, 0) + amount_cents
+    return totals
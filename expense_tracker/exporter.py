@@ -0,0 +1,74 @@
+import csv
+import json
+from typing import Iterable, TextIO
+
+CSV_HEADER = ("ID", "Amount", "Description", "Category", "Date")
+
+
+class Exporter:
+    """Writes expense rows to files as they are read from the database."""
+
+    @staticmethod
+    def write_csv(rows: Iterable[tuple], output: TextIO) -> int:
+        """
+        Stream rows to a CSV file and return the number of rows written.
+
+        Args:
+            rows (Iterable[tuple]): (id, amount, description, date, category) tuples. eg: DBClient.iter_rows()
+            output (TextIO): The file to write to
+        """
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(CSV_HEADER)
+        count = 0
+        for id, amount, description, date, category in rows:
+            writer.writerow((id, amount, description, category, date))
+            count += 1
+        return count
+
+    @staticmethod
+    def write_json(rows: Iterable[tuple], output: TextIO) -> int:
+        """
+        Stream rows to a file as a single JSON array and return the number of rows written.
+        Each object is serialised on its own, so the whole array is never held in memory.
+
+        Args:
+            rows (Iterable[tuple]): (id, amount, description, date, category) tuples. eg: DBClient.iter_rows()
+            output (TextIO): The file to write to
+        """
+        output.write("[")
+        count = 0
+        for row in rows:
+            if count > 0:
+                output.write(", ")
+            output.write(json.dumps(Exporter.row_to_dict(row)))
+            count += 1
+        output.write("]")
+        return count
+
+    @staticmethod
+    def write_ndjson(rows: Iterable[tuple], output: TextIO) -> int:
+        """
+        Stream rows to a file as newline delimited JSON (one object per line)
+        and return the number of rows written.
+
+        Args:
+            rows (Iterable[tuple]): (id, amount, description, date, category) tuples. eg: DBClient.iter_rows()
+            output (TextIO): The file to write to
+        """
+        count = 0
+        for row in rows:
+            output.write(json.dumps(Exporter.row_to_dict(row)))
+            output.write("\n")
+            count += 1
+        return count
+
+    @staticmethod
+    def row_to_dict(row: tuple) -> dict[str, any]:
+        """Convert a database row to the same dictionary as Expense.to_dict."""
+        return {
+            "id": row[0],
+            "amount": row[1],
+            "description": row[2],
+            "date": row[3],
+            "category": row[4]
+        }
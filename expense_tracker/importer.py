@@ -0,0 +1,414 @@
+import os
+import sys
+import csv
+import math
+import mmap
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from expense_tracker.utils import Utils
+from expense_tracker.db.db_client import DBClient, DEFAULT_BATCH_SIZE
+from expense_tracker.models.exceptions import InvalidImportFileError
+from expense_tracker.models.expense import Expense
+from expense_tracker.models.import_result import ImportResult
+from expense_tracker.models.line_error import LineError
+from expense_tracker.models.output_format import FileFormat
+from expense_tracker.snapshot import Snapshot
+
+# target size of the byte ranges handed to worker processes
+RANGE_SIZE = 4 * 1024 * 1024
+# pages of a mapped import file are dropped from memory every time this many bytes are parsed
+RELEASE_SIZE = 4 * 1024 * 1024
+
+
+class Importer:
+    """
+    Streams expenses from a file into the database:
+    parse -> categorise -> batch of N -> insert, all in one transaction.
+    """
+
+    @staticmethod
+    def read(file: str, _format: FileFormat) -> Iterator[Expense]:
+        """
+        Lazily parse expenses from an import file.
+        Expenses without a category are auto categorised as they are parsed.
+
+        Args:
+            file (str): Path to the import file. '-' reads from stdin
+            _format (FileFormat): The format of the file
+        """
+        match _format:
+            case FileFormat.CSV:
+                return Expense.iter_csv(file)
+            case FileFormat.JSON:
+                return Expense.iter_json(file)
+            case FileFormat.NDJSON:
+                return Expense.iter_ndjson(file)
+        raise ValueError(f"Cannot import files in the {_format.value} format")
+
+    @staticmethod
+    def read_csv(file: str) -> Iterator[tuple[float, str, str, str]]:
+        """
+        Lazily parse a CSV file into (amount, description, date, category) rows ready for
+        DBClient.add_rows. The file is memory mapped and scanned for line breaks in place,
+        only the columns that are imported are decoded and no Expense objects are created.
+        Rows without a category are auto categorised.
+
+        Args:
+            file (str): Path to the CSV file
+        """
+        categorise = Utils.get_matcher().match
+        with _map_csv(file) as (buffer, fieldnames, start):
+            for amount, description, date, category in _iter_csv_lines(
+                    buffer, _column_indexes(fieldnames), start, len(buffer), multiline=True):
+                yield amount, description, date, category or categorise(description)
+
+    @staticmethod
+    def read_lines(
+            file: str,
+            on_error: Callable[[LineError], None] | None = None,
+            batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[tuple[float, str, str, str]]:
+        """
+        Lazily parse 'amount<TAB>description[<TAB>date]' lines into (amount, description,
+        date, category) rows ready for DBClient.add_rows. Lines without a date are dated
+        when they are read. Lines are categorised 'batch_size' at a time.
+        A malformed line is reported to 'on_error' and skipped, the rest are still yielded.
+        Blank lines are ignored.
+
+        Args:
+            file (str): Path to the file. '-' reads from stdin
+            on_error (Callable[[LineError], None]): Called with every line that cannot be parsed
+            batch_size (int): The number of lines parsed and categorised at a time
+        """
+        match_many = Utils.get_matcher().match_many
+        try:
+            source = nullcontext(sys.stdin) if file == "-" else open(file, "r")
+        except FileNotFoundError:
+            raise InvalidImportFileError("Import file does not exist")
+        with source as lines:
+            numbered = enumerate(lines, start=1)
+            while chunk := list(islice(numbered, batch_size)):
+                batch = []
+                for number, line in chunk:
+                    try:
+                        row = _parse_line(line)
+                    except ValueError as e:
+                        if on_error is not None:
+                            on_error(LineError(number, line.rstrip("\r\n"), str(e)))
+                        continue
+                    if row is not None:
+                        batch.append(row)
+                categories = match_many(description for _, description, _ in batch)
+                for (amount, description, date), category in zip(batch, categories):
+                    yield amount, description, date, category
+
+    @staticmethod
+    def run(
+            expenses: Iterable[Expense],
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            on_progress: Callable[[ImportResult], None] | None = None
+    ) -> ImportResult:
+        """
+        Insert expenses in batches, skipping those already stored, and report the throughput.
+
+        Args:
+            expenses (Iterable[Expense]): The expenses to insert. eg: Importer.read(file, _format)
+            batch_size (int): The number of expenses held in memory and inserted at a time
+            on_progress (Callable[[ImportResult], None]): Called with the running totals after every batch
+        """
+        return Importer.run_rows(
+            ((expense.amount, expense.description, expense.date.isoformat(), expense.category)
+             for expense in expenses),
+            batch_size,
+            on_progress
+        )
+
+    @staticmethod
+    def run_rows(
+            rows: Iterable[tuple],
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            on_progress: Callable[[ImportResult], None] | None = None,
+            cents: bool = False,
+            skip_duplicates: bool = True
+    ) -> ImportResult:
+        """
+        Insert (amount, description, date, category) rows in batches, skipping those
+        already stored, and report the throughput.
+
+        Args:
+            rows (Iterable[tuple]): The rows to insert. eg: Importer.read_csv(file)
+            batch_size (int): The number of rows held in memory and inserted at a time
+            on_progress (Callable[[ImportResult], None]): Called with the running totals after every batch
+            cents (bool): The amounts are already integer cents, see DBClient.add_rows
+            skip_duplicates (bool): Skip rows already stored. eg: False to add repeated expenses
+        """
+        start = time.perf_counter()
+        before = Utils.get_matcher().cache_info()
+
+        def result(count: int, skipped: int = 0) -> ImportResult:
+            after = Utils.get_matcher().cache_info()
+            return ImportResult(count, time.perf_counter() - start,
+                                after.hits - before.hits, after.misses - before.misses, skipped)
+
+        def on_batch(count: int):
+            if on_progress is not None:
+                on_progress(result(count))
+
+        return result(*DBClient.add_rows(rows, batch_size, on_batch, cents, skip_duplicates))
+
+    @staticmethod
+    def run_snapshot(
+            file: str,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            on_progress: Callable[[ImportResult], None] | None = None
+    ) -> ImportResult:
+        """
+        Import a snapshot file. Rows are inserted straight from the memory mapped file,
+        with the categories they were exported with and amounts in cents.
+
+        Args:
+            file (str): Path to the snapshot file
+            batch_size (int): The number of rows per insert batch
+            on_progress (Callable[[ImportResult], None]): Called with the running totals after every batch
+        """
+        return Importer.run_rows(Snapshot.read(file), batch_size, on_progress, cents=True)
+
+    @staticmethod
+    def run_parallel(
+            file: str,
+            workers: int,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            on_progress: Callable[[ImportResult], None] | None = None
+    ) -> ImportResult:
+        """
+        Import a CSV file by parsing and categorising line aligned byte ranges in a
+        process pool while this process inserts the results in batches.
+        Workers are only sent the range offsets, each maps the file and reads its own range.
+        Ranges are inserted in file order and at most two ranges per worker are
+        in flight, so memory stays bounded. Fields must not contain line breaks.
+
+        Args:
+            file (str): Path to the CSV file
+            workers (int): The number of worker processes
+            batch_size (int): The number of rows per insert batch
+            on_progress (Callable[[ImportResult], None]): Called with the running totals after every batch
+        """
+        if file == "-":
+            raise InvalidImportFileError(
+                "Parallel imports need a file path, stdin is not supported")
+        try:
+            fieldnames, ranges = Importer.split_ranges(file, workers)
+        except FileNotFoundError:
+            raise InvalidImportFileError("Import file does not exist")
+        columns = _column_indexes(fieldnames)
+
+        # category cache hits and misses reported by the workers
+        cache = [0, 0]
+
+        def collect(future) -> list[tuple]:
+            rows, hits, misses = future.result()
+            cache[0] += hits
+            cache[1] += misses
+            return rows
+
+        def rows(executor: ProcessPoolExecutor) -> Iterator[tuple]:
+            pending = deque()
+            for start, end in ranges:
+                pending.append(executor.submit(
+                    _parse_csv_range, file, columns, start, end))
+                if len(pending) >= workers * 2:
+                    yield from collect(pending.popleft())
+            while pending:
+                yield from collect(pending.popleft())
+
+        start = time.perf_counter()
+
+        def on_batch(count: int):
+            if on_progress is not None:
+                on_progress(ImportResult(
+                    count, time.perf_counter() - start, cache[0], cache[1]))
+
+        # spawn rather than fork: the parent may already run threads (eg: the progress spinner)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            count, skipped = DBClient.add_rows(rows(executor), batch_size, on_batch)
+        return ImportResult(count, time.perf_counter() - start, cache[0], cache[1], skipped)
+
+    @staticmethod
+    def split_ranges(file: str, parts: int, range_size: int = RANGE_SIZE) -> tuple[list[str], list[tuple[int, int]]]:
+        """
+        Split a CSV file after its header into line aligned (start, end) byte ranges.
+        Returns the lower cased header and at least 'parts' ranges when the file is big enough.
+
+        Args:
+            file (str): Path to the CSV file
+            parts (int): The minimum number of ranges to aim for
+            range_size (int): The maximum size of a range in bytes
+        """
+        with _map_csv(file) as (buffer, fieldnames, position):
+            size = len(buffer)
+            step = max(1, min(range_size, (size - position) // max(parts, 1)))
+            ranges = []
+            while position < size:
+                # move the boundary to the start of the next line
+                end = buffer.find(b"\n", min(position + step, size) - 1)
+                end = size if end == -1 else end + 1
+                ranges.append((position, end))
+                position = end
+        return fieldnames, ranges
+
+
+def _parse_line(line: str) -> tuple[float, str, str] | None:
+    """
+    Parse one 'amount<TAB>description[<TAB>date]' line into (amount, description, ISO date),
+    or None for a blank line. Raises ValueError with the reason a line is malformed.
+    """
+    line = line.rstrip("\r\n")
+    if line.strip() == "":
+        return None
+    fields = line.split("\t")
+    if not 2 <= len(fields) <= 3:
+        raise ValueError(f"Expected 2 or 3 tab separated fields, found {len(fields)}")
+    try:
+        amount = float(fields[0])
+    except ValueError:
+        raise ValueError(f"Amount is not a number: {fields[0]!r}")
+    if not math.isfinite(amount):
+        raise ValueError(f"Amount is not a number: {fields[0]!r}")
+    description = fields[1].strip()
+    if description == "":
+        raise ValueError("Description is empty")
+    if len(fields) == 2:
+        return amount, description, datetime.now().isoformat()
+    try:
+        return amount, description, datetime.fromisoformat(fields[2].strip()).isoformat()
+    except ValueError:
+        raise ValueError(f"Date is not in the ISO format: {fields[2]!r}")
+
+
+@contextmanager
+def _map_csv(file: str) -> Iterator[tuple[mmap.mmap | bytes, list[str], int]]:
+    """
+    Memory map a CSV file and yield the mapping, the lower cased header and the
+    offset of the first row. An empty file, which cannot be mapped, yields empty bytes.
+    """
+    if file == "-":
+        raise InvalidImportFileError(
+            "Memory mapped imports need a file path, stdin is not supported")
+    try:
+        csv_file = open(file, "rb")
+    except FileNotFoundError:
+        raise InvalidImportFileError("Import file does not exist")
+    with csv_file:
+        empty = os.fstat(csv_file.fileno()).st_size == 0
+        with nullcontext(b"") if empty else mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            header_end = buffer.find(b"\n")
+            header_end = len(buffer) if header_end == -1 else header_end + 1
+            fieldnames = [name.strip().lower() for name in next(
+                csv.reader([buffer[:header_end].decode("utf-8-sig")]), [])]
+            yield buffer, fieldnames, header_end
+
+
+def _column_indexes(fieldnames: list[str]) -> tuple[int, int, int, int | None]:
+    """Return the positions of the amount, description, date and category columns."""
+    try:
+        category = fieldnames.index(
+            "category") if "category" in fieldnames else None
+        return (fieldnames.index("amount"), fieldnames.index("description"), fieldnames.index("date"), category)
+    except ValueError:
+        raise InvalidImportFileError(
+            "Some column headings are malformed. The first row should contain the headings.")
+
+
+def _iter_csv_lines(
+        buffer: mmap.mmap | bytes,
+        columns: tuple[int, int, int, int | None],
+        start: int,
+        end: int,
+        multiline: bool = False
+) -> Iterator[tuple[float, str, str, str | None]]:
+    """
+    Parse the CSV lines between two byte offsets of a buffer into
+    (amount, description, date, category) tuples, with None for a missing category.
+
+    Line breaks are found with buffer.find, so the buffer is never decoded or copied as a
+    whole. Lines without quotes are split on raw bytes and only the imported fields are
+    decoded, anything else goes through the csv module. A quoted field may only span
+    lines when 'multiline' is set, ranges handed to workers could split it.
+    """
+    amount_column, description_column, date_column, category_column = columns
+    width = max(column for column in columns if column is not None) + 1
+    fromisoformat = datetime.fromisoformat
+    find = buffer.find
+    # parsed pages would otherwise stay resident until the file is unmapped.
+    # They are backed by the file, so dropping them only means reading them again if needed
+    release = getattr(buffer, "madvise", None) if hasattr(mmap, "MADV_DONTNEED") else None
+    released = start - start % mmap.PAGESIZE
+    position = start
+    try:
+        while position < end:
+            if release is not None and position - released >= RELEASE_SIZE:
+                parsed = position - position % mmap.PAGESIZE
+                release(mmap.MADV_DONTNEED, released, parsed - released)
+                released = parsed
+            line_end = find(b"\n", position, end)
+            line_end = end if line_end == -1 else line_end
+            line = buffer[position:line_end]
+            if b'"' in line:
+                # an odd number of quotes leaves a field open at the end of the line
+                if line.count(b'"') % 2 and not multiline:
+                    raise InvalidImportFileError(
+                        "Fields with line breaks are not supported by parallel imports. Import without --workers.")
+                while line.count(b'"') % 2 and line_end < end:
+                    line_end = find(b"\n", line_end + 1, end)
+                    line_end = end if line_end == -1 else line_end
+                    line = buffer[position:line_end]
+                fields = next(csv.reader([line.decode("utf-8")]), [])
+            else:
+                fields = line.rstrip(b"\r").split(b",")
+                if len(fields) >= width:
+                    fields[description_column] = fields[description_column].decode("utf-8")
+                    fields[date_column] = fields[date_column].decode("ascii")
+                    if category_column is not None:
+                        fields[category_column] = fields[category_column].decode("utf-8")
+            position = line_end + 1
+            if len(fields) <= 1 and not any(fields):
+                continue
+            yield (
+                float(fields[amount_column]),
+                fields[description_column],
+                fromisoformat(fields[date_column]).isoformat(),
+                fields[category_column] or None if category_column is not None else None
+            )
+    except (ValueError, IndexError):
+        raise InvalidImportFileError(
+            "Some fields may not be of the right type. 'amount' should be a number and 'date' is in the ISO format.")
+
+
+def _parse_csv_range(
+        file: str,
+        columns: tuple[int, int, int, int | None],
+        start: int,
+        end: int
+) -> tuple[list[tuple], int, int]:
+    """
+    Parse and categorise the CSV lines between two byte offsets.
+    Runs in a worker process and returns (amount, description, date, category) tuples
+    along with the category cache hits and misses of the range.
+    """
+    with _map_csv(file) as (buffer, _, _):
+        rows = [[*row] for row in _iter_csv_lines(buffer, columns, start, end)]
+    uncategorised = [row for row in rows if not row[3]]
+    before = Utils.get_matcher().cache_info()
+    categories = Utils.auto_categorise_many(row[1] for row in uncategorised)
+    for row, category in zip(uncategorised, categories):
+        row[3] = category
+    after = Utils.get_matcher().cache_info()
+    return [tuple(row) for row in rows], after.hits - before.hits, after.misses - before.misses
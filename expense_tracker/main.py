@@ -1,4 +1,17 @@
-from .cli import app
+import sys
+
+from .daemon import forward
+
+
+def main():
+    # commands run in the 'serve' daemon when one is listening, here otherwise
+    exit_code = forward(sys.argv[1:])
+    if exit_code is None:
+        from .cli import app
+        app()
+    else:
+        sys.exit(exit_code)
+
 
 if __name__ == "__main__":
-    app()
+    main()
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class DBResult:
+    """Class to represent the outcome of reading one user's database"""
+    name: str
+    # what the read returned, None when it failed
+    value: any
+    elapsed: float
+    error: str | None = None
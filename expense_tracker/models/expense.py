@@ -1,29 +1,91 @@
+import sys
 from datetime import datetime
-from csv import DictReader
-import json
+from contextlib import nullcontext
+from typing import Iterator, TextIO
 
 from expense_tracker.utils import Utils
 from .exceptions import InvalidImportFileError
 
 
+def _open_import_file(file: str):
+    """Open an import file for reading. '-' reads from stdin."""
+    if file == "-":
+        return nullcontext(sys.stdin)
+    return open(file, "r")
+
+
+def _iter_json_values(json_file: TextIO, chunk_size: int = 65536) -> Iterator[any]:
+    """
+    Yield the elements of a top level json array while reading the file in chunks.
+    Any other top level value is decoded whole and yielded once.
+    """
+    import json
+    decoder = json.JSONDecoder()
+    buffer = ""
+    while not buffer and (chunk := json_file.read(chunk_size)):
+        buffer = chunk.lstrip()
+    if not buffer.startswith("["):
+        yield json.loads(buffer + json_file.read())
+        return
+    position, eof = 1, False
+    # what may come next: "value_or_end" right after '[', "value" after ',' and "separator" after a value
+    expecting = "value_or_end"
+    while True:
+        while position < len(buffer) and buffer[position].isspace():
+            position += 1
+        if position < len(buffer):
+            char = buffer[position]
+            if expecting != "value" and char == "]":
+                return
+            if expecting == "separator":
+                if char != ",":
+                    raise json.JSONDecodeError(
+                        "Expecting ',' delimiter", buffer, position)
+                position, expecting = position + 1, "value"
+                continue
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+                # a value touching the end of the buffer may continue in the next chunk
+                if end < len(buffer) or eof:
+                    yield value
+                    position, expecting = end, "separator"
+                    continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+        elif eof:
+            raise json.JSONDecodeError("Unterminated array", buffer, position)
+        chunk = json_file.read(chunk_size)
+        eof = chunk == ""
+        buffer, position = buffer[position:] + chunk, 0
+
+
 class Expense:
     """This class represents an expense entry in the expense tracker application."""
+    __slots__ = ("id", "amount", "description", "date", "category")
 
     def __init__(
             self,
             amount: float,
             description: str,
-            date: datetime = datetime.now(),
+            date: datetime | None = None,
             category: str | None = None,
             id: int | None = None
     ):
         self.id = id
         self.amount = amount
         self.description = description
-        self.date = date
+        # a default of datetime.now() would be evaluated once, dating every expense
+        # a long running process (eg: the serve daemon) adds to when it started
+        self.date = date if date is not None else datetime.now()
         self.category = category if category is not None else Utils.auto_categorise(
             description)
 
+    @property
+    def amount_cents(self) -> int:
+        """The amount as the integer cents it is stored as, see Utils.to_cents"""
+        return Utils.to_cents(self.amount)
+
     def __repr__(self):
         return f"{self.id}. {Utils.format_currency(self.amount)} \
 for {self.description} on {self.date.isoformat()}. [{self.category}]"
@@ -40,32 +102,55 @@ for {self.description} on {self.date.isoformat()}. [{self.category}]"
 
     def to_csv(self):
         """Convert Expense object to CSV format"""
-        return f"{self.id},{self.amount},{self.description},{self.category},{self.date.isoformat()}"
+        # csv and json are imported where they are used, 'add' needs neither
+        from csv import writer
+        from io import StringIO
+        line = StringIO()
+        writer(line, lineterminator="").writerow(
+            (self.id, self.amount, self.description, self.category, self.date.isoformat()))
+        return line.getvalue()
 
     @staticmethod
     def from_dict(data: dict[str, any]):
         """Create an Expense object from a dictionary representation."""
         date = data["date"] if isinstance(
             data["date"], datetime) else datetime.fromisoformat(data["date"])
-        return Expense(data["amount"], data["description"], date, data["category"], data.get("id"))
+        return Expense(data["amount"], data["description"], date, data.get("category"), data.get("id"))
 
     @staticmethod
     def parse_csv(file: str):
         """Parse expenses from csv file."""
+        return list(Expense.iter_csv(file))
+
+    @staticmethod
+    def parse_json(file: str):
+        """Parse expenses from a json file"""
+        return list(Expense.iter_json(file))
+
+    @staticmethod
+    def parse_ndjson(file: str):
+        """Parse expenses from a newline delimited json file, one object per line"""
+        return list(Expense.iter_ndjson(file))
+
+    @staticmethod
+    def iter_csv(file: str) -> Iterator["Expense"]:
+        """
+        Lazily parse expenses from csv file, one row at a time.
+        Rows without a category are auto categorised.
+        """
+        from csv import DictReader
         try:
-            with open(file, "r") as csv_file:
+            with _open_import_file(file) as csv_file:
                 reader = DictReader(csv_file)
                 reader.fieldnames = [name.lower()
                                      for name in reader.fieldnames]
-                return [
-                    Expense(
+                for row in reader:
+                    yield Expense(
                         amount=float(row["amount"]),
-                        category=row["category"],
+                        category=row.get("category") or None,
                         date=datetime.fromisoformat(row["date"]),
                         description=row["description"],
                     )
-                    for row in reader
-                ]
         except ValueError:
             raise InvalidImportFileError(
                 "Some fields may not be of the right type. 'amount' should be a number and 'date' is in the ISO format.")
@@ -78,17 +163,37 @@ for {self.description} on {self.date.isoformat()}. [{self.category}]"
             raise RuntimeError("Could not parse file")
 
     @staticmethod
-    def parse_json(file: str):
-        """Parse expenses from a json file"""
+    def iter_json(file: str) -> Iterator["Expense"]:
+        """
+        Lazily parse expenses from a json file holding an array of objects or a single object.
+        Arrays are decoded one element at a time, so the file is never fully loaded.
+        """
+        import json
         try:
-            with open(file, "r") as json_file:
-                result = json.loads(json_file.read())
-                if isinstance(result, list):
-                    return [Expense.from_dict(obj) for obj in result]
-                return [Expense.from_dict(result)]
+            with _open_import_file(file) as json_file:
+                for obj in _iter_json_values(json_file):
+                    yield Expense.from_dict(obj)
         except json.JSONDecodeError:
             raise InvalidImportFileError("File does not contain valid json")
         except FileNotFoundError:
             raise InvalidImportFileError("Import file does not exist")
         except Exception:
             raise RuntimeError("Could not parse file")
+
+    @staticmethod
+    def iter_ndjson(file: str) -> Iterator["Expense"]:
+        """Lazily parse expenses from a newline delimited json file, one object per line"""
+        import json
+        line_number = 0
+        try:
+            with _open_import_file(file) as ndjson_file:
+                for line_number, line in enumerate(ndjson_file, start=1):
+                    if line.strip():
+                        yield Expense.from_dict(json.loads(line))
+        except json.JSONDecodeError:
+            raise InvalidImportFileError(
+                f"Line {line_number} does not contain valid json")
+        except FileNotFoundError:
+            raise InvalidImportFileError("Import file does not exist")
+        except Exception:
+            raise RuntimeError("Could not parse file")
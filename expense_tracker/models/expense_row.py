@@ -0,0 +1,65 @@
+from datetime import datetime
+from operator import itemgetter
+import sqlite3
+
+from expense_tracker.utils import Utils
+
+# every row of a category shares one string instead of a copy per row
+_categories: dict[str, str] = {}
+
+
+class ExpenseRow(tuple):
+    """
+    A read-only expense as stored in the database: (id, amount in cents, description, date, category).
+
+    Rows are tuples underneath, so there is no per-instance __dict__, nothing is
+    categorised, category names are shared and the ISO date is only parsed when 'date' is read.
+    DBClient creates them through ExpenseRow.row_factory.
+    """
+    __slots__ = ()
+
+    id = property(itemgetter(0))
+    amount_cents = property(itemgetter(1))
+    description = property(itemgetter(2))
+    # the date as stored, an ISO string
+    date_text = property(itemgetter(3))
+    category = property(itemgetter(4))
+
+    @property
+    def amount(self) -> float:
+        """The amount in currency units. eg: 1050 cents = 10.5"""
+        return self[1] / 100
+
+    @property
+    def date(self) -> datetime:
+        """The date parsed into a datetime. Parsed again on every access."""
+        return datetime.fromisoformat(self[3])
+
+    @staticmethod
+    def row_factory(cursor: sqlite3.Cursor, row: tuple) -> "ExpenseRow":
+        """sqlite3 row factory for queries selecting id, amount_cents, description, date, category."""
+        category = row[4]
+        return tuple.__new__(ExpenseRow, (row[0], row[1], row[2], row[3], _categories.setdefault(category, category)))
+
+    def __repr__(self):
+        return f"{self[0]}. {Utils.format_cents(self[1])} \
+for {self[2]} on {self[3]}. [{self[4]}]"
+
+    def to_dict(self):
+        """Convert the row to the dictionary representation of an Expense."""
+        return {
+            "id": self[0],
+            "amount": self[1] / 100,
+            "description": self[2],
+            "date": self[3],
+            "category": self[4]
+        }
+
+    def to_csv(self):
+        """Convert the row to the CSV format of an Expense"""
+        from csv import writer
+        from io import StringIO
+        line = StringIO()
+        writer(line, lineterminator="").writerow(
+            (self[0], self[1] / 100, self[2], self[4], self[3]))
+        return line.getvalue()
@@ -5,4 +5,28 @@ from dataclasses import dataclass
 class ExpenseSummary:
     """Class to represent expense summary by category"""
     category: str
-    amount: float
+    amount_cents: int
+
+
+@dataclass
+class PeriodSummary:
+    """Class to represent expense summary by period and category"""
+    period: str
+    category: str
+    amount_cents: int
+
+
+@dataclass
+class GroupTotal:
+    """Class to represent the total and number of expenses in a group"""
+    label: str
+    amount_cents: int
+    count: int
+
+
+@dataclass
+class DailyTotal:
+    """Class to represent the expenses of a day and of the window ending on that day"""
+    date: str
+    amount_cents: int
+    window_amount_cents: int
@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class GroupKey(str, Enum):
+    CATEGORY = "category"
+    DAY = "day"
+    WEEKDAY = "weekday"
+    MONTH = "month"
+    YEAR = "year"
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ImportResult:
+    """Class to represent the outcome of an import"""
+    count: int
+    elapsed: float
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # rows already in the database, see Utils.content_hash
+    skipped: int = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Import throughput, counting inserted and skipped rows"""
+        return (self.count + self.skipped) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def cache_lookups(self) -> int:
+        """Number of auto categorised expenses"""
+        return self.cache_hits + self.cache_misses
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of auto categorised expenses answered from the category cache"""
+        return self.cache_hits / self.cache_lookups if self.cache_lookups > 0 else 0.0
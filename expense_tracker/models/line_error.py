@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class LineError:
+    """Class to represent a line of input that could not be added"""
+    # 1 based
+    line: int
+    text: str
+    message: str
@@ -4,3 +4,5 @@ from enum import Enum
 class FileFormat(str, Enum):
     CSV = "csv"
     JSON = "json"
+    NDJSON = "ndjson"
+    SNAPSHOT = "snapshot"
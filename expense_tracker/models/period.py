@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class Period(str, Enum):
+    MONTH = "month"
+    QUARTER = "quarter"
+    YEAR = "year"
@@ -0,0 +1,131 @@
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterator
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, peak memory is then not reported
+    resource = None
+
+# returned by Profiler.phase while profiling is off, so a disabled phase costs one attribute check
+_NO_PHASE = nullcontext()
+
+
+class Profile:
+    """
+    Measurements of a single command: wall time per phase, rows fetched, peak memory
+    and, when tracing, every SQL statement run.
+
+    sqlite3 only reports when a statement starts, so a statement's time runs until the
+    next statement starts or the phase running it ends. For streamed reads this
+    includes the time the caller spends on each batch.
+    """
+
+    def __init__(self, trace_sql: bool = False):
+        """
+        Args:
+            trace_sql (bool): Record every SQL statement with its timing
+        """
+        self.started = time.perf_counter()
+        self.phases: dict[str, list[float | int]] = {}
+        self.rows = 0
+        self.statements: list[list[str | float]] = []
+        self._statement_start: float | None = None
+        # ConnectionManager compares callbacks by identity, so keep a single bound method
+        self.trace_callback: Callable[[str], None] | None = self.trace if trace_sql else None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent inside the block to the phase 'name'. Phases may nest."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.end_statement(end)
+            totals = self.phases.setdefault(name, [0.0, 0])
+            totals[0] += end - start
+            totals[1] += 1
+
+    def trace(self, statement: str):
+        """sqlite3 trace callback, called as every statement starts."""
+        now = time.perf_counter()
+        self.end_statement(now)
+        self.statements.append([statement, 0.0])
+        self._statement_start = now
+
+    def end_statement(self, now: float):
+        """Stop the clock of the statement running, if any."""
+        if self._statement_start is not None:
+            self.statements[-1][1] = now - self._statement_start
+            self._statement_start = None
+
+    def report(self) -> dict[str, any]:
+        """Returns the measurements as a json serialisable dictionary."""
+        self.end_statement(time.perf_counter())
+        return {
+            "wall": time.perf_counter() - self.started,
+            "phases": {name: {"seconds": seconds, "calls": calls}
+                       for name, (seconds, calls) in self.phases.items()},
+            "rows": self.rows,
+            "peak_memory": peak_memory(),
+            "statements": [{"sql": sql, "seconds": seconds} for sql, seconds in self.statements],
+        }
+
+
+class Profiler:
+    """
+    Hooks the rest of the application calls to report what it is doing.
+    Every hook is a no-op until Profiler.start is called.
+    """
+    active: Profile | None = None
+
+    @staticmethod
+    def start(trace_sql: bool = False) -> Profile:
+        """
+        Start recording into a new Profile and return it.
+
+        Args:
+            trace_sql (bool): Record every SQL statement with its timing
+        """
+        Profiler.active = Profile(trace_sql)
+        return Profiler.active
+
+    @staticmethod
+    def stop() -> Profile | None:
+        """Stop recording and return the profile that was active."""
+        profile, Profiler.active = Profiler.active, None
+        return profile
+
+    @staticmethod
+    def phase(name: str):
+        """
+        Context manager timing a phase, eg: connect, query, materialise, render.
+
+        Args:
+            name (str): The name of the phase
+        """
+        profile = Profiler.active
+        return _NO_PHASE if profile is None else profile.phase(name)
+
+    @staticmethod
+    def add_rows(count: int):
+        """Count rows fetched from the database."""
+        if Profiler.active is not None:
+            Profiler.active.rows += count
+
+    @staticmethod
+    def trace_callback() -> Callable[[str], None] | None:
+        """Returns the sqlite3 trace callback to install on connections, None while not tracing."""
+        return Profiler.active.trace_callback if Profiler.active is not None else None
+
+
+def peak_memory() -> int | None:
+    """Returns the peak resident memory of the process in bytes, None where it is not available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes everywhere but macOS
+    return peak if sys.platform == "darwin" else peak * 1024
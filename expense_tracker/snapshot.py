@@ -0,0 +1,134 @@
+import sys
+import mmap
+import struct
+from array import array
+from typing import BinaryIO, Iterable, Iterator
+
+from expense_tracker.models.exceptions import InvalidImportFileError
+
+MAGIC = b"EXPSNAP\x00"
+VERSION = 1
+# magic, version, number of strings, number of rows, offset of the string table
+HEADER = struct.Struct("<8sIIQQ")
+# id, amount in cents, ISO date (NUL padded), description and category as string table indexes
+DATE_SIZE = 32
+RECORD = struct.Struct(f"<qq{DATE_SIZE}sII")
+# records are written to the file this many bytes at a time
+CHUNK_SIZE = 1024 * 1024
+
+
+class Snapshot:
+    """
+    A compact binary copy of the expenses table.
+
+    Layout, all little endian: a header, one fixed width record per row and a string
+    table holding every distinct description and category once. The table is an
+    array of u32 byte lengths followed by the UTF-8 bytes of the strings.
+    Amounts are stored as integer cents and dates as the text the database holds,
+    so nothing is converted, formatted or parsed on the way in or out.
+    """
+
+    @staticmethod
+    def write(rows: Iterable[tuple], output: BinaryIO) -> int:
+        """
+        Stream rows to a snapshot file and return the number of rows written.
+        The counts in the header are filled in last, so 'output' must be seekable.
+
+        Args:
+            rows (Iterable[tuple]): (id, amount in cents, description, date, category) tuples. eg: DBClient.iter_rows(cents=True)
+            output (BinaryIO): The file to write to
+        """
+        if not output.seekable():
+            raise ValueError("Snapshots can only be written to a file, not a pipe or stdout")
+        start = output.tell()
+        output.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        # the index of every distinct string, in the order they are first seen
+        strings: dict[str, int] = {}
+        pack = RECORD.pack
+        chunk = bytearray()
+        count = 0
+        for id, amount_cents, description, date, category in rows:
+            date = date.encode("ascii")
+            if len(date) > DATE_SIZE:
+                raise ValueError(f"Date is too long for a snapshot: {date.decode()}")
+            chunk += pack(id, amount_cents, date,
+                          strings.setdefault(description, len(strings)),
+                          strings.setdefault(category, len(strings)))
+            count += 1
+            if len(chunk) >= CHUNK_SIZE:
+                output.write(chunk)
+                chunk.clear()
+        output.write(chunk)
+        strings_offset = output.tell() - start
+        encoded = [string.encode() for string in strings]
+        lengths = array("I", map(len, encoded))
+        if sys.byteorder == "big":
+            lengths.byteswap()
+        output.write(lengths.tobytes())
+        output.write(b"".join(encoded))
+        end = output.tell()
+        output.seek(start)
+        output.write(HEADER.pack(MAGIC, VERSION, len(strings), count, strings_offset))
+        output.seek(end)
+        return count
+
+    @staticmethod
+    def read(file: str) -> Iterator[tuple[int, str, str, str]]:
+        """
+        Lazily read the (amount in cents, description, date, category) rows of a snapshot,
+        ready for DBClient.add_rows(rows, cents=True). The file is memory mapped and records are
+        unpacked straight from the mapping, so memory holds the string table and nothing more.
+
+        Args:
+            file (str): Path to the snapshot file
+        """
+        if file == "-":
+            raise InvalidImportFileError("Snapshots can only be read from a file, not stdin")
+        try:
+            snapshot = open(file, "rb")
+        except FileNotFoundError:
+            raise InvalidImportFileError("Import file does not exist")
+        with snapshot:
+            try:
+                buffer = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise InvalidImportFileError("File is not an expense snapshot")
+            with buffer:
+                strings, strings_offset = _read_header(buffer)
+                records = memoryview(buffer)[HEADER.size:strings_offset]
+                unpacked = RECORD.iter_unpack(records)
+                try:
+                    for _, amount_cents, date, description, category in unpacked:
+                        yield (amount_cents, strings[description],
+                               date.rstrip(b"\x00").decode("ascii"), strings[category])
+                except (IndexError, UnicodeDecodeError):
+                    raise InvalidImportFileError("Snapshot is truncated or corrupt")
+                finally:
+                    # the mapping cannot be closed while anything still points into it
+                    del unpacked
+                    records.release()
+
+
+def _read_header(buffer: mmap.mmap) -> tuple[list[str], int]:
+    """Validate a snapshot and return its decoded string table and string table offset."""
+    if len(buffer) < HEADER.size:
+        raise InvalidImportFileError("File is not an expense snapshot")
+    magic, version, string_count, row_count, strings_offset = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise InvalidImportFileError("File is not an expense snapshot")
+    if version != VERSION:
+        raise InvalidImportFileError(f"Unsupported snapshot version: {version}")
+    lengths_end = strings_offset + 4 * string_count
+    if strings_offset != HEADER.size + row_count * RECORD.size or lengths_end > len(buffer):
+        raise InvalidImportFileError("Snapshot is truncated or corrupt")
+    lengths = array("I")
+    lengths.frombytes(buffer[strings_offset:lengths_end])
+    if sys.byteorder == "big":
+        lengths.byteswap()
+    if lengths_end + sum(lengths) != len(buffer):
+        raise InvalidImportFileError("Snapshot is truncated or corrupt")
+    strings, position = [], lengths_end
+    for length in lengths:
+        strings.append(buffer[position:position + length].decode())
+        position += length
+    return strings, strings_offset
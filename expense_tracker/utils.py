@@ -1,5 +1,9 @@
-import locale
-import platform
+from datetime import datetime
+from hashlib import blake2b
+from typing import Iterable
+
+from .categoriser import KeywordMatcher
+from .currency import CurrencyFormatter
 
 
 class Utils:
@@ -153,6 +157,11 @@ class Utils:
         ]
     }
 
+    # compiled from 'categories' on first use
+    _matcher: KeywordMatcher | None = None
+    # created with the locale conventions on first use
+    _currency_formatter: CurrencyFormatter | None = None
+
     @staticmethod
     def format_currency(amount: float) -> str:
         """
@@ -161,23 +170,35 @@ class Utils:
         Args:
             amount (float): The amount to format.
         """
-        try:
-            loc = locale.getlocale()
-            if loc == (None, None):
-                if platform.system() == "Windows":
-                    locale.setlocale(
-                        locale.LC_ALL, "English_United States.1252")
-                else:
-                    locale.setlocale(locale.LC_ALL, "en_US.UTF-8")
-        except Exception:
-            if platform.system() == "Windows":
-                locale.setlocale(locale.LC_ALL, "English_United States.1252")
-            else:
-                locale.setlocale(locale.LC_ALL, "en_US.UTF-8")
-        try:
-            return locale.currency(amount, grouping=True)
-        except Exception:
-            return f"${amount:,.2f}"
+        return Utils.get_currency_formatter().format(amount)
+
+    @staticmethod
+    def format_cents(cents: int) -> str:
+        """
+        Format an amount in cents as a currency string, without going through a float.
+
+        Args:
+            cents (int): The amount to format, in cents. eg: 1050 = $10.50
+        """
+        return Utils.get_currency_formatter().format_cents(cents)
+
+    @staticmethod
+    def to_cents(amount: float) -> int:
+        """
+        Convert an amount to the integer cents it is stored as. eg: 10.5 = 1050
+        Amounts with more than two decimals are rounded to the nearest cent.
+
+        Args:
+            amount (float): The amount
+        """
+        return round(amount * 100)
+
+    @staticmethod
+    def get_currency_formatter() -> CurrencyFormatter:
+        """Returns the currency formatter, resolving the locale on first use."""
+        if Utils._currency_formatter is None:
+            Utils._currency_formatter = CurrencyFormatter()
+        return Utils._currency_formatter
 
     @staticmethod
     def month_short_to_full(month: str) -> str:
@@ -206,6 +227,127 @@ class Utils:
                 f"Invalid month. Available options: {", ".join(Utils.month_ordinals.keys())}")
         return Utils.month_ordinals[month]
 
+    @staticmethod
+    def month_date_range(month: str, year: str) -> tuple[str, str]:
+        """
+        Returns the half-open ISO date range [start, end) covering a month.
+        Eg: ("10", "2024") = ("2024-10-01", "2024-11-01").
+
+        Args:
+            month (str): Ordinal of the month. eg: 1, 10
+            year (str): The year in the format YYYY
+        """
+        month_number, year_number = int(month), int(year)
+        if month_number == 12:
+            next_month, next_year = 1, year_number + 1
+        else:
+            next_month, next_year = month_number + 1, year_number
+        return (f"{year_number:04d}-{month_number:02d}-01", f"{next_year:04d}-{next_month:02d}-01")
+
+    @staticmethod
+    def parse_year_month(value: str) -> str:
+        """
+        Validate a month in the format YYYY-MM and return it zero padded.
+        Eg: "2025-1" = "2025-01"
+
+        Args:
+            value (str): The month in the format YYYY-MM
+        """
+        try:
+            year, month = value.split("-")
+            if not 1 <= int(month) <= 12 or len(year) != 4:
+                raise ValueError()
+            return f"{int(year):04d}-{int(month):02d}"
+        except ValueError:
+            raise ValueError(
+                f"Invalid month '{value}'. Expected the format YYYY-MM. eg: 2025-01")
+
+    @staticmethod
+    def parse_cursor(cursor: str) -> tuple[str, int]:
+        """
+        Parse a pagination cursor in the format <date>,<id>.
+        Eg: "2025-10-01T12:00:00,42" = ("2025-10-01T12:00:00", 42)
+
+        Args:
+            cursor (str): The cursor printed at the end of a page
+        """
+        try:
+            date, id = cursor.rsplit(",", 1)
+            datetime.fromisoformat(date)
+            return (date, int(id))
+        except ValueError:
+            raise ValueError(
+                "Invalid cursor. Expected the format <date>,<id>. eg: 2025-10-01T12:00:00,42")
+
+    @staticmethod
+    def parse_users_cursor(cursor: str) -> tuple[str, int, str]:
+        """
+        Parse a pagination cursor over many users in the format <date>,<id>,<name>.
+        Eg: "2025-10-01T12:00:00,42,alice" = ("2025-10-01T12:00:00", 42, "alice")
+
+        Args:
+            cursor (str): The cursor printed at the end of a page
+        """
+        try:
+            date, id, name = cursor.split(",", 2)
+            datetime.fromisoformat(date)
+            return (date, int(id), name)
+        except ValueError:
+            raise ValueError(
+                "Invalid cursor. Expected the format <date>,<id>,<name>. eg: 2025-10-01T12:00:00,42,alice")
+
+    @staticmethod
+    def parse_search_cursor(cursor: str) -> tuple[float | None, int]:
+        """
+        Parse a search pagination cursor in the format <rank>,<id>, or <id> for
+        results ordered by newest. Eg: "-4.25,42" = (-4.25, 42), "42" = (None, 42)
+
+        Args:
+            cursor (str): The cursor printed at the end of a page of search results
+        """
+        try:
+            rank, _, id = cursor.rpartition(",")
+            return (float(rank) if rank else None, int(id))
+        except ValueError:
+            raise ValueError(
+                "Invalid cursor. Expected the format <rank>,<id> or <id>. eg: -4.25,42")
+
+    @staticmethod
+    def to_fts_query(text: str) -> str:
+        """
+        Turn search terms into an FTS5 query matching rows that contain every term.
+        Terms are quoted, so punctuation is matched rather than parsed as query syntax.
+        A trailing '*' makes a term match as a prefix. Eg: uber caf* = "uber" AND "caf"*
+
+        Args:
+            text (str): The search terms separated by whitespace
+        """
+        terms = []
+        for term in text.split():
+            prefix = term.endswith("*")
+            term = term.rstrip("*")
+            if term:
+                terms.append(f'"{term.replace('"', '""')}"{"*" if prefix else ""}')
+        if len(terms) == 0:
+            raise ValueError("Provide at least one search term.")
+        return " AND ".join(terms)
+
+    @staticmethod
+    def content_hash(amount_cents: int, date: str, description: str) -> int:
+        """
+        Fingerprint an expense for duplicate detection as a signed 64 bit integer.
+        The description is compared ignoring case and repeated whitespace,
+        so re-imported rows from the same statement hash the same.
+        The category is left out: it may have been auto categorised differently.
+
+        Args:
+            amount_cents (int): The expense amount in cents, see Utils.to_cents
+            date (str): The ISO date the expense is stored with
+            description (str): The expense description
+        """
+        key = f"{amount_cents}|{date}|{" ".join(description.split()).casefold()}"
+        return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), "big", signed=True)
+
     @staticmethod
     def auto_categorise(description: str) -> str:
         """
@@ -214,8 +356,22 @@ class Utils:
         Args:
             description (str): the expense description
         """
-        description_lower = description.lower()
-        for key, words in Utils.categories.items():
-            if any(word in description_lower for word in words):
-                return key
-        return "Other"
+        return Utils.get_matcher().match(description)
+
+    @staticmethod
+    def auto_categorise_many(descriptions: Iterable[str]) -> list[str]:
+        """
+        Determine the categories of many expenses, in order.
+        Repeated descriptions are answered from a cache.
+
+        Args:
+            descriptions (Iterable[str]): the expense descriptions
+        """
+        return Utils.get_matcher().match_many(descriptions)
+
+    @staticmethod
+    def get_matcher() -> KeywordMatcher:
+        """Returns the keyword matcher, compiling it from 'categories' on first use."""
+        if Utils._matcher is None:
+            Utils._matcher = KeywordMatcher(Utils.categories)
+        return Utils._matcher
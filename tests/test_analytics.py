@@ -0,0 +1,142 @@
+import random
+import pytest
+from datetime import date
+
+from expense_tracker import analytics
+from expense_tracker.analytics import Ledger, epoch_day, epoch_day_to_date
+from expense_tracker.models.group_key import GroupKey
+from expense_tracker.models.expense_summary import GroupTotal
+
+CATEGORIES = ["Food", "Transport", "Rent", "Other"]
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(
+    analytics.numpy is None, reason="numpy is not installed"))]
+
+
+def make_rows(count: int, seed: int = 0) -> list[tuple[int, int, int, str]]:
+    rng = random.Random(seed)
+    day = epoch_day(date(2024, 12, 20))
+    rows = []
+    for id in range(1, count + 1):
+        day += rng.choice((0, 0, 1, 3))
+        rows.append((id, rng.randrange(100, 20000),
+                     day, rng.choice(CATEGORIES)))
+    return rows
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+class TestLedger:
+    def setup_method(self):
+        self.rows = make_rows(500)
+
+    def test_epoch_day_round_trip(self, use_numpy):
+        assert epoch_day(date(1970, 1, 1)) == 0
+        assert epoch_day_to_date(epoch_day(date(2024, 2, 29))) == date(2024, 2, 29)
+
+    def test_from_rows_should_intern_categories(self, use_numpy):
+        ledger = Ledger.from_rows(self.rows, use_numpy)
+        assert len(ledger) == 500
+        assert sorted(ledger.categories) == sorted(CATEGORIES)
+        assert [ledger.categories[code] for code in ledger.codes] == [
+            row[3] for row in self.rows]
+        assert ledger.total() == sum(row[1] for row in self.rows)
+
+    def test_group_by_category(self, use_numpy):
+        groups = Ledger.from_rows(self.rows, use_numpy).group_by(GroupKey.CATEGORY)
+        assert [group.label for group in groups] == sorted(CATEGORIES)
+        for group in groups:
+            amounts = [row[1] for row in self.rows if row[3] == group.label]
+            assert group.count == len(amounts)
+            assert group.amount_cents == sum(amounts)
+
+    @pytest.mark.parametrize("key, label_of", [
+        (GroupKey.DAY, lambda value: value.isoformat()),
+        (GroupKey.MONTH, lambda value: value.strftime("%Y-%m")),
+        (GroupKey.YEAR, lambda value: str(value.year)),
+        (GroupKey.WEEKDAY, lambda value: value.strftime("%a")),
+    ])
+    def test_group_by_date(self, use_numpy, key, label_of):
+        expected = {}
+        for _, amount, day, _ in self.rows:
+            label = label_of(epoch_day_to_date(day))
+            total, count = expected.get(label, (0, 0))
+            expected[label] = (total + amount, count + 1)
+        groups = Ledger.from_rows(self.rows, use_numpy).group_by(key)
+        assert {group.label: group.count for group in groups} == {
+            label: count for label, (_, count) in expected.items()}
+        for group in groups:
+            assert group.amount_cents == expected[group.label][0]
+        if key != GroupKey.WEEKDAY:
+            assert [group.label for group in groups] == sorted(expected)
+
+    def test_group_by_should_handle_empty_ledger(self, use_numpy):
+        assert Ledger(use_numpy=use_numpy).group_by(GroupKey.MONTH) == []
+        assert Ledger(use_numpy=use_numpy).rolling(7) == []
+        assert Ledger(use_numpy=use_numpy).top_expenses(3) == []
+
+    def test_filter(self, use_numpy):
+        ledger = Ledger.from_rows(self.rows, use_numpy)
+        start, end = date(2025, 1, 10), date(2025, 2, 5)
+        filtered = ledger.filter(start, end, ["Food", "Rent", "Unknown"], 20, 150.5)
+        expected = [row for row in self.rows
+                    if epoch_day(start) <= row[2] <= epoch_day(end)
+                    and row[3] in ("Food", "Rent") and 2000 <= row[1] <= 15050]
+        assert [*filtered.ids] == [row[0] for row in expected]
+        assert [*filtered.cents] == [row[1] for row in expected]
+        assert [*filtered.days] == [row[2] for row in expected]
+        assert [filtered.categories[code]
+                for code in filtered.codes] == [row[3] for row in expected]
+
+    def test_filter_without_conditions_should_copy(self, use_numpy):
+        ledger = Ledger.from_rows(self.rows, use_numpy)
+        copy = ledger.filter()
+        assert [*copy.ids] == [*ledger.ids]
+        assert copy.ids is not ledger.ids
+
+    def test_rolling(self, use_numpy):
+        daily = Ledger.from_rows(self.rows, use_numpy).rolling(7)
+        first, last = self.rows[0][2], self.rows[-1][2]
+        assert len(daily) == last - first + 1
+        for offset, row in enumerate(daily):
+            day = first + offset
+            assert row.date == epoch_day_to_date(day).isoformat()
+            assert row.amount_cents == sum(r[1] for r in self.rows if r[2] == day)
+            assert row.window_amount_cents == sum(r[1] for r in self.rows if day - 7 < r[2] <= day)
+
+    def test_rolling_window_longer_than_range(self, use_numpy):
+        rows = [(1, 100, 10, "Food"), (2, 200, 12, "Food")]
+        daily = Ledger.from_rows(rows, use_numpy).rolling(30)
+        assert [(row.amount_cents, row.window_amount_cents) for row in daily] == [
+            (100, 100), (0, 100), (200, 300)]
+
+    def test_totals_should_be_exact(self, use_numpy):
+        # 0.1 + 0.2 is 0.30000000000000004 when added up as floats
+        rows = [(1, 10, 10, "Food"), (2, 20, 10, "Food")]
+        ledger = Ledger.from_rows(rows, use_numpy)
+        assert ledger.total() == 30
+        assert ledger.group_by(GroupKey.CATEGORY) == [GroupTotal("Food", 30, 2)]
+        assert [(row.amount_cents, row.window_amount_cents) for row in ledger.rolling(1)] == [(30, 30)]
+
+    def test_rolling_should_reject_empty_window(self, use_numpy):
+        with pytest.raises(ValueError):
+            Ledger.from_rows(self.rows, use_numpy).rolling(0)
+
+    def test_top_expenses(self, use_numpy):
+        top = Ledger.from_rows(self.rows, use_numpy).top_expenses(5)
+        expected = sorted(self.rows, key=lambda row: -row[1])[:5]
+        assert [row[3] for row in top] == [row[1] for row in expected]
+        assert [row[0] for row in top] == [row[0] for row in expected]
+        assert top[0][1] == epoch_day_to_date(expected[0][2]).isoformat()
+
+    def test_top_groups(self, use_numpy):
+        ledger = Ledger.from_rows(self.rows, use_numpy)
+        top = ledger.top_groups(GroupKey.CATEGORY, 2)
+        assert top == sorted(ledger.group_by(GroupKey.CATEGORY),
+                             key=lambda group: -group.amount_cents)[:2]
+        assert isinstance(top[0], GroupTotal)
+
+
+def test_ledger_should_require_numpy_when_requested(monkeypatch):
+    monkeypatch.setattr(analytics, "numpy", None)
+    with pytest.raises(ValueError):
+        Ledger(use_numpy=True)
+    assert Ledger().use_numpy is False
@@ -0,0 +1,79 @@
+import random
+
+from expense_tracker.categoriser import KeywordMatcher
+from expense_tracker.utils import Utils
+
+
+def naive_categorise(description: str) -> str:
+    """The original keyword loop, used as the reference."""
+    description_lower = description.lower()
+    for key, words in Utils.categories.items():
+        if any(word in description_lower for word in words):
+            return key
+    return "Other"
+
+
+class TestKeywordMatcher:
+    def setup_method(self):
+        self.matcher = KeywordMatcher(Utils.categories)
+
+    def test_should_return_default_without_keyword(self):
+        assert self.matcher.match("Something unrelated") == "Other"
+        assert self.matcher.match("") == "Other"
+
+    def test_should_match_case_insensitive_substrings(self):
+        assert self.matcher.match("NETFLIX.COM") == "Entertainment"
+        assert self.matcher.match("UberTrip 1234") == "Transport"
+
+    def test_first_category_should_win(self):
+        # "book" is both Entertainment and Education
+        assert self.matcher.match("Book store") == "Entertainment"
+        # "gift" is both Shopping and Miscellaneous
+        assert self.matcher.match("Birthday gift") == "Shopping"
+
+    def test_contained_keyword_should_win(self):
+        # "barber" (Personal Care) contains "bar" (Food & Drinks)
+        assert self.matcher.match("Barber shop") == "Food & Drinks"
+
+    def test_overlapping_keyword_should_win(self):
+        # "atm" (Finance & Fees) is found first and overlaps "meal" (Food & Drinks)
+        assert self.matcher.match("ATMEAL") == "Food & Drinks"
+
+    def test_should_match_the_naive_loop(self):
+        rng = random.Random(42)
+        words = [word for words in Utils.categories.values()
+                 for word in words]
+        filler = ["the", "card", "payment", "ref", "x", "online", "to"]
+        for _ in range(5000):
+            parts = [rng.choice(words + filler)
+                     for _ in range(rng.randint(0, 4))]
+            description = rng.choice(["", " ", "-"]).join(parts)
+            if rng.random() < 0.3:
+                description = description.upper()
+            assert self.matcher.match(
+                description) == naive_categorise(description), description
+
+    def test_should_cache_normalised_descriptions(self):
+        assert self.matcher.match("UBER TRIP") == "Transport"
+        assert self.matcher.match("  uber trip ") == "Transport"
+        info = self.matcher.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+    def test_match_many_should_match_in_order(self):
+        descriptions = ["NETFLIX.COM", "Coffee", "NETFLIX.COM", "Unknown"]
+        assert self.matcher.match_many(descriptions) == [
+            "Entertainment", "Food & Drinks", "Entertainment", "Other"]
+        assert self.matcher.cache_info().hits == 1
+
+    def test_cache_should_be_bounded(self):
+        matcher = KeywordMatcher(Utils.categories, cache_size=2)
+        matcher.match_many(["a", "b", "c", "d"])
+        assert matcher.cache_info().currsize == 2
+
+    def test_auto_categorise_many(self):
+        assert Utils.auto_categorise_many(["Uber", "Gym"]) == [
+            "Transport", "Health & Fitness"]
+
+    def test_auto_categorise_should_use_matcher(self):
+        assert Utils.auto_categorise("Morning coffee") == "Food & Drinks"
+        assert Utils.auto_categorise("Unknown") == "Other"
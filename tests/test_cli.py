@@ -1,9 +1,10 @@
 import os
+import csv
 import json
 from typer.testing import CliRunner
 from expense_tracker.cli import app
 from expense_tracker.config import Config
-from expense_tracker.db.db_client import DBClient
+from expense_tracker.db.db_client import DBClient, DB_DIRECTORY
 
 
 class TestCli:
@@ -38,6 +39,7 @@ class TestCli:
         # the tuple returned by PRAGMA database_list has the format (seq, name, file)
         db_path = DBClient.get_connection().execute(
             "PRAGMA database_list;").fetchone()[2]
+        DBClient.close_connections()
         if os.path.exists(db_path):
             os.remove(db_path)
 
@@ -96,6 +98,29 @@ class TestCli:
         assert lines[0] == "Expenses for Oct, 2024"
         assert "2024-10-02T12:00:00" in lines[1]
 
+    def test_list_expense_with_cursor(self):
+        self.runner.invoke(app, ["init"])
+        for expense in self.expenses:
+            DBClient.add(expense)
+        result = self.runner.invoke(
+            app, ["list", "--month", "Oct", "--year", "2024", "--limit", "1"])
+        lines = result.output.splitlines()
+        assert len(lines) == 3
+        assert lines[2] == "Next page: --after 2024-10-01T12:00:00,1"
+        result = self.runner.invoke(
+            app, ["list", "--month", "Oct", "--year", "2024", "--limit", "1",
+                  "--after", "2024-10-01T12:00:00,1"])
+        lines = result.output.splitlines()
+        assert len(lines) == 2
+        assert "2024-10-02T12:00:00" in lines[1]
+
+    def test_list_expense_with_invalid_cursor(self):
+        self.runner.invoke(app, ["init"])
+        result = self.runner.invoke(
+            app, ["list", "--month", "Oct", "--year", "2024", "--after", "yesterday"])
+        assert result.exit_code == 1
+        assert "Invalid cursor" in result.output
+
     def test_summary(self):
         self.runner.invoke(app, ["init"])
         for expense in self.expenses:
@@ -107,6 +132,144 @@ class TestCli:
         assert "Entertainment" in result.output
         assert "112.3" in result.output
 
+    def test_summary_by_period(self):
+        self.runner.invoke(app, ["init"])
+        for expense in self.expenses:
+            DBClient.add(expense)
+        result = self.runner.invoke(
+            app, ["summary", "--from", "2024-01", "--to", "2024-12", "--by", "quarter"])
+        assert result.exit_code == 0
+        assert "Summary 2024-01 to 2024-12 by quarter" in result.output
+        assert "2024-Q3" in result.output
+        assert "2024-Q4" in result.output
+        assert "$274.60" in result.output
+
+    def test_summary_should_require_a_period(self):
+        result = self.runner.invoke(app, ["summary"])
+        assert result.exit_code == 1
+        assert "Provide --month and --year, or --from and --to." in result.output
+        result = self.runner.invoke(app, ["summary", "--from", "2024-13"])
+        assert result.exit_code == 1
+        assert "Expected the format YYYY-MM" in result.output
+
+    def test_analyze(self):
+        self.runner.invoke(app, ["init"])
+        for expense in self.expenses:
+            DBClient.add(expense)
+        result = self.runner.invoke(
+            app, ["analyze", "--from", "2024-10-01", "--by", "month", "--top", "1", "--rolling", "2"])
+        assert result.exit_code == 0
+        assert "Expenses by month" in result.output
+        assert "2024-10" in result.output
+        assert "2024-07" not in result.output
+        assert "$112.30" in result.output
+        assert "Largest 1 expenses" in result.output
+        assert "Rolling daily totals" in result.output
+        assert "Analyzed 2 expenses" in result.output
+
+    def test_analyze_should_filter_in_memory(self):
+        self.runner.invoke(app, ["init"])
+        for expense in self.expenses:
+            DBClient.add(expense)
+        result = self.runner.invoke(
+            app, ["analyze", "--category", "Food", "--min-amount", "100"])
+        assert result.exit_code == 0
+        assert "$162.30" in result.output
+        assert "Entertainment" not in result.output
+        result = self.runner.invoke(app, ["analyze", "--category", "Travel"])
+        assert "No transactions match." in result.output
+
+    def test_profile_should_report_phases(self):
+        self.runner.invoke(app, ["init"])
+        for expense in self.expenses:
+            DBClient.add(expense)
+        result = self.runner.invoke(
+            app, ["--profile", "summary", "--month", "Oct", "--year", "2024"])
+        assert result.exit_code == 0
+        assert "October Summary" in result.output
+        assert "Profile of summary" in result.output
+        assert "query" in result.output
+        assert "render" in result.output
+        assert "Rows fetched: 2" in result.output
+        assert "SQL statements" not in result.output
+
+    def test_trace_should_list_sql_statements(self):
+        self.runner.invoke(app, ["init"])
+        result = self.runner.invoke(
+            app, ["--trace", "list", "--month", "Oct", "--year", "2024"])
+        assert result.exit_code == 0
+        assert "SQL statements" in result.output
+        # the statement may wrap across lines of the table
+        assert "FROM expenses" in " ".join(result.output.split())
+
+    def test_profile_json_should_write_report(self):
+        report_file = "profile_test.json"
+        self.runner.invoke(app, ["init"])
+        try:
+            result = self.runner.invoke(
+                app, ["--trace", "--profile-json", report_file, "summary", "--month", "Oct", "--year", "2024"])
+            assert result.exit_code == 0
+            assert "Profile of" not in result.output
+            with open(report_file) as file:
+                report = json.load(file)
+        finally:
+            if os.path.exists(report_file):
+                os.remove(report_file)
+        assert report["command"] == "summary"
+        assert report["phases"]["query"]["calls"] >= 1
+        assert any("monthly_category_totals" in statement["sql"]
+                   for statement in report["statements"])
+
+    def test_search(self):
+        self.runner.invoke(app, ["init"])
+        for expense in self.expenses:
+            DBClient.add(expense)
+        result = self.runner.invoke(app, ["search", "food", "--limit", "1"])
+        assert result.exit_code == 0
+        assert "Groceries" in result.output
+        assert "Bread" not in result.output
+        cursor = result.output.split("--after ")[1].split()[0]
+        result = self.runner.invoke(
+            app, ["search", "food", "--limit", "1", "--after", cursor])
+        assert "Bread" in result.output
+        assert "Next page" not in result.output
+        result = self.runner.invoke(
+            app, ["search", "food", "--to", "2024-09-30", "--category", "Food"])
+        assert "Bread" in result.output
+        assert "Groceries" not in result.output
+        result = self.runner.invoke(app, ["search", "rent"])
+        assert "No matching expenses." in result.output
+
+    def test_search_newest(self):
+        self.runner.invoke(app, ["init"])
+        for expense in self.expenses:
+            DBClient.add(expense)
+        result = self.runner.invoke(app, ["search", "food", "--newest", "--limit", "1"])
+        assert "Bread" in result.output
+        assert "Next page: --after 3" in result.output
+        result = self.runner.invoke(
+            app, ["search", "food", "--newest", "--after", "3"])
+        assert "Groceries" in result.output
+        result = self.runner.invoke(app, ["search", "food", "--after", "3"])
+        assert result.exit_code == 1
+
+    def test_rebuild_summary(self):
+        self.runner.invoke(app, ["init"])
+        for expense in self.expenses:
+            DBClient.add(expense)
+        with DBClient.get_connection() as connection:
+            connection.execute("DELETE FROM monthly_category_totals")
+            connection.commit()
+        result = self.runner.invoke(app, ["rebuild-summary", "--check"])
+        assert result.exit_code == 1
+        assert "Monthly totals out of date" in result.output
+        result = self.runner.invoke(app, ["rebuild-summary"])
+        assert result.exit_code == 0
+        assert "Rebuilt monthly totals." in result.output
+        result = self.runner.invoke(app, ["rebuild-summary", "--check"])
+        assert result.exit_code == 0
+        assert "Monthly totals match the expenses." in result.output
+
     def test_export_csv(self):
         self.runner.invoke(app, ["init"])
         for expense in self.expenses:
@@ -119,6 +282,25 @@ class TestCli:
             assert len(lines) == 4
         os.remove("export_test.txt")
 
+    def test_export_csv_should_quote_fields(self):
+        self.runner.invoke(app, ["init"])
+        DBClient.add({
+            "amount": 12.0,
+            "description": 'Lunch, "the good one"',
+            "date": "2024-10-03T12:00:00",
+            "category": "Food"
+        })
+        result = self.runner.invoke(
+            app, ["export", "--output", "export_test.csv", "--format", "csv"])
+        assert result.exit_code == 0
+        with open("export_test.csv", newline="") as file:
+            rows = [row for row in csv.reader(file)]
+        os.remove("export_test.csv")
+        assert rows == [
+            ["ID", "Amount", "Description", "Category", "Date"],
+            ["1", "12.0", 'Lunch, "the good one"', "Food", "2024-10-03T12:00:00"]
+        ]
+
     def test_export_json(self):
         self.runner.invoke(app, ["init"])
         for expense in self.expenses:
@@ -133,6 +315,44 @@ class TestCli:
             assert len(parsed_expenses) == 3
         os.remove("export_test.json")
 
+    def test_export_ndjson(self):
+        self.runner.invoke(app, ["init"])
+        for expense in self.expenses:
+            DBClient.add(expense)
+        result = self.runner.invoke(
+            app, ["export", "--output", "export_test.ndjson", "--format", "ndjson"])
+        assert "Exported expenses to: export_test.ndjson" in result.output
+        with open("export_test.ndjson") as file:
+            parsed_expenses = [json.loads(line) for line in file]
+        os.remove("export_test.ndjson")
+        assert parsed_expenses == sorted(
+            self.expenses, key=lambda expense: expense["date"])
+
+    def test_export_and_import_snapshot(self):
+        self.runner.invoke(app, ["init"])
+        for expense in self.expenses:
+            DBClient.add(expense)
+        result = self.runner.invoke(
+            app, ["export", "--output", "export_test.snapshot", "--format", "snapshot"])
+        assert result.exit_code == 0
+        assert "Exported expenses to: export_test.snapshot" in result.output
+        os.environ[Config.ENV_DB_NAME] = "test_expenses_copy.db"
+        try:
+            self.runner.invoke(app, ["init"])
+            result = self.runner.invoke(
+                app, ["import", "--file", "export_test.snapshot", "--format", "snapshot"])
+            assert result.exit_code == 0
+            assert "Imported 3 expenses from: export_test.snapshot" in result.output
+            # ids are assigned again, in the date order of the export
+            assert [expense.to_dict() | {"id": None} for expense in DBClient.get_all()] == [
+                expense | {"id": None} for expense in sorted(self.expenses, key=lambda expense: expense["date"])]
+        finally:
+            db_path = DBClient.get_connection().execute("PRAGMA database_list;").fetchone()[2]
+            DBClient.close_connections()
+            os.remove(db_path)
+            os.remove("export_test.snapshot")
+            os.environ[Config.ENV_DB_NAME] = "test_expenses.db"
+
     def test_import_expenses_csv(self):
         import_file = "import_csv_test.csv"
         self.runner.invoke(app, ["init"])
@@ -142,17 +362,163 @@ class TestCli:
             file.writelines([
                 "amount,description,category,date\n",
                 "33.5,This is a test,Food,2025-05-12T12:00:00\n",
-                "33.5,This is a test,Transport,2025-05-12T12:00:00\n",
-                "33.5,This is a test,Entertainment,2025-05-12T12:00:00\n",
-                "33.5,This is a test,Health,2025-05-12T12:00:00\n",
+                "33.5,This is a test,Transport,2025-05-13T12:00:00\n",
+                "33.5,This is a test,Entertainment,2025-05-14T12:00:00\n",
+                "33.5,This is a test,Health,2025-05-15T12:00:00\n",
             ])
         result = self.runner.invoke(
             app, ["import", "--file", import_file, "--format", "csv"])
         expenses = DBClient.get_all()
         assert len(expenses) == 4
         assert f"Imported 4 expenses from: {import_file}" in result.output
+        assert "Skipped" not in result.output
         os.remove(import_file)
 
+    def test_import_expenses_should_skip_rows_already_recorded(self):
+        import_file = "import_csv_test.csv"
+        self.runner.invoke(app, ["init"])
+        with open(import_file, "w") as file:
+            file.write("amount,description,date\n")
+            file.writelines(
+                f"{i}.5,Coffee {i},2025-05-12T12:00:00\n" for i in range(6))
+        self.runner.invoke(app, ["import", "--file", import_file])
+        # an overlapping export: three rows seen before, one with different case and spacing
+        with open(import_file, "w") as file:
+            file.write("amount,description,date\n")
+            file.writelines(
+                f"{i}.5,Coffee {i},2025-05-12T12:00:00\n" for i in range(3, 8))
+            file.write("0.50,  COFFEE   0,2025-05-12T12:00:00\n")
+        result = self.runner.invoke(
+            app, ["import", "--file", import_file, "--workers", "2"])
+        os.remove(import_file)
+        assert result.exit_code == 0
+        assert f"Imported 2 expenses from: {import_file}" in result.output
+        assert "Skipped 4 expenses already recorded" in result.output
+        assert len(DBClient.get_all()) == 8
+
+    def test_add_should_record_the_same_expense_twice(self):
+        self.runner.invoke(app, ["init"])
+        for _ in range(2):
+            result = self.runner.invoke(app, ["add", "4.5", "Coffee"])
+            assert result.exit_code == 0
+            assert "Added: " in result.output
+        assert [row.description for row in DBClient.get_all()] == ["Coffee", "Coffee"]
+
+    def test_add_should_add_lines_from_stdin(self):
+        self.runner.invoke(app, ["init"])
+        result = self.runner.invoke(app, ["add", "--stdin"], input=(
+            "4.5\tCoffee\t2025-05-12T08:00:00\n"
+            "oops\tTea\n"
+            "12\tUber ride\n"
+            "4.5\tCoffee\t2025-05-12T08:00:00\n"
+        ))
+        assert result.exit_code == 1
+        # the repeated line is a second coffee, not one already recorded
+        assert "Added 3 expenses" in result.stdout
+        assert "already recorded" not in result.stdout
+        assert "Line 2: Amount is not a number" in result.stderr
+        assert [(row.description, row.category) for row in DBClient.get_all()] == [
+            ("Coffee", "Food & Drinks"), ("Coffee", "Food & Drinks"), ("Uber ride", "Transport")]
+
+    def test_add_should_add_lines_from_file(self):
+        import_file = "add_lines_test.tsv"
+        self.runner.invoke(app, ["init"])
+        with open(import_file, "w") as file:
+            file.writelines(f"{i}.5\tCoffee {i}\t2025-05-12\n" for i in range(25))
+        result = self.runner.invoke(app, ["add", "--file", import_file])
+        os.remove(import_file)
+        assert result.exit_code == 0
+        assert "Added 25 expenses" in result.output
+        assert len(DBClient.get_all()) == 25
+
+    def test_add_should_require_one_source(self):
+        self.runner.invoke(app, ["init"])
+        for args in (["add"], ["add", "3", "Tea", "--stdin"], ["add", "--stdin", "--file", "x"]):
+            result = self.runner.invoke(app, args)
+            assert result.exit_code == 1
+            assert "Error:" in result.output
+
+    def test_summary_and_list_across_users(self):
+        users = ["test_expenses", "test_expenses_other"]
+        for name in users:
+            # the environment is restored after each invoke, unlike --name
+            self.runner.invoke(app, ["init"], env={Config.ENV_DB_NAME: name})
+            self.runner.invoke(app, ["add", "--stdin"], env={Config.ENV_DB_NAME: name},
+                               input="50\tGroceries\t2024-10-01T12:00:00\n")
+        try:
+            result = self.runner.invoke(
+                app, ["summary", "--month", "Oct", "--year", "2024", "--names", ",".join(users), "--timings"])
+            assert result.exit_code == 0
+            assert "across 2 users" in result.stdout
+            assert "$100.00" in result.stdout
+            assert "Read 2 databases" in result.stderr
+            assert "test_expenses_other" in result.stderr
+            result = self.runner.invoke(
+                app, ["list", "--month", "Oct", "--year", "2024", "--names", users[0], "--names", users[1], "--limit", "1"])
+            assert result.exit_code == 0
+            assert "test_expenses: 1. $50.00 for Groceries" in result.stdout
+            assert "--after 2024-10-01T12:00:00,1,test_expenses" in result.stdout
+            result = self.runner.invoke(
+                app, ["summary", "--month", "Oct", "--year", "2024", "--names", "test_expenses_missing"])
+            assert result.exit_code == 1
+            assert "Skipped test_expenses_missing: Database does not exist" in result.stderr
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                path = DB_DIRECTORY / f"test_expenses_other.db{suffix}"
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def test_import_expenses_csv_in_batches(self):
+        import_file = "import_csv_test.csv"
+        self.runner.invoke(app, ["init"])
+        with open(import_file, "w") as file:
+            file.write("amount,description,category,date\n")
+            file.writelines(
+                f"{i}.5,Test {i},Food,2025-05-12T12:00:00\n" for i in range(25))
+        result = self.runner.invoke(
+            app, ["import", "--file", import_file, "--batch-size", "10"])
+        os.remove(import_file)
+        assert result.exit_code == 0
+        assert f"Imported 25 expenses from: {import_file}" in result.output
+        assert "rows/s" in result.output
+        assert len(DBClient.get_all()) == 25
+
+    def test_import_expenses_csv_with_workers(self):
+        import_file = "import_csv_test.csv"
+        self.runner.invoke(app, ["init"])
+        with open(import_file, "w") as file:
+            file.write("amount,description,date\n")
+            file.writelines(
+                f"{i}.5,Coffee {i},2025-05-12T12:00:{i:02d}\n" for i in range(50))
+        result = self.runner.invoke(
+            app, ["import", "--file", import_file, "--workers", "2", "--batch-size", "7"])
+        os.remove(import_file)
+        assert result.exit_code == 0
+        assert f"Imported 50 expenses from: {import_file}" in result.output
+        expenses = DBClient.get_all()
+        assert [expense.description for expense in expenses] == [
+            f"Coffee {i}" for i in range(50)]
+        assert all(expense.category == "Food & Drinks" for expense in expenses)
+
+    def test_import_expenses_should_report_category_cache_hit_rate(self):
+        import_file = "import_csv_test.csv"
+        self.runner.invoke(app, ["init"])
+        with open(import_file, "w") as file:
+            file.write("amount,description,date\n")
+            file.writelines(
+                f"{i}.5,UBER TRIP test-cache-hit-rate,2025-05-12T12:00:00\n" for i in range(4))
+        result = self.runner.invoke(app, ["import", "--file", import_file])
+        os.remove(import_file)
+        assert result.exit_code == 0
+        assert "Auto categorised 4 expenses, category cache hit rate: 75.0%" in result.output
+
+    def test_import_expenses_with_workers_should_reject_json(self):
+        self.runner.invoke(app, ["init"])
+        result = self.runner.invoke(
+            app, ["import", "--file", "import.json", "--format", "json", "--workers", "2"])
+        assert result.exit_code == 1
+        assert "--workers is only supported for CSV files" in result.output
+
     def test_import_expense_json(self):
         import_file = "import_json_test.json"
         self.runner.invoke(app, ["init"])
@@ -166,3 +532,25 @@ class TestCli:
         assert len(expenses) == 3
         assert f"Imported 3 expenses from: {import_file}" in result.output
         os.remove(import_file)
+
+    def test_import_expense_ndjson(self):
+        import_file = "import_ndjson_test.ndjson"
+        self.runner.invoke(app, ["init"])
+        if os.path.exists(import_file):
+            os.remove(import_file)
+        with open(import_file, "x") as file:
+            file.writelines(f"{json.dumps(expense)}\n" for expense in self.expenses)
+        result = self.runner.invoke(
+            app, ["import", "--file", import_file, "--format", "ndjson"])
+        expenses = DBClient.get_all()
+        assert len(expenses) == 3
+        assert f"Imported 3 expenses from: {import_file}" in result.output
+        os.remove(import_file)
+
+    def test_import_expense_ndjson_from_stdin(self):
+        self.runner.invoke(app, ["init"])
+        result = self.runner.invoke(
+            app, ["import", "--file", "-", "--format", "ndjson"],
+            input="".join(f"{json.dumps(expense)}\n" for expense in self.expenses))
+        assert result.exit_code == 0
+        assert len(DBClient.get_all()) == 3
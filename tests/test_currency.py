@@ -0,0 +1,57 @@
+import locale
+
+import pytest
+
+from expense_tracker.currency import CurrencyFormatter
+from expense_tracker.utils import Utils
+
+EN_US = {
+    "int_curr_symbol": "USD ", "currency_symbol": "$", "mon_decimal_point": ".",
+    "mon_thousands_sep": ",", "mon_grouping": [3, 3, 0], "positive_sign": "",
+    "negative_sign": "-", "int_frac_digits": 2, "frac_digits": 2, "p_cs_precedes": 1,
+    "p_sep_by_space": 0, "n_cs_precedes": 1, "n_sep_by_space": 0, "p_sign_posn": 1,
+    "n_sign_posn": 1, "decimal_point": ".", "thousands_sep": ",", "grouping": [3, 3, 0]
+}
+DE_DE = {
+    **EN_US, "currency_symbol": "€", "mon_decimal_point": ",", "mon_thousands_sep": ".",
+    "p_cs_precedes": 0, "p_sep_by_space": 1, "n_cs_precedes": 0, "n_sep_by_space": 1
+}
+# Indian style grouping: 3 digits, then every 2
+EN_IN = {**EN_US, "currency_symbol": "₹", "mon_grouping": [3, 2, 0]}
+# a single group and no repetition, with parentheses around negative amounts
+SINGLE_GROUP = {**EN_US, "mon_grouping": [3, 127], "n_sign_posn": 0}
+SIGN_AROUND_SYMBOL = {**EN_US, "n_sign_posn": 4,
+                      "p_sign_posn": 3, "positive_sign": "+", "frac_digits": 0}
+
+AMOUNTS = [0, 0.004, 1, -1, 12.5, -999.999, 1234.5,
+           -1234567.891, 98765432101.25, 1e15]
+
+
+class TestCurrencyFormatter:
+
+    @pytest.mark.parametrize("conventions", [EN_US, DE_DE, EN_IN, SINGLE_GROUP, SIGN_AROUND_SYMBOL])
+    def test_should_match_locale_currency(self, conventions, monkeypatch):
+        formatter = CurrencyFormatter(conventions)
+        monkeypatch.setattr(locale, "localeconv", lambda: conventions)
+        for amount in AMOUNTS:
+            assert formatter.format(amount) == locale.currency(
+                amount, grouping=True)
+
+    @pytest.mark.parametrize("conventions", [EN_US, DE_DE, EN_IN, SINGLE_GROUP, SIGN_AROUND_SYMBOL])
+    def test_format_cents_should_match_format(self, conventions):
+        formatter = CurrencyFormatter(conventions)
+        for cents in [0, 1, -1, 49, 50, 150, 250, -1250, 123456, -123456789, 9876543210125]:
+            assert formatter.format_cents(cents) == formatter.format(cents / 100)
+
+    def test_format_cents_should_be_exact_beyond_float_precision(self):
+        formatter = CurrencyFormatter(EN_US)
+        assert formatter.format_cents(12345678901234567891) == "$123,456,789,012,345,678.91"
+        assert CurrencyFormatter({**EN_US, "frac_digits": 127}).format_cents(-123456) == "$-1,234.56"
+
+    def test_should_fall_back_without_currency_conventions(self):
+        formatter = CurrencyFormatter({**EN_US, "frac_digits": 127})
+        assert formatter.format(1234.5) == "$1,234.50"
+
+    def test_format_currency_should_reuse_formatter(self):
+        assert Utils.format_currency(50) == Utils.get_currency_formatter().format(50)
+        assert Utils.get_currency_formatter() is Utils.get_currency_formatter()
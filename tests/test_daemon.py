@@ -0,0 +1,159 @@
+import os
+import sys
+import time
+import socket
+import sqlite3
+import tempfile
+import subprocess
+import pytest
+from contextlib import closing
+
+from expense_tracker.config import Config
+from expense_tracker.daemon import forward
+from expense_tracker.db.db_client import DB_DIRECTORY
+
+DB_NAME = "test_daemon.db"
+
+
+class TestDaemon:
+    def setup_method(self):
+        self.directory = tempfile.mkdtemp()
+        self.socket = os.path.join(self.directory, "daemon.sock")
+        self.env = {**os.environ, Config.ENV_DB_NAME: DB_NAME, Config.ENV_SOCKET: self.socket}
+        self.daemon = None
+
+    def teardown_method(self):
+        if self.daemon is not None:
+            self.daemon.terminate()
+            self.daemon.wait(timeout=10)
+        for suffix in ("", "-wal", "-shm"):
+            path = DB_DIRECTORY / f"{DB_NAME}{suffix}"
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.exists(self.socket):
+            os.remove(self.socket)
+        os.rmdir(self.directory)
+
+    def start_daemon(self):
+        self.daemon = subprocess.Popen(
+            [sys.executable, "-m", "expense_tracker.main", "serve"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=self.env)
+        assert "Listening on" in self.daemon.stdout.readline().decode()
+
+    def run(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, "-m", "expense_tracker.main", *args],
+                              capture_output=True, text=True, env=self.env)
+
+    def test_commands_should_match_direct_execution(self):
+        commands = [
+            ["init"],
+            ["add", "3.5", "Coffee"],
+            ["list", "--month", "Jan", "--year", "2025"],
+            ["summary"],
+            ["add", "3.5"],
+            ["summary", "--no-such-option"],
+            ["list", "--help"],
+        ]
+        direct = [self.run(*command) for command in commands]
+        os.remove(DB_DIRECTORY / DB_NAME)
+        self.start_daemon()
+        forwarded = [self.run(*command) for command in commands]
+        for expected, actual in zip(direct, forwarded):
+            assert (actual.returncode, actual.stdout, actual.stderr) == \
+                (expected.returncode, expected.stdout, expected.stderr)
+
+    def test_commands_should_use_the_client_db_name(self):
+        self.start_daemon()
+        self.run("init")
+        self.run("--name", "test_daemon_other", "init")
+        self.run("--name", "test_daemon_other", "add", "3.5", "Coffee")
+        self.run("add", "4.5", "Tea")
+        try:
+            for name, description in [(DB_NAME, "Tea"), ("test_daemon_other.db", "Coffee")]:
+                with closing(sqlite3.connect(DB_DIRECTORY / name)) as connection:
+                    assert connection.execute("SELECT description FROM expenses").fetchall() == [(description,)]
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                path = DB_DIRECTORY / f"test_daemon_other.db{suffix}"
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def test_serve_should_refuse_a_second_daemon(self):
+        self.start_daemon()
+        result = self.run("serve")
+        assert result.returncode == 1
+        assert "already listening" in result.stdout + result.stderr
+
+    def test_serve_should_remove_the_socket_on_exit(self):
+        self.start_daemon()
+        self.daemon.terminate()
+        self.daemon.wait(timeout=10)
+        self.daemon = None
+        assert not os.path.exists(self.socket)
+
+    def test_forward_should_run_directly_without_a_daemon(self, monkeypatch):
+        monkeypatch.setenv(Config.ENV_SOCKET, self.socket)
+        assert forward(["summary"]) is None
+        # a socket file nothing listens on, left behind by a daemon that was killed
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            stale.bind(self.socket)
+        finally:
+            os.umask(umask)
+        stale.close()
+        assert forward(["summary"]) is None
+
+    def test_idle_client_should_not_hold_up_other_commands(self):
+        self.start_daemon()
+        self.run("init")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle:
+            idle.connect(self.socket)
+            # connected but never sending a request
+            result = subprocess.run([sys.executable, "-m", "expense_tracker.main", "add", "1", "Coffee"],
+                                    capture_output=True, text=True, env=self.env, timeout=10)
+            assert result.returncode == 0
+            assert "Added" in result.stdout
+
+    def test_forward_should_run_directly_when_the_daemon_does_not_answer(self, monkeypatch):
+        monkeypatch.setenv(Config.ENV_SOCKET, self.socket)
+        # a daemon that is stuck: it listens but never starts the command
+        umask = os.umask(0o177)
+        try:
+            stuck = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            stuck.bind(self.socket)
+        finally:
+            os.umask(umask)
+        with stuck:
+            stuck.listen(1)
+            start = time.perf_counter()
+            assert forward(["summary"]) is None
+            assert time.perf_counter() - start < Config.DAEMON_TIMEOUT + 5
+
+    def test_forward_should_only_connect_to_a_socket_of_this_user(self, monkeypatch):
+        monkeypatch.setenv(Config.ENV_SOCKET, self.socket)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(self.socket)
+            listener.listen(1)
+            listener.setblocking(False)
+            # anyone may connect, as to a socket someone else created in /tmp
+            os.chmod(self.socket, 0o777)
+            assert forward(["summary"]) is None
+            link = os.path.join(self.directory, "link.sock")
+            os.chmod(self.socket, 0o600)
+            os.symlink(self.socket, link)
+            try:
+                monkeypatch.setenv(Config.ENV_SOCKET, link)
+                assert forward(["summary"]) is None
+            finally:
+                os.remove(link)
+            # nothing was sent
+            with pytest.raises(BlockingIOError):
+                listener.accept()
+
+    def test_forward_should_run_stdin_and_stdout_commands_directly(self, monkeypatch):
+        monkeypatch.setenv(Config.ENV_SOCKET, self.socket)
+        self.start_daemon()
+        assert forward(["import", "--file", "-"]) is None
+        assert forward(["export", "--output=-"]) is None
+        assert forward(["add", "--stdin"]) is None
@@ -1,11 +1,15 @@
 import os
+import sqlite3
 import pytest
 from datetime import datetime
-from expense_tracker.db.db_client import DBClient
+from expense_tracker.db.db_client import DBClient, SCHEMA_VERSION
 from expense_tracker.config import Config
 from expense_tracker.models.exceptions import DBNotInitializedError
-from expense_tracker.models.expense_summary import ExpenseSummary
+from expense_tracker.models.expense_summary import ExpenseSummary, PeriodSummary
+from expense_tracker.models.period import Period
 from expense_tracker.models.expense import Expense
+from expense_tracker.models.expense_row import ExpenseRow
+from expense_tracker.utils import Utils
 
 
 class TestDBClient:
@@ -40,14 +44,24 @@ class TestDBClient:
         # the tuple returned by PRAGMA database_list has the format (seq, name, file)
         db_path = DBClient.get_connection().execute(
             "PRAGMA database_list;").fetchone()[2]
+        DBClient.close_connections()
         if os.path.exists(db_path):
             os.remove(db_path)
 
     def test_init_db(self):
         DBClient.init_db()
         tables = DBClient.get_tables()
-        assert len(tables) == 1
-        assert "expenses" in tables
+        # expenses_fts_* are the shadow tables of the FTS5 index
+        assert sorted(tables) == [
+            "expenses",
+            "expenses_fts",
+            "expenses_fts_config",
+            "expenses_fts_data",
+            "expenses_fts_docsize",
+            "expenses_fts_idx",
+            "monthly_category_totals",
+            "schema_version",
+        ]
 
     def test_add_db_extension_on_init_db(self):
         os.environ[Config.ENV_DB_NAME] = "test_expenses"
@@ -55,7 +69,8 @@ class TestDBClient:
         connection = DBClient.get_connection()
         cursor = connection.cursor()
         cursor.execute("PRAGMA database_list;")
-        db_list = cursor.fetchall()
+        # renaming a table during the migrations also opens the (empty) temp database
+        db_list = [row for row in cursor.fetchall() if row[1] == "main"]
         assert len(db_list) == 1
         db_file = db_list[0][2]
         assert db_file.endswith(".db")
@@ -80,9 +95,24 @@ class TestDBClient:
         with DBClient.get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute(
-                "SELECT amount, description, date, category FROM expenses;")
+                "SELECT amount_cents, description, date, category FROM expenses;")
             row = cursor.fetchone()
-            assert row == (50.0, "Groceries", "2024-10-01T12:00:00", "Food")
+            assert row == (5000, "Groceries", "2024-10-01T12:00:00", "Food")
+
+    def test_add_expense_should_keep_repeated_expenses(self):
+        DBClient.init_db()
+        expense_data = {
+            "amount": 4.5,
+            "description": "Coffee",
+            "date": "2024-10-01",
+            "category": "Food"
+        }
+        DBClient.add(expense_data)
+        DBClient.add(expense_data)
+        assert len(DBClient.get_all()) == 2
+        # an import still recognises the expense as recorded
+        assert DBClient.add_rows([(4.5, "Coffee", "2024-10-01", "Food")]) == (0, 1)
+        assert len(DBClient.get_all()) == 2
 
     def test_add_expense_should_raise_error_if_db_not_initialized(self):
         expense_data = {
@@ -120,8 +150,26 @@ class TestDBClient:
             DBClient.add(expense)
         summary = DBClient.summary("10", "2024")
         assert len(summary) == 2
-        assert summary[0] == ExpenseSummary("Entertainment", 62.3)
-        assert summary[1] == ExpenseSummary("Food", 50.0)
+        assert summary[0] == ExpenseSummary("Entertainment", 6230)
+        assert summary[1] == ExpenseSummary("Food", 5000)
+
+    def test_summary_by_period(self):
+        DBClient.init_db()
+        for expense in self.expenses:
+            DBClient.add(expense)
+        assert DBClient.summary_by_period("2024-01", "2024-12", Period.QUARTER) == [
+            PeriodSummary("2024-Q3", "Food", 16230),
+            PeriodSummary("2024-Q4", "Entertainment", 6230),
+            PeriodSummary("2024-Q4", "Food", 5000),
+        ]
+        assert DBClient.summary_by_period("2024-01", "2024-12", Period.YEAR) == [
+            PeriodSummary("2024", "Entertainment", 6230),
+            PeriodSummary("2024", "Food", 21230),
+        ]
+        assert DBClient.summary_by_period("2024-08", "2024-10") == [
+            PeriodSummary("2024-10", "Entertainment", 6230),
+            PeriodSummary("2024-10", "Food", 5000),
+        ]
 
     def test_summary_should_throw_exception_if_db_not_initialized(self):
         with pytest.raises(DBNotInitializedError) as ex:
@@ -135,6 +183,7 @@ class TestDBClient:
             DBClient.add(expense)
         result = DBClient.get_all()
         assert len(result) == 3
+        assert isinstance(result[0], ExpenseRow)
         assert result[0].to_dict() == self.expenses[2]
 
     def test_get_all_should_throw_exception_if_db_not_initialized(self):
@@ -166,3 +215,391 @@ class TestDBClient:
             DBClient.add_many([])
         assert "Database is not initialized. Please run the init command." == str(
             ex.value)
+
+    def test_init_db_should_create_date_index(self):
+        DBClient.init_db()
+        with DBClient.get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "EXPLAIN QUERY PLAN SELECT category, SUM(amount_cents) FROM expenses WHERE date >= ? AND date < ? GROUP BY category",
+                ("2024-10-01", "2024-11-01"))
+            plan = " ".join(row[3] for row in cursor.fetchall())
+            assert "idx_expenses_date" in plan
+
+    def test_list_expenses_should_include_whole_december(self):
+        DBClient.init_db()
+        DBClient.add({
+            "amount": 10.0,
+            "description": "Dinner",
+            "date": "2024-12-31T23:59:59",
+            "category": "Food"
+        })
+        DBClient.add({
+            "amount": 20.0,
+            "description": "Lunch",
+            "date": "2025-01-01T00:00:00",
+            "category": "Food"
+        })
+        returned_expenses = DBClient.list_expenses("12", "2024")
+        assert len(returned_expenses) == 1
+        assert returned_expenses[0].description == "Dinner"
+
+    def test_list_expenses_should_seek_after_cursor(self):
+        DBClient.init_db()
+        for expense in self.expenses:
+            DBClient.add(expense)
+        first_page = DBClient.list_expenses("10", "2024", limit=1)
+        assert first_page[0].id == 1
+        cursor = (first_page[0].date.isoformat(), first_page[0].id)
+        second_page = DBClient.list_expenses("10", "2024", limit=1, after=cursor)
+        assert len(second_page) == 1
+        assert second_page[0].to_dict() == self.expenses[1]
+        cursor = (second_page[0].date.isoformat(), second_page[0].id)
+        assert DBClient.list_expenses("10", "2024", limit=1, after=cursor) == []
+
+    def test_get_connection_should_reuse_connection(self):
+        assert DBClient.get_connection() is DBClient.get_connection()
+
+    def test_get_connection_should_apply_pragma_profile(self):
+        connection = DBClient.get_connection()
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        # FULL = 2
+        assert connection.execute("PRAGMA synchronous").fetchone()[0] == 2
+        os.environ[Config.ENV_DB_PROFILE] = "bulk"
+        try:
+            connection = DBClient.get_connection()
+            # OFF = 0
+            assert connection.execute("PRAGMA synchronous").fetchone()[0] == 0
+            # MEMORY = 2
+            assert connection.execute("PRAGMA temp_store").fetchone()[0] == 2
+        finally:
+            del os.environ[Config.ENV_DB_PROFILE]
+
+    def test_get_connection_should_raise_error_on_invalid_profile(self):
+        os.environ[Config.ENV_DB_PROFILE] = "turbo"
+        try:
+            with pytest.raises(ValueError) as ex:
+                DBClient.get_connection()
+            assert "Invalid database profile" in str(ex.value)
+        finally:
+            del os.environ[Config.ENV_DB_PROFILE]
+
+    def test_add_many_should_insert_generator_in_batches(self):
+        DBClient.init_db()
+        batches = []
+        expenses = (
+            Expense(amount=float(i), description="Coffee",
+                    date=datetime(2024, 10, 1), category="Food")
+            for i in range(5)
+        )
+        count = DBClient.add_many(expenses, batch_size=2, on_batch=batches.append)
+        assert count == (5, 0)
+        assert batches == [2, 4, 5]
+        assert len(DBClient.get_all()) == 5
+
+    def test_add_rows_should_skip_duplicates(self):
+        DBClient.init_db()
+        rows = [(4.5, "Coffee", "2024-10-01T08:00:00", "Food"),
+                (4.5, "Coffee", "2024-10-02T08:00:00", "Food")]
+        assert DBClient.add_rows(rows) == (2, 0)
+        # the category does not matter, the description ignores case and spacing
+        rows = [(4.5, " coffee ", "2024-10-01T08:00:00", "Other"),
+                (4.5, "Coffee", "2024-10-02T08:00:00", "Food"),
+                (4.5, "Coffee", "2024-10-03T08:00:00", "Food"),
+                (4.5, "Coffee", "2024-10-03T08:00:00", "Food")]
+        batches = []
+        assert DBClient.add_rows(rows, batch_size=3, on_batch=batches.append) == (1, 3)
+        assert batches == [1, 1]
+        assert [expense.date_text[:10] for expense in DBClient.get_all()] == [
+            "2024-10-01", "2024-10-02", "2024-10-03"]
+        # the summary and search index only see the inserted rows
+        assert DBClient.check_summary() == []
+        assert len(DBClient.search('"coffee"')) == 3
+
+    def test_add_rows_should_keep_repeated_rows_unless_skipping_duplicates(self):
+        DBClient.init_db()
+        DBClient.add_rows([(4.5, "Coffee", "2024-10-01T08:00:00", "Food")])
+        rows = [(4.5, "Coffee", "2024-10-01T08:00:00", "Food"),
+                (4.5, "Coffee", "2024-10-02T08:00:00", "Food"),
+                (4.5, "Coffee", "2024-10-02T08:00:00", "Food")]
+        assert DBClient.add_rows(rows, skip_duplicates=False) == (3, 0)
+        assert len(DBClient.get_all()) == 4
+        assert DBClient.check_summary() == []
+        assert len(DBClient.search('"coffee"')) == 4
+        # only the first copy of each is hashed, an import still skips both
+        assert DBClient.add_rows(rows[:2]) == (0, 2)
+
+    def test_add_rows_should_restore_insert_triggers(self):
+        DBClient.init_db()
+
+        def triggers():
+            with DBClient.get_connection() as connection:
+                return sorted(name for name, in connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger'"))
+
+        expected = triggers()
+
+        def rows():
+            yield (4.5, "Coffee", "2024-10-01T08:00:00", "Food")
+            raise ValueError("bad row")
+
+        with pytest.raises(ValueError):
+            DBClient.add_rows(rows())
+        assert triggers() == expected
+        DBClient.add_rows([(4.5, "Coffee", "2024-10-01T08:00:00", "Food")])
+        assert triggers() == expected
+        # single inserts still go through the triggers
+        DBClient.add(self.expenses[0])
+        assert DBClient.check_summary() == []
+        assert len(DBClient.search('"groceries"')) == 1
+
+    def test_add_rows_should_lock_out_writers_before_reading_the_last_id(self, monkeypatch):
+        DBClient.init_db()
+        db_path = DBClient.get_connection().execute("PRAGMA database_list;").fetchone()[2]
+        execute = DBClient._execute
+        refused = []
+
+        def execute_with_writer(cursor, sql, parameters=()):
+            if "max(id)" in sql:
+                # another process adding an expense while add_rows reads the last id
+                other = sqlite3.connect(db_path, timeout=0)
+                try:
+                    other.execute(
+                        "INSERT INTO expenses (amount_cents, description, date, category) VALUES (?, ?, ?, ?)",
+                        (500, "Lunch", "2024-03-01T12:00:00", "Food"))
+                    other.commit()
+                except sqlite3.OperationalError as e:
+                    refused.append(str(e))
+                finally:
+                    other.close()
+            return execute(cursor, sql, parameters)
+
+        monkeypatch.setattr(DBClient, "_execute", staticmethod(execute_with_writer))
+        DBClient.add_rows([(1.0, "Coffee", "2024-03-02T08:00:00", "Food")])
+        monkeypatch.undo()
+        assert refused == ["database is locked"]
+        assert DBClient.check_summary() == []
+        assert len(DBClient.search('"food"')) == 1
+
+    def test_init_db_should_hash_existing_database(self):
+        with DBClient.get_connection() as connection:
+            connection.execute('''
+                CREATE TABLE expenses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    amount REAL NOT NULL,
+                    description TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    category TEXT NOT NULL
+                )''')
+            connection.executemany(
+                "INSERT INTO expenses (amount, description, date, category) VALUES (?, ?, ?, ?)",
+                [(4.5, "Coffee", "2024-10-01T08:00:00", "Food")] * 2)
+        DBClient.init_db()
+        with DBClient.get_connection() as connection:
+            hashes = connection.execute(
+                "SELECT content_hash FROM expenses ORDER BY id").fetchall()
+        # existing duplicates are kept, only the first one is hashed
+        assert hashes == [(Utils.content_hash(450, "2024-10-01T08:00:00", "Coffee"),), (None,)]
+        assert DBClient.add_rows([(4.5, "Coffee", "2024-10-01T08:00:00", "Food")]) == (0, 1)
+
+    def create_legacy_database(self):
+        """A database as init created it before schema versioning, with REAL amounts and totals."""
+        with DBClient.get_connection() as connection:
+            connection.executescript('''
+                CREATE TABLE expenses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    amount REAL NOT NULL,
+                    description TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    content_hash INTEGER
+                );
+                CREATE UNIQUE INDEX idx_expenses_content_hash ON expenses (content_hash);
+                CREATE TABLE monthly_category_totals (
+                    month TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    total REAL NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (month, category)
+                ) WITHOUT ROWID;
+            ''')
+            connection.executemany(
+                "INSERT INTO expenses (amount, description, date, category, content_hash) VALUES (?, ?, ?, ?, ?)",
+                [(expense["amount"], expense["description"], expense["date"], expense["category"],
+                  Utils.content_hash(Utils.to_cents(expense["amount"]), expense["date"], expense["description"]))
+                 for expense in self.expenses])
+            connection.execute("DELETE FROM expenses WHERE id = 3")
+            connection.execute('''
+                INSERT INTO monthly_category_totals
+                SELECT substr(date, 1, 7), category, SUM(amount), COUNT(*) FROM expenses GROUP BY 1, 2
+            ''')
+
+    def test_init_db_should_migrate_legacy_database_to_cents(self):
+        self.create_legacy_database()
+        assert DBClient.schema_version(DBClient.get_connection()) == 0
+        DBClient.init_db()
+        connection = DBClient.get_connection()
+        assert DBClient.schema_version(connection) == SCHEMA_VERSION
+        assert connection.execute("SELECT id, amount_cents FROM expenses ORDER BY id").fetchall() == [
+            (1, 5000), (2, 6230)]
+        assert DBClient.summary("10", "2024") == [
+            ExpenseSummary("Entertainment", 6230), ExpenseSummary("Food", 5000)]
+        assert DBClient.check_summary() == []
+        assert [expense.id for expense, _ in DBClient.search('"games"')] == [2]
+        # ids are not reused and the hashes still match, so nothing is imported twice
+        assert DBClient.add_rows([(62.3, "Games", "2024-10-02T12:00:00", "Entertainment"),
+                                  (4.0, "Tea", "2024-10-03T12:00:00", "Food")]) == (1, 1)
+        assert DBClient.get_all()[-1].id > 3
+        # running it again changes nothing
+        DBClient.init_db()
+        assert DBClient.schema_version(connection) == SCHEMA_VERSION
+        assert len(DBClient.get_all()) == 3
+
+    def test_get_connection_should_upgrade_legacy_database(self):
+        self.create_legacy_database()
+        DBClient.close_connections()
+        assert DBClient.summary("10", "2024") == [
+            ExpenseSummary("Entertainment", 6230), ExpenseSummary("Food", 5000)]
+        assert DBClient.schema_version(DBClient.get_connection()) == SCHEMA_VERSION
+
+    def test_summary_should_be_exact(self):
+        DBClient.init_db()
+        # 0.1 + 0.2 is 0.30000000000000004 when added up as floats
+        for amount, description in [(0.1, "Gum"), (0.2, "Mints")]:
+            DBClient.add({"amount": amount, "description": description,
+                          "date": "2024-10-01T12:00:00", "category": "Food"})
+        assert DBClient.summary("10", "2024") == [ExpenseSummary("Food", 30)]
+        assert DBClient.check_summary() == []
+
+    def test_add_many_should_insert_nothing_if_source_fails(self):
+        DBClient.init_db()
+
+        def expenses():
+            yield Expense(amount=1.0, description="Coffee",
+                          date=datetime(2024, 10, 1), category="Food")
+            raise ValueError("bad row")
+
+        with pytest.raises(ValueError):
+            DBClient.add_many(expenses(), batch_size=1)
+        assert DBClient.get_all() == []
+
+    def test_summary_should_follow_updates_and_deletes(self):
+        DBClient.init_db()
+        for expense in self.expenses:
+            DBClient.add(expense)
+        with DBClient.get_connection() as connection:
+            connection.execute(
+                "UPDATE expenses SET amount_cents = 7000, category = 'Food' WHERE id = 2")
+            connection.execute(
+                "UPDATE expenses SET date = '2024-10-05T12:00:00' WHERE id = 3")
+            connection.execute("DELETE FROM expenses WHERE id = 1")
+            connection.commit()
+        summary = DBClient.summary("10", "2024")
+        assert summary == [ExpenseSummary("Food", 23230)]
+        assert DBClient.summary("7", "2024") == []
+        assert DBClient.check_summary() == []
+
+    def test_init_db_should_backfill_summary_of_existing_database(self):
+        DBClient.init_db()
+        for expense in self.expenses:
+            DBClient.add(expense)
+        with DBClient.get_connection() as connection:
+            connection.execute("DROP TABLE monthly_category_totals")
+            connection.commit()
+        DBClient.init_db()
+        assert DBClient.summary("10", "2024") == [
+            ExpenseSummary("Entertainment", 6230), ExpenseSummary("Food", 5000)]
+
+    def test_check_summary_should_report_mismatches_and_rebuild_should_fix_them(self):
+        DBClient.init_db()
+        for expense in self.expenses:
+            DBClient.add(expense)
+        with DBClient.get_connection() as connection:
+            connection.execute(
+                "UPDATE monthly_category_totals SET total_cents = 100 WHERE month = '2024-10' AND category = 'Food'")
+            connection.execute(
+                "INSERT INTO monthly_category_totals VALUES ('2023-01', 'Ghost', 500, 1)")
+            connection.commit()
+        assert DBClient.check_summary() == [
+            ("2023-01", "Ghost", 500, None),
+            ("2024-10", "Food", 100, 5000)
+        ]
+        DBClient.rebuild_summary()
+        assert DBClient.check_summary() == []
+
+    def test_iter_columns_should_stream_epoch_days_in_date_order(self):
+        DBClient.init_db()
+        for expense in self.expenses:
+            DBClient.add(expense)
+        # 2024-07-02 is 19906 days after 1970-01-01
+        assert [*DBClient.iter_columns()] == [
+            (3, 16230, 19906, "Food"),
+            (1, 5000, 19997, "Food"),
+            (2, 6230, 19998, "Entertainment"),
+        ]
+        assert [row[0] for row in DBClient.iter_columns("2024-10-01", "2024-10-02")] == [1]
+
+    def test_search(self):
+        DBClient.init_db()
+        for expense in self.expenses:
+            DBClient.add(expense)
+        DBClient.add({"amount": 4.0, "description": "Bread, bread",
+                      "date": "2024-10-03T12:00:00", "category": "Food"})
+        results = DBClient.search('"bread"')
+        # the description repeating the term ranks first
+        assert [expense.id for expense, _ in results] == [4, 3]
+        assert results[0][1] <= results[1][1]
+        assert results[1][0].to_dict() == self.expenses[2]
+        assert sorted(expense.id for expense, _ in DBClient.search('"food"')) == [1, 3, 4]
+        assert [expense.id for expense, _ in DBClient.search('"gro"*')] == [1]
+
+    def test_search_should_filter_and_page(self):
+        DBClient.init_db()
+        for expense in self.expenses:
+            DBClient.add(expense)
+        assert [expense.id for expense, _ in DBClient.search(
+            '"food"', start="2024-10-01", end="2024-11-01")] == [1]
+        assert DBClient.search('"food"', categories=["Entertainment"]) == []
+        first_page = DBClient.search('"food"', limit=1)
+        assert len(first_page) == 1
+        expense, rank = first_page[0]
+        second_page = DBClient.search('"food"', limit=1, after=(rank, expense.id))
+        assert [expense.id for expense, _ in first_page + second_page] == [1, 3]
+        expense, rank = second_page[0]
+        assert DBClient.search('"food"', after=(rank, expense.id)) == []
+
+    def test_search_newest(self):
+        DBClient.init_db()
+        for expense in self.expenses:
+            DBClient.add(expense)
+        results = DBClient.search('"food"', limit=1, newest=True)
+        assert [(expense.id, rank) for expense, rank in results] == [(3, None)]
+        results = DBClient.search('"food"', after=(None, 3), newest=True)
+        assert [expense.id for expense, _ in results] == [1]
+
+    def test_search_should_follow_updates_and_deletes(self):
+        DBClient.init_db()
+        for expense in self.expenses:
+            DBClient.add(expense)
+        with DBClient.get_connection() as connection:
+            connection.execute("UPDATE expenses SET description = 'Rye loaf' WHERE id = 3")
+            connection.execute("DELETE FROM expenses WHERE id = 1")
+        assert DBClient.search('"bread"') == []
+        assert [expense.id for expense, _ in DBClient.search('"loaf"')] == [3]
+        assert DBClient.search('"groceries"') == []
+
+    def test_init_db_should_index_existing_database(self):
+        DBClient.init_db()
+        for expense in self.expenses:
+            DBClient.add(expense)
+        with DBClient.get_connection() as connection:
+            for trigger in ("insert", "delete", "update"):
+                connection.execute(f"DROP TRIGGER expenses_fts_{trigger}")
+            connection.execute("DROP TABLE expenses_fts")
+        DBClient.init_db()
+        assert [expense.id for expense, _ in DBClient.search('"games"')] == [2]
+
+    def test_search_should_raise_error_on_invalid_query(self):
+        DBClient.init_db()
+        with pytest.raises(ValueError):
+            DBClient.search("AND")
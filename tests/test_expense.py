@@ -1,9 +1,11 @@
 import os
 import json
+import time
 
 import pytest
 
 from expense_tracker.models.expense import Expense
+from expense_tracker.models.expense_row import ExpenseRow
 from expense_tracker.models.exceptions import InvalidImportFileError
 from datetime import datetime
 
@@ -25,6 +27,11 @@ class TestExpense:
         assert expense_dict["category"] == "Food"
         assert expense_dict["date"] == current_date.isoformat()
 
+    def test_should_default_to_the_time_it_is_created(self):
+        first = Expense(1.0, "Coffee")
+        time.sleep(0.01)
+        assert Expense(1.0, "Coffee").date > first.date
+
     def test_should_create_from_dic(self):
         current_date = datetime.now()
         expense_data = {
@@ -44,6 +51,12 @@ class TestExpense:
         assert expense.category is not None
         assert isinstance(expense.date, datetime)
 
+    def test_should_not_have_instance_dict(self):
+        expense = Expense(20.0, "Snacks", category="Food")
+        assert not hasattr(expense, "__dict__")
+        with pytest.raises(AttributeError):
+            expense.note = "extra"
+
     def test_should_convert_to_csv(self):
         current_date = datetime.now()
         expense = Expense(50.0, "Groceries",
@@ -51,6 +64,13 @@ class TestExpense:
         expense_csv = expense.to_csv()
         assert f"1,50.0,Groceries,Food,{current_date.isoformat()}" == expense_csv
 
+    def test_should_quote_csv_fields(self):
+        current_date = datetime.now()
+        expense = Expense(12.0, 'Lunch, "the good one"',
+                          date=current_date, category="Food", id=1)
+        expense_csv = expense.to_csv()
+        assert f'1,12.0,"Lunch, ""the good one""",Food,{current_date.isoformat()}' == expense_csv
+
     def test_parse_csv(self):
         if os.path.exists(self.IMPORT_FILE):
             os.remove(self.IMPORT_FILE)
@@ -69,6 +89,20 @@ class TestExpense:
             assert expense.date.isoformat() == "2025-05-12T12:00:00"
             assert isinstance(expense.amount, float)
 
+    def test_iter_csv_should_categorise_rows_without_category(self):
+        if os.path.exists(self.IMPORT_FILE):
+            os.remove(self.IMPORT_FILE)
+        with open(self.IMPORT_FILE, "x") as file:
+            file.writelines([
+                "amount,description,date\n",
+                "4.5,Morning coffee,2025-05-12T12:00:00\n",
+                "20.0,Uber to airport,2025-05-12T13:00:00\n",
+            ])
+        expenses = Expense.iter_csv(self.IMPORT_FILE)
+        assert not isinstance(expenses, list)
+        assert [expense.category for expense in expenses] == [
+            "Food & Drinks", "Transport"]
+
     def test_parse_csv_throws_exception_on_invalid_field_type(self):
         if os.path.exists(self.IMPORT_FILE):
             os.remove(self.IMPORT_FILE)
@@ -140,6 +174,25 @@ class TestExpense:
         assert len(expenses) == 1
         assert expenses[0].to_dict() == expense
 
+    def test_iter_json_should_stream_large_array(self):
+        if os.path.exists(self.IMPORT_FILE):
+            os.remove(self.IMPORT_FILE)
+        expenses = [
+            {
+                "id": None,
+                "amount": float(i),
+                "description": f"Expense {i}" * 50,
+                "date": "2025-06-12T12:00:00",
+                "category": "Bills"
+            }
+            for i in range(500)
+        ]
+        with open(self.IMPORT_FILE, "x") as file:
+            file.write(json.dumps(expenses))
+        parsed = [expense.to_dict()
+                  for expense in Expense.iter_json(self.IMPORT_FILE)]
+        assert parsed == expenses
+
     def test_parse_json_should_throw_exception_on_missing_file(self):
         with pytest.raises(InvalidImportFileError) as ex:
             Expense.parse_json(self.IMPORT_FILE)
@@ -154,3 +207,57 @@ class TestExpense:
         with pytest.raises(InvalidImportFileError) as ex:
             Expense.parse_json(self.IMPORT_FILE)
         assert "File does not contain valid json" in str(ex.value)
+
+    def test_parse_ndjson(self):
+        if os.path.exists(self.IMPORT_FILE):
+            os.remove(self.IMPORT_FILE)
+        with open(self.IMPORT_FILE, "x") as file:
+            expense = {
+                "id": None,
+                "amount": 75.0,
+                "description": "Utilities",
+                "date": datetime.now().isoformat(),
+                "category": "Bills"
+            }
+            file.write(f"{json.dumps(expense)}\n\n{json.dumps(expense)}\n")
+        expenses = Expense.parse_ndjson(self.IMPORT_FILE)
+        assert len(expenses) == 2
+        assert expenses[1].to_dict() == expense
+
+    def test_parse_ndjson_should_throw_exception_on_invalid_line(self):
+        if os.path.exists(self.IMPORT_FILE):
+            os.remove(self.IMPORT_FILE)
+        with open(self.IMPORT_FILE, "x") as file:
+            file.write(
+                '{"amount": 75, "description": "Test", "date": "2025-06-12T12:00:00", "category": "Food"}\n{"amount": 75\n')
+        with pytest.raises(InvalidImportFileError) as ex:
+            Expense.parse_ndjson(self.IMPORT_FILE)
+        assert "Line 2 does not contain valid json" in str(ex.value)
+
+
+class TestExpenseRow:
+    def setup_method(self):
+        self.date = datetime(2024, 10, 1, 12, 30)
+        self.expense = Expense(12.0, 'Lunch, "the good one"',
+                               date=self.date, category="Food", id=7)
+        self.row = ExpenseRow.row_factory(
+            None, (7, 1200, 'Lunch, "the good one"', self.date.isoformat(), "Food"))
+
+    def test_should_expose_expense_fields(self):
+        assert self.row.id == 7
+        assert self.row.amount == 12.0
+        assert self.row.amount_cents == self.expense.amount_cents == 1200
+        assert self.row.description == 'Lunch, "the good one"'
+        assert self.row.category == "Food"
+        assert self.row.date_text == "2024-10-01T12:30:00"
+        assert self.row.date == self.date
+
+    def test_should_match_expense_representations(self):
+        assert self.row.to_dict() == self.expense.to_dict()
+        assert self.row.to_csv() == self.expense.to_csv()
+        assert str(self.row) == str(self.expense)
+
+    def test_should_be_read_only(self):
+        assert not hasattr(self.row, "__dict__")
+        with pytest.raises(AttributeError):
+            self.row.amount = 1.0
@@ -0,0 +1,81 @@
+import os
+import sqlite3
+from contextlib import closing
+
+from expense_tracker.config import Config
+from expense_tracker.db.db_client import DBClient, DB_DIRECTORY
+from expense_tracker.db.fan_out import FanOut
+from expense_tracker.models.expense_summary import ExpenseSummary, PeriodSummary
+from expense_tracker.models.period import Period
+
+USERS = ["test_fan_out_a", "test_fan_out_b", "test_fan_out_c"]
+
+
+class TestFanOut:
+    def setup_method(self):
+        # every user has one expense a day in October, user i spends i + 1 each time
+        for number, name in enumerate(USERS):
+            os.environ[Config.ENV_DB_NAME] = name
+            DBClient.init_db()
+            DBClient.add_rows((number + 1.0, f"Coffee {day}", f"2024-10-{day:02}T12:00:00", "Food")
+                              for day in range(1, 6))
+            DBClient.add_rows([(100.0, "Rent", "2024-11-01T00:00:00", "Bills")])
+        DBClient.close_connections()
+        del os.environ[Config.ENV_DB_NAME]
+
+    def teardown_method(self):
+        for name in [*USERS, "test_fan_out_empty", "test_fan_out_legacy"]:
+            for suffix in ("", "-wal", "-shm"):
+                path = DB_DIRECTORY / f"{name}.db{suffix}"
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def test_names_should_list_every_database(self):
+        assert set(USERS) <= set(FanOut.names())
+
+    def test_summary_should_add_up_every_user(self):
+        summary, results = FanOut.summary(USERS, "10", "2024", workers=2)
+        assert summary == [ExpenseSummary("Food", 3000)]
+        assert [result.name for result in results] == USERS
+        assert all(result.error is None and result.elapsed > 0 for result in results)
+
+    def test_summary_by_period_should_add_up_every_user(self):
+        summary, _ = FanOut.summary_by_period(USERS, "2024-10", "2024-12", Period.QUARTER)
+        assert summary == [PeriodSummary("2024-Q4", "Bills", 30000),
+                           PeriodSummary("2024-Q4", "Food", 3000)]
+
+    def test_run_should_report_databases_it_cannot_read(self):
+        open(DB_DIRECTORY / "test_fan_out_empty.db", "w").close()
+        summary, results = FanOut.summary(
+            [USERS[0], "test_fan_out_empty", "test_fan_out_missing"], "10", "2024")
+        assert summary == [ExpenseSummary("Food", 500)]
+        assert [result.error for result in results] == [
+            None, "Database is not initialized", "Database does not exist"]
+        assert not os.path.exists(DB_DIRECTORY / "test_fan_out_missing.db")
+
+    def test_run_should_report_databases_before_integer_cents(self):
+        # read-only connections cannot migrate, see DBClient.init_db
+        with closing(sqlite3.connect(DB_DIRECTORY / "test_fan_out_legacy.db")) as connection:
+            connection.execute(
+                "CREATE TABLE monthly_category_totals (month TEXT, category TEXT, total REAL, count INTEGER)")
+        _, results = FanOut.summary(["test_fan_out_legacy"], "10", "2024")
+        assert results[0].error == "Database needs an upgrade. Run the init command"
+
+    def test_list_expenses_should_merge_pages_in_date_order(self):
+        seen = []
+        after = None
+        while True:
+            rows, _ = FanOut.list_expenses(USERS, "10", "2024", limit=4, after=after)
+            seen += rows[:4]
+            if len(rows) <= 4:
+                break
+            name, last = rows[3]
+            after = (last.date_text, last.id, name)
+        assert [(name, row.description) for name, row in seen] == [
+            (name, f"Coffee {day}") for day in range(1, 6) for name in USERS]
+
+    def test_list_expenses_with_page_should_match_cursor(self):
+        rows, _ = FanOut.list_expenses(USERS, "10", "2024", page=2, limit=4)
+        assert [(name, row.description) for name, row in rows] == [
+            (USERS[1], "Coffee 2"), (USERS[2], "Coffee 2"), (USERS[0], "Coffee 3"),
+            (USERS[1], "Coffee 3"), (USERS[2], "Coffee 3")]
@@ -0,0 +1,109 @@
+import os
+import pytest
+
+from expense_tracker.importer import Importer, _column_indexes, _parse_csv_range
+from expense_tracker.models.exceptions import InvalidImportFileError
+
+IMPORT_FILE = "test_importer.csv"
+
+
+class TestImporter:
+    def teardown_method(self):
+        if os.path.exists(IMPORT_FILE):
+            os.remove(IMPORT_FILE)
+
+    def write(self, content: bytes):
+        with open(IMPORT_FILE, "wb") as file:
+            file.write(content)
+
+    def test_read_csv(self):
+        self.write(
+            "﻿Amount,Description,Category,Date\r\n"
+            "4.5,Coffee,Food,2024-10-01T08:00:00\r\n"
+            "\r\n"
+            '12,"Lunch, ""the good one""",,2024-10-02 12:30:00\r\n'
+            '30,"Café\nreceipt",Other,2024-10-03T09:00:00\r\n'.encode()
+        )
+        assert [*Importer.read_csv(IMPORT_FILE)] == [
+            (4.5, "Coffee", "2024-10-01T08:00:00", "Food"),
+            (12.0, 'Lunch, "the good one"', "2024-10-02T12:30:00", "Food & Drinks"),
+            (30.0, "Café\nreceipt", "2024-10-03T09:00:00", "Other"),
+        ]
+
+    def test_read_csv_without_trailing_newline_or_rows(self):
+        self.write(b"amount,description,date\n3,Bus,2024-10-01")
+        assert [*Importer.read_csv(IMPORT_FILE)] == [
+            (3.0, "Bus", "2024-10-01T00:00:00", "Transport")]
+        self.write(b"amount,description,date")
+        assert [*Importer.read_csv(IMPORT_FILE)] == []
+
+    @pytest.mark.parametrize("content", [
+        b"",
+        b"amount,details,date\n3,Bus,2024-10-01\n",
+    ])
+    def test_read_csv_should_reject_malformed_headings(self, content):
+        self.write(content)
+        with pytest.raises(InvalidImportFileError) as ex:
+            next(Importer.read_csv(IMPORT_FILE))
+        assert "column headings" in str(ex.value)
+
+    @pytest.mark.parametrize("line", [
+        b"three,Bus,2024-10-01\n",
+        b"3,Bus,01/10/2024\n",
+        b"3,Bus\n",
+    ])
+    def test_read_csv_should_reject_malformed_rows(self, line):
+        self.write(b"amount,description,date\n" + line)
+        with pytest.raises(InvalidImportFileError) as ex:
+            next(Importer.read_csv(IMPORT_FILE))
+        assert "right type" in str(ex.value)
+
+    def test_read_csv_should_reject_missing_file(self):
+        with pytest.raises(InvalidImportFileError):
+            next(Importer.read_csv(IMPORT_FILE))
+
+    def test_split_ranges_should_align_to_lines(self):
+        lines = [f"{i}.5,Coffee {i},2024-10-01T08:00:00\n".encode() for i in range(100)]
+        header = b"amount,description,date\n"
+        self.write(header + b"".join(lines))
+        fieldnames, ranges = Importer.split_ranges(IMPORT_FILE, 4, range_size=300)
+        assert fieldnames == ["amount", "description", "date"]
+        assert ranges[0][0] == len(header)
+        assert ranges[-1][1] == os.path.getsize(IMPORT_FILE)
+        assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+        rows = [row for start, end in ranges
+                for row in _parse_csv_range(IMPORT_FILE, _column_indexes(fieldnames), start, end)[0]]
+        assert [row[1] for row in rows] == [f"Coffee {i}" for i in range(100)]
+
+    def test_parse_csv_range_should_reject_line_breaks_in_fields(self):
+        self.write(b'amount,description,date\n3,"Bus\nticket",2024-10-01\n')
+        with pytest.raises(InvalidImportFileError) as ex:
+            _parse_csv_range(IMPORT_FILE, (0, 1, 2, None), 24, os.path.getsize(IMPORT_FILE))
+        assert "line breaks" in str(ex.value)
+
+    def test_read_lines_should_report_malformed_lines_and_continue(self):
+        self.write(
+            "4.5\tCoffee\t2024-10-01T08:00:00\n"
+            "\n"
+            "abc\tTea\n"
+            "12\tUber ride\t2024-10-02\r\n"
+            "5\n"
+            "6\tBus\tyesterday\n"
+            "7\t \n"
+            "8\tBooks\n".encode()
+        )
+        errors = []
+        rows = [*Importer.read_lines(IMPORT_FILE, errors.append, batch_size=2)]
+        assert rows[:2] == [
+            (4.5, "Coffee", "2024-10-01T08:00:00", "Food & Drinks"),
+            (12.0, "Uber ride", "2024-10-02T00:00:00", "Transport"),
+        ]
+        assert rows[2][:2] == (8.0, "Books")
+        assert [(error.line, error.text) for error in errors] == [
+            (3, "abc\tTea"), (5, "5"), (6, "6\tBus\tyesterday"), (7, "7\t ")]
+        assert "not a number" in errors[0].message
+        assert "ISO format" in errors[2].message
+
+    def test_read_lines_should_reject_missing_file(self):
+        with pytest.raises(InvalidImportFileError):
+            next(Importer.read_lines(IMPORT_FILE))
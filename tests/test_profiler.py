@@ -0,0 +1,51 @@
+import time
+
+from expense_tracker.profiler import Profile, Profiler
+
+
+class TestProfiler:
+    def teardown_method(self):
+        Profiler.stop()
+
+    def test_hooks_should_do_nothing_when_disabled(self):
+        assert Profiler.active is None
+        assert Profiler.phase("query") is Profiler.phase("render")
+        with Profiler.phase("query"):
+            Profiler.add_rows(10)
+        assert Profiler.trace_callback() is None
+        assert Profiler.stop() is None
+
+    def test_should_time_phases_and_count_rows(self):
+        profile = Profiler.start()
+        for _ in range(2):
+            with Profiler.phase("query"):
+                time.sleep(0.01)
+        Profiler.add_rows(5)
+        assert Profiler.stop() is profile
+        report = profile.report()
+        assert report["phases"]["query"]["calls"] == 2
+        assert report["phases"]["query"]["seconds"] >= 0.02
+        assert report["wall"] >= report["phases"]["query"]["seconds"]
+        assert report["rows"] == 5
+        assert report["statements"] == []
+        assert Profiler.active is None
+
+    def test_should_time_statements_until_the_next_one_or_the_phase_end(self):
+        profile = Profile(trace_sql=True)
+        assert profile.trace_callback is not None
+        with profile.phase("query"):
+            profile.trace("SELECT 1")
+            time.sleep(0.01)
+            profile.trace("SELECT 2")
+        time.sleep(0.01)
+        first, second = profile.report()["statements"]
+        assert first["sql"] == "SELECT 1"
+        assert first["seconds"] >= 0.01
+        assert second["sql"] == "SELECT 2"
+        assert second["seconds"] < 0.01
+
+    def test_should_only_trace_when_asked(self):
+        Profiler.start()
+        assert Profiler.trace_callback() is None
+        profile = Profiler.start(trace_sql=True)
+        assert Profiler.trace_callback() is profile.trace_callback
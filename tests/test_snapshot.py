@@ -0,0 +1,85 @@
+import io
+import os
+import pytest
+
+from expense_tracker.models.exceptions import InvalidImportFileError
+from expense_tracker.snapshot import Snapshot, MAGIC, HEADER, RECORD
+
+SNAPSHOT_FILE = "test_snapshot.snapshot"
+
+
+class TestSnapshot:
+    def setup_method(self):
+        self.rows = [
+            (1, 5000, "Groceries", "2024-10-01T12:00:00", "Food"),
+            (2, 6230, "Café crème", "2024-10-02T12:00:00.123456+02:00", "Food"),
+            (3, 10, "Groceries", "2024-07-02T12:00:00", "Other"),
+        ]
+
+    def teardown_method(self):
+        if os.path.exists(SNAPSHOT_FILE):
+            os.remove(SNAPSHOT_FILE)
+
+    def write(self, rows) -> int:
+        with open(SNAPSHOT_FILE, "wb") as output:
+            return Snapshot.write(rows, output)
+
+    def test_round_trip(self):
+        assert self.write(self.rows) == 3
+        assert [*Snapshot.read(SNAPSHOT_FILE)] == [
+            (amount, description, date, category) for _, amount, description, date, category in self.rows]
+
+    def test_should_store_amounts_as_integer_cents(self):
+        self.write([(1, 2**53 + 1, "Coffee", "2024-10-01T12:00:00", "Food")])
+        assert [amount for amount, *_ in Snapshot.read(SNAPSHOT_FILE)] == [2**53 + 1]
+
+    def test_read_should_reject_unknown_versions(self):
+        with open(SNAPSHOT_FILE, "wb") as file:
+            file.write(HEADER.pack(MAGIC, 2, 0, 0, HEADER.size))
+        with pytest.raises(InvalidImportFileError):
+            next(Snapshot.read(SNAPSHOT_FILE))
+
+    def test_should_store_each_string_once(self):
+        self.write(self.rows)
+        strings = "Groceries Food Café crème Other".encode()
+        assert os.path.getsize(SNAPSHOT_FILE) == HEADER.size + 3 * RECORD.size + 4 * 4 + len(strings) - 3
+
+    def test_empty_snapshot(self):
+        assert self.write([]) == 0
+        assert [*Snapshot.read(SNAPSHOT_FILE)] == []
+
+    def test_write_should_reject_long_dates(self):
+        with pytest.raises(ValueError):
+            self.write([(1, 100, "Coffee", "2024-10-01T12:00:00" * 2, "Food")])
+
+    def test_write_should_reject_unseekable_output(self):
+        output = io.BytesIO()
+        output.seekable = lambda: False
+        with pytest.raises(ValueError):
+            Snapshot.write(self.rows, output)
+
+    def test_read_should_reject_other_files(self):
+        with open(SNAPSHOT_FILE, "w") as file:
+            file.write("amount,description,date\n" * 4)
+        with pytest.raises(InvalidImportFileError):
+            next(Snapshot.read(SNAPSHOT_FILE))
+
+    def test_read_should_reject_truncated_files(self):
+        self.write(self.rows)
+        with open(SNAPSHOT_FILE, "r+b") as file:
+            file.truncate(os.path.getsize(SNAPSHOT_FILE) - 1)
+        with pytest.raises(InvalidImportFileError):
+            next(Snapshot.read(SNAPSHOT_FILE))
+
+    def test_read_should_reject_missing_and_empty_files(self):
+        with pytest.raises(InvalidImportFileError):
+            next(Snapshot.read(SNAPSHOT_FILE))
+        open(SNAPSHOT_FILE, "w").close()
+        with pytest.raises(InvalidImportFileError):
+            next(Snapshot.read(SNAPSHOT_FILE))
+
+    def test_read_should_release_the_file_when_stopped_early(self):
+        self.write(self.rows)
+        rows = Snapshot.read(SNAPSHOT_FILE)
+        next(rows)
+        rows.close()
@@ -0,0 +1,65 @@
+import os
+import sys
+import subprocess
+
+from expense_tracker.config import Config
+from expense_tracker.db.db_client import DB_DIRECTORY
+
+# modules that only some commands need and must not be imported at startup
+DEFERRED_MODULES = [
+    "rich",
+    "csv",
+    "json",
+    "sqlite3",
+    "expense_tracker.db.db_client",
+    "expense_tracker.importer",
+    "expense_tracker.exporter",
+    "expense_tracker.analytics",
+]
+# microseconds the cli module may add on top of importing typer
+IMPORT_BUDGET = 60_000
+DB_NAME = "test_startup.db"
+# a socket no daemon listens on, so commands run in the measured process
+SOCKET = str(DB_DIRECTORY / "test_startup.sock")
+
+
+def import_times(*args: str) -> dict[str, int]:
+    """Run python with -X importtime and return the cumulative import time of every module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True, text=True, env={**os.environ, Config.ENV_DB_NAME: DB_NAME, Config.ENV_SOCKET: SOCKET})
+    assert result.returncode == 0, result.stderr
+    times = {}
+    # lines have the format "import time: <self us> | <cumulative us> | <indented name>"
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and not line.endswith("package"):
+            _, cumulative, name = line[len("import time:"):].split("|")
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup:
+    def teardown_method(self):
+        for suffix in ("", "-wal", "-shm"):
+            path = DB_DIRECTORY / f"{DB_NAME}{suffix}"
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_cli_import_should_defer_heavy_modules(self):
+        times = import_times("-c", "import expense_tracker.cli")
+        assert "expense_tracker.cli" in times
+        assert [module for module in DEFERRED_MODULES if module in times] == []
+
+    def test_add_should_not_import_rich(self):
+        import_times("-m", "expense_tracker.main", "init")
+        times = import_times("-m", "expense_tracker.main", "add", "3.5", "Coffee")
+        assert "sqlite3" in times
+        assert [module for module in times if module.startswith("rich")] == []
+
+    def test_cli_import_should_stay_within_budget(self):
+        # the fastest of a few runs keeps a busy machine from failing the test
+        overhead = min(
+            times["expense_tracker.cli"] - times["typer"]
+            for times in (import_times("-c", "import expense_tracker.cli") for _ in range(3))
+        )
+        assert overhead < IMPORT_BUDGET, f"expense_tracker.cli took {overhead}us on top of typer"
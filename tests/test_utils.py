@@ -0,0 +1,43 @@
+import pytest
+
+from expense_tracker.utils import Utils
+
+
+class TestUtils:
+    def test_to_fts_query_should_quote_terms(self):
+        assert Utils.to_fts_query("uber  trip") == '"uber" AND "trip"'
+        assert Utils.to_fts_query('McDonald\'s "big"') == '"McDonald\'s" AND """big"""'
+
+    def test_to_fts_query_should_keep_prefixes(self):
+        assert Utils.to_fts_query("caf* OR") == '"caf"* AND "OR"'
+
+    def test_to_fts_query_should_require_a_term(self):
+        with pytest.raises(ValueError):
+            Utils.to_fts_query("  * ")
+
+    def test_parse_search_cursor(self):
+        assert Utils.parse_search_cursor("-4.25,42") == (-4.25, 42)
+        assert Utils.parse_search_cursor("-1.2e-06,7") == (-1.2e-06, 7)
+        assert Utils.parse_search_cursor("42") == (None, 42)
+        with pytest.raises(ValueError):
+            Utils.parse_search_cursor("-4.25,")
+
+    def test_to_cents_should_round_to_the_nearest_cent(self):
+        assert Utils.to_cents(4.5) == 450
+        # 0.29 * 100 is 28.999999999999996 as a float
+        assert Utils.to_cents(0.29) == 29
+        assert Utils.to_cents(-12.345) == -1234
+        assert Utils.to_cents(1e9) == 100_000_000_000
+
+    def test_parse_users_cursor(self):
+        assert Utils.parse_users_cursor("2025-10-01T12:00:00,42,alice") == ("2025-10-01T12:00:00", 42, "alice")
+        assert Utils.parse_users_cursor("2025-10-01,7,a,b") == ("2025-10-01", 7, "a,b")
+        with pytest.raises(ValueError):
+            Utils.parse_users_cursor("2025-10-01T12:00:00,42")
+
+    def test_content_hash_should_normalise_description(self):
+        expected = Utils.content_hash(450, "2024-10-01T08:00:00", "Coffee at Starbucks")
+        assert Utils.content_hash(450, "2024-10-01T08:00:00", " coffee  AT starbucks") == expected
+        assert Utils.content_hash(451, "2024-10-01T08:00:00", "Coffee at Starbucks") != expected
+        assert Utils.content_hash(450, "2024-10-02T08:00:00", "Coffee at Starbucks") != expected
+        assert -2 ** 63 <= expected < 2 ** 63